@@ -0,0 +1,170 @@
+import os
+import math
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from matplotlib.figure import Figure
+
+# Figures are built with the object-oriented API and saved through the Agg canvas,
+# so no pyplot state or display is involved and workers can render independently.
+
+
+def parse_commit_array(content):
+    """Parse `count date` lines into NumPy arrays in one pass.
+
+    Args:
+        content (str): Commit data, one `count YYYY-MM-DD` pair per line
+
+    Returns:
+        tuple: datetime64[D] array of dates and int64 array of commit counts, in date order
+    """
+    tokens = np.array(content.split())
+    if len(tokens) % 2:
+        raise ValueError("Commit data must be `count date` pairs")
+    dates = tokens[1::2].astype("datetime64[D]")
+    counts = tokens[0::2].astype(np.int64)
+    order = np.argsort(dates, kind="stable")
+    return dates[order], counts[order]
+
+
+def lttb(x, y, threshold):
+    """Largest-Triangle-Three-Buckets downsampling.
+
+    Keeps the first and last points and, from each of threshold - 2 equal buckets in
+    between, the point forming the largest triangle with the previously kept point
+    and the mean of the next bucket, which preserves the peaks of a series.
+
+    Args:
+        x (np.ndarray): Increasing x values
+        y (np.ndarray): y values
+        threshold (int): Number of points to keep
+
+    Returns:
+        np.ndarray: Indices of the kept points
+    """
+    size = len(x)
+    if threshold >= size or threshold < 3:
+        return np.arange(size)
+
+    x = x.astype(np.float64)
+    y = y.astype(np.float64)
+    edges = np.linspace(1, size - 1, threshold - 1).astype(np.int64)
+    kept = np.empty(threshold, dtype=np.int64)
+    kept[0], kept[-1] = 0, size - 1
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        next_start, next_stop = stop, edges[bucket + 2] if bucket + 2 < len(edges) else size
+        next_x, next_y = x[next_start:next_stop].mean(), y[next_start:next_stop].mean()
+        # Twice the triangle area; the constant factor doesn't change the argmax
+        areas = np.abs(
+            (x[previous] - next_x) * (y[start:stop] - y[previous])
+            - (x[previous] - x[start:stop]) * (next_y - y[previous]),
+        )
+        previous = start + int(np.argmax(areas))
+        kept[bucket + 1] = previous
+    return kept
+
+
+def downsample(dates, counts, max_points):
+    """Reduce a series to at most max_points with LTTB.
+
+    Args:
+        dates (np.ndarray): datetime64[D] dates
+        counts (np.ndarray): Commit counts
+        max_points (int): Maximum number of points to keep
+
+    Returns:
+        tuple: Downsampled dates and counts
+    """
+    kept = lttb(dates.astype(np.int64), counts, max_points)
+    return dates[kept], counts[kept]
+
+
+def render_repo_plot(name, dates, counts, output_path):
+    """Render one repository's commits per day to an image file.
+
+    Args:
+        name (str): Repository name used in the title
+        dates (np.ndarray): datetime64[D] dates
+        counts (np.ndarray): Commit counts
+        output_path (str): Image path; the format follows its suffix
+    """
+    figure = Figure(figsize=(12, 6))
+    axes = figure.subplots()
+    axes.plot(dates, counts, marker="o", markersize=3, linestyle="-", linewidth=1.5)
+    axes.set_title(f"Git Commits Per Day: {name}")
+    axes.set_xlabel("Date")
+    axes.set_ylabel("Number of Commits")
+    axes.grid(True, linestyle="--", alpha=0.7)
+    axes.tick_params(axis="x", labelrotation=45)
+    figure.tight_layout()
+    figure.savefig(output_path)
+    return output_path
+
+
+def render_overview(series, output_path, columns=None):
+    """Render every repository as a small multiple on one figure.
+
+    Args:
+        series (list): (name, dates, counts) tuples
+        output_path (str): Image path
+        columns (int, optional): Grid width; defaults to a near-square grid
+    """
+    columns = columns or math.ceil(math.sqrt(len(series)))
+    rows = math.ceil(len(series) / columns)
+    figure = Figure(figsize=(2.4 * columns, 1.6 * rows))
+    axes_grid = figure.subplots(rows, columns, sharex=True, squeeze=False).ravel()
+    for axes, (name, dates, counts) in zip(axes_grid, series):
+        axes.plot(dates, counts, linewidth=0.8)
+        axes.set_title(name, fontsize=7)
+        axes.tick_params(labelsize=5)
+    for axes in axes_grid[len(series) :]:
+        axes.set_visible(False)
+    figure.tight_layout()
+    figure.savefig(output_path, dpi=100)
+    return output_path
+
+
+def run_batch(input_dir, output_dir, jobs=None, max_points=1000, overview_points=200, image_format="png"):
+    """Plot every `<repo>.txt` file in input_dir (as written by `sosig db activity -o`).
+
+    Each series is parsed and downsampled in the parent process; the per-repository
+    images are rendered across a process pool, followed by a group overview.
+
+    Args:
+        input_dir (str): Directory of commit data files
+        output_dir (str): Directory for the images
+        jobs (int, optional): Worker processes; defaults to the CPU count
+        max_points (int): Points kept per repository image
+        overview_points (int): Points kept per small multiple
+        image_format (str): Image file suffix
+
+    Returns:
+        list: Paths of the written images, overview last
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    series = []
+    for path in sorted(Path(input_dir).glob("*.txt")):
+        dates, counts = parse_commit_array(path.read_text())
+        if len(dates):
+            series.append((path.stem, dates, counts))
+    if not series:
+        raise ValueError(f"No commit data files found in {input_dir}")
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [
+            pool.submit(
+                render_repo_plot,
+                name,
+                *downsample(dates, counts, max_points),
+                os.path.join(output_dir, f"{name}.{image_format}"),
+            )
+            for name, dates, counts in series
+        ]
+        written = [future.result() for future in futures]
+
+    small = [(name, *downsample(dates, counts, overview_points)) for name, dates, counts in series]
+    written.append(render_overview(small, os.path.join(output_dir, f"group-overview.{image_format}")))
+    return written
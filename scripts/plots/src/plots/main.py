@@ -1,9 +1,16 @@
 #!/usr/bin/env python3
 import argparse
+import tempfile
+import subprocess
 from datetime import datetime
 
 import matplotlib.pyplot as plt
 
+try:
+    from .batch import run_batch
+except ImportError:  # run as a script: python main.py
+    from batch import run_batch
+
 
 def parse_commit_data(file_path=None, data_string=None):
     """Parse commit data from either a file or string input.
@@ -34,6 +41,29 @@ def parse_commit_data(file_path=None, data_string=None):
     return dates, commits
 
 
+def load_sosig_activity(repo):
+    """Read a repository's commits per day from the sosig database via `sosig db activity`.
+
+    Args:
+        repo (str): Repository path or name as stored by sosig
+
+    Returns:
+        str: Commit data in the `count date` format
+    """
+    result = subprocess.run(["sosig", "db", "activity", repo], capture_output=True, text=True, check=True)
+    return result.stdout
+
+
+def export_sosig_group(group, output_dir):
+    """Write one commit data file per repository in a sosig group via `sosig db activity`.
+
+    Args:
+        group (str): Group name used with `sosig gh analyze --group`
+        output_dir (str): Directory for the `<repo>.txt` files
+    """
+    subprocess.run(["sosig", "db", "activity", "--group", group, "-o", output_dir], check=True)
+
+
 def plot_commits(dates, commits, output_path=None):
     """Create a plot of commits over time.
 
@@ -60,9 +90,23 @@ def plot_commits(dates, commits, output_path=None):
 def main():
     parser = argparse.ArgumentParser(description="Plot git commit history")
     parser.add_argument("--input", "-i", help="Input file containing commit data")
-    parser.add_argument("--output", "-o", help="Output file path for the plot")
+    parser.add_argument("--repo", "-r", help="Repository analyzed by sosig to read commit data for")
+    parser.add_argument("--output", "-o", help="Output file path for the plot (directory in batch mode)")
+    parser.add_argument("--batch", "-b", help="Plot every <repo>.txt file in this directory")
+    parser.add_argument("--group", "-g", help="Plot every repository in this sosig group")
+    parser.add_argument("--jobs", "-j", type=int, help="Worker processes for batch mode (default: CPU count)")
+    parser.add_argument("--max-points", type=int, default=1000, help="Downsample each series to this many points")
     args = parser.parse_args()
 
+    if args.batch or args.group:
+        output_dir = args.output or "plots"
+        with tempfile.TemporaryDirectory() as export_dir:
+            if args.group:
+                export_sosig_group(args.group, export_dir)
+            written = run_batch(args.batch or export_dir, output_dir, args.jobs, args.max_points)
+        print(f"Wrote {len(written)} images to {output_dir}")
+        return
+
     # Use sample data if no input file is provided
     sample_data = """
 8 2024-07-23
@@ -84,6 +128,9 @@ def main():
 4 2024-08-28
 """
 
+    if args.repo:
+        sample_data = load_sosig_activity(args.repo)
+
     dates, commits = parse_commit_data(
         file_path=args.input,
         data_string=sample_data if not args.input else None,
@@ -1,10 +1,6 @@
 import typer
 
-from ..core.db import get_db
-from ..core.config import PathManager, settings
-from ..core.logger import log
-from ..utils.gh_utils import GitCommandError, DefaultCommandRunner
-from ..utils.display_service import display
+from ..core.paths import DATABASE_FILENAME, PathManager
 
 config_cmds = typer.Typer()
 
@@ -16,12 +12,18 @@ def show(
 ):
     """Show current configuration"""
     if debug:
+        from ..core.logger import log
+
         log.set_debug(debug)
 
     if db_path_only:
-        print(str(PathManager.get_data_dir() / settings.database.filename))
+        print(str(PathManager.get_data_dir() / DATABASE_FILENAME))
         return
 
+    # Imported here so `config show --db-path`, which scripts call, loads neither pydantic nor rich
+    from ..core.config import settings
+    from ..utils.display_service import display
+
     paths = {
         "Config directory": str(PathManager.get_config_dir()),
         "Data directory": str(PathManager.get_data_dir()),
@@ -35,6 +37,13 @@ def init(
     debug: bool = typer.Option(False, "--debug", help="Enable debug logging"),
 ):
     """Initialize application and verify dependencies"""
+    # Imported here so `config show` never loads the git and database stack
+    from ..core.db import get_db
+    from ..core.config import settings
+    from ..core.logger import log
+    from ..utils.display_service import display
+    from ..utils.gh_utils import GitCommandError, DefaultCommandRunner
+
     if debug:
         log.set_debug(debug)
 
@@ -42,7 +51,6 @@ def init(
     required_tools = {
         "git": ["git", "--version"],
         "gh": ["gh", "--version"],
-        "wc": ["which", "wc"],
     }
 
     # Check required tools
@@ -1,12 +1,21 @@
 import os
+import time
 import traceback
 from typing import List
+from pathlib import Path
 
 import typer
 
 from .common import _init_services
 from ..core.db import get_db
+from ..core.query import format_cursor
+from ..core.config import Compression, ExportFormat, ConflictPolicy, settings
 from ..core.logger import log
+from ..core.interfaces import RepoMetrics
+from ..core.importer import read_import
+from ..core.scoring import weight_grid, sample_weights
+from ..utils.gh_repo_dao import RepositoryDAO
+from ..utils.git_history import daily_commit_lines, decode_daily_commits
 from ..utils.display_service import display
 
 db_cmds = typer.Typer()
@@ -134,9 +143,18 @@ def show(
 @db_cmds.command()
 def list(
     sort_by: str = typer.Option("social_signal", "--sort", "-s", help="Sort by: social_signal, stars, age_days"),
+    top: int = typer.Option(None, "--top", "-n", min=1, help="Only show the first N repositories"),
+    group: str = typer.Option(None, "--group", "-g", help="Only show repositories in this group"),
+    where: List[str] = typer.Option(
+        None,
+        "--where",
+        "-w",
+        help="Numeric filter such as 'stars>=100' or 'open_issues<10'; repeatable",
+    ),
+    after: str = typer.Option(None, "--after", help="Keyset cursor printed by a previous --top listing"),
     debug: bool = typer.Option(False, "--debug", help="Enable debug logging"),
 ):
-    """List all analyzed repositories in the database."""
+    """List analyzed repositories in the database, best first."""
     if debug:
         log.set_debug(debug)
 
@@ -168,9 +186,17 @@ def list(
         log.debug("Listing repositories")
         service = _init_services()
         log.debug("Getting all repositories")
-        repos = service.get_all_repositories(sort_by=sort_by)
+        repos = service.get_all_repositories(sort_by=sort_by, limit=top, group=group, filters=where, after=after)
+        if top:
+            # A page is small; materialize it to find the cursor of its last row
+            repos = [*repos]
         log.debug("Displaying repositories")
         display.show_repository_list(repos, fields)
+        if top and len(repos) == top:
+            display.info(f"Next page: --after {format_cursor(repos[-1], sort_by)}")
+    except ValueError as e:
+        display.error(str(e))
+        raise typer.Exit(1)
     except Exception as e:
         display.error(f"Error listing repositories: {e}\n{traceback.format_exc()}")
         raise typer.Exit(1)
@@ -178,18 +204,27 @@ def list(
 
 @db_cmds.command()
 def export(
-    output_dir: str = typer.Option(".", "--output-dir", "-o", help="Directory to save the CSV file"),
+    output_dir: str = typer.Option(".", "--output-dir", "-o", help="Directory to save the export file"),
+    export_format: ExportFormat = typer.Option(ExportFormat.CSV, "--format", help="Output format"),
+    compression: Compression = typer.Option(
+        Compression.NONE,
+        "--compression",
+        "-z",
+        help="Compress the output; parquet compresses its column chunks instead",
+    ),
+    chunk_size: int = typer.Option(10_000, "--chunk-size", min=1, help="Rows read per batch (parquet row group size)"),
     fields: List[str] = typer.Option(
         None,
         "--fields",
         "-f",
-        help="Comma-separated list of fields to export. Default: all fields",
+        help="Comma-separated list of fields to export. Default: all but internal resume state",
     ),
     debug: bool = typer.Option(False, "--debug", help="Enable debug logging"),
 ):
-    """Export repository data to a CSV file.
+    """Export repository data to CSV, NDJSON or Parquet.
 
-    If no fields are specified, all fields will be exported.
+    If no fields are specified, all fields except internal resume state
+    (head_sha, history_state) will be exported.
     """
     if debug:
         log.set_debug(debug)
@@ -203,8 +238,179 @@ def export(
         if fields and isinstance(fields, str):
             fields = [f.strip() for f in fields.split(",")]
 
-        filepath = db.export_to_csv(output_dir, fields)
+        filepath = db.export(output_dir, fields, export_format, compression, chunk_size)
         display.success(f"Successfully exported data to: {filepath}")
     except Exception as e:
         display.error(f"Error exporting database contents: {e}")
         raise typer.Exit(1)
+
+
+@db_cmds.command("import")
+def import_(
+    paths: List[str] = typer.Argument(..., help="Files from `db export` (csv, ndjson, parquet) or sosig .db files"),
+    on_conflict: ConflictPolicy = typer.Option(
+        ConflictPolicy.NEWEST,
+        "--on-conflict",
+        help="For paths already in the database: keep the newest analysis, overwrite, or skip",
+    ),
+    chunk_size: int = typer.Option(50_000, "--chunk-size", min=1, help="Rows per batched insert"),
+    debug: bool = typer.Option(False, "--debug", help="Enable debug logging"),
+):
+    """Import repository data exported from sosig."""
+    if debug:
+        log.set_debug(debug)
+    try:
+        db = get_db()
+        for path in paths:
+            fields, chunks = read_import(path, chunk_size)
+            rows_read, rows_written = db.import_rows(fields, chunks, on_conflict)
+            display.success(f"Imported {path}: {rows_read} rows read, {rows_written} inserted or updated")
+    except Exception as e:
+        display.error(f"Error importing data: {e}")
+        raise typer.Exit(1)
+
+
+@db_cmds.command("migrate-paths")
+def migrate_paths(
+    workspace: Path = typer.Option(settings.workspace, help="Workspace the repositories were analyzed in"),
+    prune: bool = typer.Option(False, "--prune", help="Delete old rows whose repository identity is unknown"),
+    debug: bool = typer.Option(False, "--debug", help="Enable debug logging"),
+):
+    """Re-key analyses stored by earlier releases under `<workspace>/<name>`."""
+    if debug:
+        log.set_debug(debug)
+    try:
+        service = _init_services()
+        moved, orphaned = service.migrate_workspace_paths(workspace, prune=prune)
+        display.success(f"Re-keyed {moved} repositories")
+        if orphaned:
+            if prune:
+                display.success(f"Pruned {orphaned} repositories with no known owner")
+            else:
+                display.warn(f"{orphaned} repositories have no known owner; run with --prune to delete them")
+    except Exception as e:
+        display.error(f"Error migrating repository paths: {e}")
+        raise typer.Exit(1)
+
+
+@db_cmds.command()
+def rescore(
+    dry_run: bool = typer.Option(False, "--dry-run", help="Report how many scores would change without writing"),
+    debug: bool = typer.Option(False, "--debug", help="Enable debug logging"),
+):
+    """Recompute social signals from stored metrics using the current weights and normalizers."""
+    if debug:
+        log.set_debug(debug)
+    try:
+        settings.metrics.validate_weights()
+        db = get_db()
+        scored, changed = db.rescore(dry_run=dry_run)
+        verb = "would change" if dry_run else "updated"
+        display.success(f"Rescored {scored} repositories: {changed} scores {verb}")
+    except Exception as e:
+        display.error(f"Error rescoring repositories: {e}")
+        raise typer.Exit(1)
+
+
+@db_cmds.command()
+def sweep(
+    step: float = typer.Option(None, "--step", help="Evaluate every weight vector whose weights are multiples of STEP"),
+    samples: int = typer.Option(1000, "--samples", min=1, help="Random weight vectors to evaluate without --step"),
+    seed: int = typer.Option(None, "--seed", help="Random seed for --samples"),
+    top_k: int = typer.Option(10, "--top-k", "-k", min=1, help="Size of the top list compared for overlap"),
+    debug: bool = typer.Option(False, "--debug", help="Enable debug logging"),
+):
+    """Measure how stable rankings are when the metric weights change."""
+    if debug:
+        log.set_debug(debug)
+    try:
+        settings.metrics.validate_weights()
+        weight_sets = weight_grid(step) if step else sample_weights(samples, seed)
+        db = get_db()
+        with display.status(f"Scoring {weight_sets.shape[1]} weight sets..."):
+            results = db.sweep(weight_sets, top_k)
+        display.show_sweep_results(results, weight_sets.shape[1], top_k)
+    except Exception as e:
+        display.error(f"Error sweeping weights: {e}")
+        raise typer.Exit(1)
+
+
+def _find_one(dao: RepositoryDAO, repo: str) -> RepoMetrics:
+    """The single repository with this path or name"""
+    matches = dao.find(repo)
+    if not matches:
+        raise ValueError(f"No repository found for '{repo}'")
+    if len(matches) > 1:
+        raise ValueError(f"'{repo}' matches several repositories; use one of: {', '.join(m.path for m in matches)}")
+    return matches[0]
+
+
+@db_cmds.command()
+def history(
+    repo: str = typer.Argument(..., help="Repository path or name"),
+    days: int = typer.Option(None, "--days", "-d", min=1, help="Only show snapshots from the last N days"),
+    debug: bool = typer.Option(False, "--debug", help="Enable debug logging"),
+):
+    """Show the metrics recorded for a repository at each analysis."""
+    if debug:
+        log.set_debug(debug)
+    try:
+        metrics = _find_one(RepositoryDAO(), repo)
+        since = time.time() - days * 86400 if days else None
+        snapshots = get_db().get_snapshots(metrics.id, since)
+        display.show_history(metrics, snapshots)
+    except ValueError as e:
+        display.error(str(e))
+        raise typer.Exit(1)
+    except Exception as e:
+        display.error(f"Error getting repository history: {e}")
+        raise typer.Exit(1)
+
+
+@db_cmds.command()
+def activity(
+    repos: List[str] = typer.Argument(None, help="Repository paths or names"),
+    group: str = typer.Option(None, "--group", "-g", help="Every repository in this group"),
+    output_dir: str = typer.Option(None, "--output-dir", "-o", help="Write one <name>.txt per repository here"),
+    debug: bool = typer.Option(False, "--debug", help="Enable debug logging"),
+):
+    """Print commits per day as `<count> <YYYY-MM-DD>` lines for the plots script."""
+    if debug:
+        log.set_debug(debug)
+    try:
+        targets = []
+        dao = RepositoryDAO()
+        for repo in repos or []:
+            metrics = _find_one(dao, repo)
+            targets.append((metrics.id, metrics.name, metrics.path, metrics.commit_activity))
+        if group is not None or not repos:
+            targets.extend(get_db().iter_commit_activity(group))
+        if output_dir is None and len(targets) != 1:
+            raise ValueError(f"{len(targets)} repositories selected; use --output-dir to write one file each")
+
+        if output_dir is None:
+            repo_id, name, path, blob = targets[0]
+            if blob is None:
+                raise ValueError(f"No commit activity recorded for {path}; re-analyze it with `sosig gh analyze`")
+            for line in daily_commit_lines(decode_daily_commits(blob)):
+                typer.echo(line)
+            return
+
+        os.makedirs(output_dir, exist_ok=True)
+        names, written = set(), 0
+        for repo_id, name, path, blob in targets:
+            if blob is None:
+                display.warn(f"No commit activity recorded for {path}; re-analyze it with `sosig gh analyze`")
+                continue
+            filename = name if name not in names else f"{name}-{repo_id}"
+            names.add(name)
+            with open(os.path.join(output_dir, f"{filename}.txt"), "w") as f:
+                f.writelines(f"{line}\n" for line in daily_commit_lines(decode_daily_commits(blob)))
+            written += 1
+        display.success(f"Wrote commit activity for {written} repositories to {output_dir}")
+    except ValueError as e:
+        display.error(str(e))
+        raise typer.Exit(1)
+    except Exception as e:
+        display.error(f"Error getting commit activity: {e}")
+        raise typer.Exit(1)
@@ -1,4 +1,3 @@
-import shutil
 import traceback
 from typing import List
 from pathlib import Path
@@ -6,9 +5,10 @@ from pathlib import Path
 import typer
 
 from .common import _init_services
-from ..core.config import settings
+from ..core.config import LocalMode, CloneStrategy, settings
 from ..core.logger import log
 from ..core.interfaces import RepoMetrics
+from ..utils.mirror_cache import MirrorCache, cleanup_workspace
 from ..utils.display_service import display
 
 gh_cmds = typer.Typer()
@@ -20,10 +20,9 @@ def _display_analysis_results(results: List[RepoMetrics]):
 
 
 def _cleanup_path(path: Path) -> None:
-    """Helper function to safely clean up a path"""
+    """Helper function to safely clean up a path, keeping any mirror cache"""
     try:
-        if path.exists():
-            shutil.rmtree(path)
+        cleanup_workspace(path)
     except Exception as e:
         display.warn(f"Could not clean up {path}: {e}")
 
@@ -38,6 +37,29 @@ def analyze(
     group: str = typer.Option(None, "--group", "-g", help="Group name for the repositories"),
     force: bool = typer.Option(False, "--force", "-f", help="Force reanalysis of repositories"),
     cleanup: bool = typer.Option(True, "--cleanup/--no-cleanup", help="Clean up repositories after analysis"),
+    jobs: int = typer.Option(1, "--jobs", "-j", min=1, help="Number of repositories to analyze in parallel"),
+    clone_strategy: CloneStrategy = typer.Option(
+        settings.clone_strategy,
+        "--clone-strategy",
+        help="full clone, blobless (--filter=blob:none) or treeless (--filter=tree:0, no checkout, no lines of code)",
+    ),
+    local_mode: LocalMode = typer.Option(
+        settings.local_mode,
+        "--local-mode",
+        help="copy local repositories, shared-clone them (no object copy) or analyze them in-place",
+    ),
+    mirror_cache: bool = typer.Option(
+        False,
+        "--mirror-cache/--no-mirror-cache",
+        help="Keep persistent mirrors in the workspace and fetch only new objects on re-analysis",
+    ),
+    max_age: float = typer.Option(
+        None,
+        "--max-age",
+        min=0,
+        help=f"Reuse stored results younger than this many hours [default: {settings.database.CACHE_TTL_HOURS}]",
+    ),
+    stale_only: bool = typer.Option(False, "--stale-only", help="Only report repositories that needed re-analysis"),
     debug: bool = typer.Option(False, "--debug", help="Enable debug logging"),
 ):
     """Analyze one or more GitHub repositories and store results."""
@@ -47,8 +69,23 @@ def analyze(
 
     try:
         service = _init_services()
+        # Results stored under the pre-identity workspace layout would otherwise be re-analyzed as new rows
+        moved, _ = service.migrate_workspace_paths(workspace)
+        if moved:
+            log.info(f"Re-keyed {moved} repositories stored under the old workspace layout")
         with display.status("Analyzing repositories..."):
-            results = service.analyze_repositories(repo_paths, workspace, force, group)
+            results = service.analyze_repositories(
+                repo_paths,
+                workspace,
+                force,
+                group,
+                jobs=jobs,
+                clone_strategy=clone_strategy,
+                mirror_cache=MirrorCache() if mirror_cache else None,
+                local_mode=local_mode,
+                max_age_hours=max_age,
+                stale_only=stale_only,
+            )
             _display_analysis_results(results)
     except Exception as e:
         display.error(f"Error analyzing repositories: {e}\n{traceback.format_exc()}")
@@ -1,61 +1,111 @@
-import os
 import math
-from typing import Dict, ClassVar
+from enum import Enum
+from typing import Set, Dict, List, Union, ClassVar
 from pathlib import Path
 
 from pydantic import Field, BaseModel
-from rich.console import Console
-
-console = Console()
-
-PROJECT_NAME = "sosig"
-
-
-class PathManager:
-    """Manages XDG-compliant application paths"""
-
-    @staticmethod
-    def get_data_dir() -> Path:
-        """Get XDG data directory for the application"""
-        base_dir = (
-            Path(os.environ.get("XDG_DATA_HOME", ""))
-            if os.environ.get("XDG_DATA_HOME")
-            else Path.home() / ".local" / "share"
-        )
-        data_dir = base_dir / PROJECT_NAME
-        data_dir.mkdir(parents=True, exist_ok=True)
-        return data_dir
-
-    @staticmethod
-    def get_workspace_dir() -> Path:
-        """Get workspace directory for temporary repository operations"""
-        return PathManager.get_data_dir() / "workspace"
-
-    @staticmethod
-    def get_config_dir() -> Path:
-        """Get XDG config directory for the application"""
-        base_dir = (
-            Path(os.environ.get("XDG_CONFIG_HOME", ""))
-            if os.environ.get("XDG_CONFIG_HOME")
-            else Path.home() / ".config"
-        )
-        config_dir = base_dir / PROJECT_NAME
-        config_dir.mkdir(parents=True, exist_ok=True)
-        return config_dir
+
+# Re-exported: PathManager has long been imported from here
+from .paths import PROJECT_NAME, DATABASE_FILENAME, PathManager  # noqa: F401
+
+
+class CloneStrategy(str, Enum):
+    """How remote repositories are cloned for analysis"""
+
+    FULL = "full"
+    BLOBLESS = "blobless"
+    TREELESS = "treeless"
+
+    @property
+    def clone_args(self) -> List[str]:
+        """Extra `git clone` arguments for this strategy"""
+        if self is CloneStrategy.BLOBLESS:
+            return ["--filter=blob:none", "--no-recurse-submodules"]
+        if self is CloneStrategy.TREELESS:
+            return ["--filter=tree:0", "--no-checkout", "--no-recurse-submodules"]
+        return []
+
+    @property
+    def unavailable_metrics(self) -> Set[str]:
+        """Metrics that cannot be computed from a clone made with this strategy"""
+        if self is CloneStrategy.TREELESS:
+            # No working tree is checked out, so there are no files to count
+            return {"lines_of_code"}
+        return set()
+
+
+class LocalMode(str, Enum):
+    """How local repository paths are made available for analysis"""
+
+    COPY = "copy"  # copy the whole repository, including .git, into the workspace
+    SHARED = "shared"  # `git clone --shared`: working tree only, objects via alternates
+    IN_PLACE = "in-place"  # analyze the source checkout directly, read-only
+
+
+class ExportFormat(str, Enum):
+    """File formats supported by `db export`"""
+
+    CSV = "csv"
+    NDJSON = "ndjson"
+    PARQUET = "parquet"
+
+
+class Compression(str, Enum):
+    """Compression applied to exported files"""
+
+    NONE = "none"
+    GZIP = "gzip"
+    ZSTD = "zstd"
+
+    @property
+    def suffix(self) -> str:
+        return {Compression.NONE: "", Compression.GZIP: ".gz", Compression.ZSTD: ".zst"}[self]
+
+
+class ConflictPolicy(str, Enum):
+    """What `db import` does with rows whose path already exists"""
+
+    NEWEST = "newest"  # keep whichever row has the later last_analyzed
+    OVERWRITE = "overwrite"
+    SKIP = "skip"
 
 
 class DatabaseConfig(BaseModel):
     """Database configuration settings"""
 
-    filename: str = "github_metrics.db"
+    filename: str = DATABASE_FILENAME
     CACHE_TTL_HOURS: int = Field(default=24)
 
+    # Connect-time pragmas; WAL lets readers run alongside a writer
+    journal_mode: str = Field(default="wal")
+    synchronous: str = Field(default="normal")
+    mmap_size: int = Field(default=256 * 1024 * 1024, description="Bytes of the file to memory-map for reads")
+    cache_size: int = Field(default=-64000, description="Page cache size; negative values are KiB")
+    temp_store: str = Field(default="memory")
+    busy_timeout: int = Field(default=5000, description="Milliseconds to wait for a lock before failing")
+
+    # Snapshot retention: the last snapshot per day is kept this long, then the last per week
+    SNAPSHOT_DAILY_DAYS: int = Field(default=30)
+
     @property
     def URI(self) -> str:
         """Get SQLAlchemy connection string"""
         db_path = PathManager.get_data_dir() / self.filename
         return f"sqlite:///{db_path}"
 
+    @property
+    def pragmas(self) -> Dict[str, Union[str, int]]:
+        """Pragmas applied to every new connection, in order"""
+        return {
+            # busy_timeout first so the remaining pragmas wait out concurrent writers
+            "busy_timeout": self.busy_timeout,
+            "journal_mode": self.journal_mode,
+            "synchronous": self.synchronous,
+            "mmap_size": self.mmap_size,
+            "cache_size": self.cache_size,
+            "temp_store": self.temp_store,
+        }
+
 
 class LoggingConfig(BaseModel):
     DEBUG: bool = Field(default=False)
@@ -111,6 +161,8 @@ class Config(BaseModel):
     metrics: MetricsConfig = Field(default_factory=MetricsConfig)
     database: DatabaseConfig = Field(default_factory=DatabaseConfig)
     workspace: Path = Field(default_factory=PathManager.get_workspace_dir)
+    clone_strategy: CloneStrategy = Field(default=CloneStrategy.FULL)
+    local_mode: LocalMode = Field(default=LocalMode.COPY)
 
 
 settings = Config()
@@ -1,14 +1,32 @@
 import os
-import csv
 import time
-from typing import List, Optional, Generator
+import itertools
+import threading
+from typing import TYPE_CHECKING, Dict, List, Tuple, Iterable, Iterator, Optional, Sequence, Generator
+from functools import partial
 from contextlib import contextmanager
 
-from sqlalchemy import func, text, inspect, create_engine
+from sqlalchemy import func, text, event, select, create_engine
 from sqlalchemy.orm import Session, sessionmaker
-
-from . import models
-from .config import settings
+from sqlalchemy.sql import ColumnElement
+from sqlalchemy.engine import Engine
+
+from . import models, migrations
+from .config import Compression, ExportFormat, ConflictPolicy, DatabaseConfig, settings
+from .export import write_export, export_filename, require_optional
+from .scoring import (
+    SCORE_COLUMNS,
+    OPTIONAL_COLUMNS,
+    weight_vector,
+    score_columns,
+    rank_stability,
+    normalize_columns,
+    normalized_matrix,
+)
+from .interfaces import RepoMetrics
+
+if TYPE_CHECKING:
+    import numpy
 
 
 class Database:
@@ -16,43 +34,84 @@ class Database:
 
     _instance = None
 
-    def __new__(cls, db_path: Optional[str] = None):
+    def __new__(cls, db_path: Optional[str] = None, config: Optional[DatabaseConfig] = None):
         """Implement proper singleton pattern"""
         if cls._instance is None:
             cls._instance = super().__new__(cls)
         return cls._instance
 
-    def __init__(self, db_path: Optional[str] = None):
-        """Initialize database connection and session maker
+    # Created together, on first use, by _connect
+    _CONNECTION_ATTRIBUTES = ("engine", "SessionLocal", "read_engine", "ReadSessionLocal")
+    _connect_lock = threading.Lock()
+
+    def __init__(self, db_path: Optional[str] = None, config: Optional[DatabaseConfig] = None):
+        """Record the database location; engines are created and migrated on first use
 
         This will only run once due to singleton pattern
         """
-        if hasattr(self, "engine"):  # Skip if already initialized
+        if hasattr(self, "config"):  # Skip if already initialized
             return
 
-        self.engine = create_engine(
-            db_path if db_path else settings.database.URI,
-            pool_pre_ping=True,
-            pool_recycle=3600,
-        )
+        self.config = config or settings.database
+        self.url = db_path if db_path else self.config.URI
+
+    def __getattr__(self, name: str):
+        """Connect when a connection attribute is first read, so commands that never query stay cheap"""
+        if name not in self._CONNECTION_ATTRIBUTES:
+            raise AttributeError(name)
+        with self._connect_lock:
+            if "engine" not in self.__dict__:
+                self._connect()
+        return self.__dict__[name]
+
+    def _connect(self) -> None:
+        # Local SQLite connections don't go stale, so no pre-ping or recycling
+        engine = create_engine(self.url)
+        event.listen(engine, "connect", self._apply_pragmas)
+        self._initialize_database(engine)
         self.SessionLocal = sessionmaker(
-            bind=self.engine,
+            bind=engine,
             autocommit=False,
             autoflush=False,
         )
-        self._initialize_database()
-
-    def _initialize_database(self) -> None:
-        """Initialize database schema and validate models"""
-        with self.engine.connect() as conn:
-            # Use a transaction to handle concurrent initialization
-            with conn.begin():
-                # Check if tables exist before creating
-                inspector = inspect(self.engine)
-                existing_tables = inspector.get_table_names()
-                if "repositories" not in existing_tables:
-                    models.Base.metadata.create_all(self.engine)
-                models.Repository.validate_fields()
+
+        # Read-only commands get their own engine so they never take a write lock
+        self.read_engine = self._create_read_engine(engine)
+        self.ReadSessionLocal = sessionmaker(bind=self.read_engine, autoflush=False)
+        # Set last: its presence marks the connection as complete
+        self.engine = engine
+
+    def _apply_pragmas(self, dbapi_connection, connection_record, read_only: bool = False) -> None:
+        """Apply DatabaseConfig pragmas to a new SQLite connection"""
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in self.config.pragmas.items():
+                # journal_mode is persistent and can only be changed by a writer
+                if read_only and name == "journal_mode":
+                    continue
+                cursor.execute(f"PRAGMA {name} = {value}")
+        finally:
+            cursor.close()
+
+    def _create_read_engine(self, engine: Engine) -> Engine:
+        """Open the database file with mode=ro, falling back to the main engine for in-memory databases"""
+        database = engine.url.database
+        if not database or database == ":memory:":
+            return engine
+        read_engine = create_engine(f"sqlite:///file:{os.path.abspath(database)}?mode=ro&uri=true")
+        event.listen(read_engine, "connect", partial(self._apply_pragmas, read_only=True))
+        return read_engine
+
+    def _initialize_database(self, engine: Engine) -> None:
+        """Initialize database schema and validate models, unless the stamped fingerprint matches"""
+        with engine.connect() as conn:
+            if migrations.is_current(conn):
+                return
+        models.Repository.validate_fields()
+        # Use a transaction to handle concurrent initialization
+        with engine.begin() as conn:
+            migrations.upgrade(conn)
+            migrations.stamp(conn)
 
     @contextmanager
     def get_session(self) -> Generator[Session, None, None]:
@@ -67,6 +126,15 @@ class Database:
         finally:
             session.close()
 
+    @contextmanager
+    def get_read_session(self) -> Generator[Session, None, None]:
+        """Provide a session on the read-only engine; nothing is committed."""
+        session = self.ReadSessionLocal()  # noqa
+        try:
+            yield session
+        finally:
+            session.close()
+
     def clear_all(self) -> int:
         """Clear all repositories from database.
 
@@ -76,6 +144,7 @@ class Database:
         with self.get_session() as session:
             count = session.query(models.Repository).count()
             session.query(models.Repository).delete()
+            session.query(models.RepositorySnapshot).delete()
             return count
 
     def get_stats(self) -> dict:
@@ -84,7 +153,7 @@ class Database:
         Returns:
             Dictionary containing database statistics
         """
-        with self.get_session() as session:
+        with self.get_read_session() as session:
             return {
                 "total_repos": session.query(models.Repository).count(),
                 "avg_signal": session.query(func.avg(models.Repository.social_signal)).scalar() or 0,
@@ -106,6 +175,7 @@ class Database:
 
                 db_path = self.engine.url.database
                 self.engine.dispose()  # Close all connections
+                self.read_engine.dispose()
                 if os.path.exists(db_path):
                     os.remove(db_path)
                 return True
@@ -113,13 +183,53 @@ class Database:
                 raise Exception(f"Failed to drop database: {e}")
 
     def optimize(self) -> None:
-        """Optimize database by running VACUUM."""
+        """Optimize database by compacting snapshots and running VACUUM."""
+        self.compact_snapshots()
         with self.get_session() as session:
             session.execute(text("VACUUM"))
 
+    def compact_snapshots(self, repo_ids: Optional[Sequence[int]] = None, now: Optional[float] = None) -> int:
+        """Thin snapshot history to the last snapshot per day within the retention window, per week before it.
+
+        Args:
+            repo_ids: Only compact these repositories' history (default: all)
+            now: Reference time for the daily window, in epoch seconds
+
+        Returns:
+            Number of snapshots deleted
+        """
+        cutoff = int((now or time.time()) - self.config.SNAPSHOT_DAILY_DAYS * 86400)
+        # analyzed_at is an INTEGER, so / is integer division; weekly buckets are negative to stay apart
+        bucket = f"CASE WHEN analyzed_at >= {cutoff} THEN analyzed_at / 86400 ELSE -1 - analyzed_at / 604800 END"
+        scope = "" if repo_ids is None else " WHERE repo_id = ?"
+        ranked = (
+            f"SELECT repo_id, analyzed_at, ROW_NUMBER() OVER (PARTITION BY repo_id, {bucket} "
+            f"ORDER BY analyzed_at DESC) AS rank FROM repository_snapshots{scope}"
+        )
+        statement = (
+            "DELETE FROM repository_snapshots WHERE (repo_id, analyzed_at) IN "
+            f"(SELECT repo_id, analyzed_at FROM ({ranked}) WHERE rank > 1)"
+        )
+        with self.engine.begin() as conn:
+            changes_before = conn.exec_driver_sql("SELECT total_changes()").scalar()
+            if repo_ids is None:
+                conn.exec_driver_sql(statement)
+            elif repo_ids:
+                conn.exec_driver_sql(statement, [(repo_id,) for repo_id in repo_ids])
+            return conn.exec_driver_sql("SELECT total_changes()").scalar() - changes_before
+
+    def get_snapshots(self, repo_id: int, since: Optional[float] = None) -> List[dict]:
+        """A repository's snapshot history, oldest first, read as one primary key range"""
+        snapshots = models.RepositorySnapshot
+        query = select(snapshots).where(snapshots.repo_id == repo_id).order_by(snapshots.analyzed_at)
+        if since is not None:
+            query = query.where(snapshots.analyzed_at >= since)
+        with self.get_read_session() as session:
+            return [snapshots.decode(row) for row in session.scalars(query)]
+
     def get_repository(self, path: str) -> Optional[models.Repository]:
         """Get repository by path."""
-        with self.get_session() as session:
+        with self.get_read_session() as session:
             repo = session.query(models.Repository).filter_by(path=path).first()
             if repo:
                 # Load all relationships and attributes
@@ -131,23 +241,44 @@ class Database:
                 return detached_copy
             return None
 
-    def get_all_repositories(self, sort_by: str = "social_signal") -> List[models.Repository]:
+    def iter_repository_metrics(
+        self,
+        sort_by: str = "social_signal",
+        batch_size: int = 1000,
+        conditions: Sequence[ColumnElement] = (),
+        limit: Optional[int] = None,
+    ) -> Iterator[RepoMetrics]:
+        """Stream repositories as RepoMetrics, sorted descending by sort_by.
+
+        Columns are projected straight into RepoMetrics and fetched batch_size rows
+        at a time from a single query, so memory stays bounded for large tables.
+        Ties are broken by descending id, which keeps the sort on the (column, rowid)
+        index order and makes keyset cursors stable (see core.query). Internal resume
+        state (head_sha, history_state) is not read; those fields stay None.
+        """
+        columns = [getattr(models.Repository, field) for field in models.Repository.listing_fields()]
+        query = select(*columns).where(*conditions)
+        if hasattr(models.Repository, sort_by):
+            query = query.order_by(getattr(models.Repository, sort_by).desc())
+        query = query.order_by(models.Repository.id.desc()).limit(limit).execution_options(yield_per=batch_size)
+
+        with self.get_read_session() as session:
+            for row in session.execute(query):
+                yield RepoMetrics(**row._mapping)
+
+    def iter_commit_activity(self, group: Optional[str] = None) -> Iterator[Tuple[int, str, str, Optional[bytes]]]:
+        """Stream (id, name, path, commit_activity) for every repository, or those in group, by path"""
+        repo = models.Repository
+        query = select(repo.id, repo.name, repo.path, repo.commit_activity).order_by(repo.path)
+        if group is not None:
+            query = query.where(repo.group == group)
+        with self.get_read_session() as session:
+            for repo_id, name, path, activity in session.execute(query.execution_options(yield_per=1000)):
+                yield repo_id, name, path, activity
+
+    def get_all_repositories(self, sort_by: str = "social_signal") -> List[RepoMetrics]:
         """Get all repositories with optional sorting."""
-        with self.get_session() as session:
-            query = session.query(models.Repository)
-            if hasattr(models.Repository, sort_by):
-                query = query.order_by(getattr(models.Repository, sort_by).desc())
-
-            # Load all results and create detached copies
-            results = []
-            for repo in query.all():
-                session.refresh(repo)  # Ensure all attributes are loaded
-                detached_copy = models.Repository(
-                    **{k: v for k, v in repo.__dict__.items() if not k.startswith("_")},
-                )
-                results.append(detached_copy)
-
-            return results
+        return list(self.iter_repository_metrics(sort_by))
 
     def get_schema_info(self) -> dict:
         """Get database schema information.
@@ -155,7 +286,7 @@ class Database:
         Returns:
             Dictionary containing tables, indexes, and triggers
         """
-        with self.get_session() as session:
+        with self.get_read_session() as session:
             # Get tables and their columns
             tables = {}
             for table in models.Base.metadata.tables.values():
@@ -181,48 +312,207 @@ class Database:
                 "triggers": [{"name": trig[0], "table": trig[1]} for trig in triggers],
             }
 
-    def export_to_csv(self, output_dir: str = ".", fields: Optional[List[str]] = None) -> str:
-        """Export repository data to a CSV file.
+    def iter_row_chunks(self, fields: List[str], chunk_size: int = 10_000) -> Iterator[List[tuple]]:
+        """Stream the selected columns as lists of up to chunk_size row tuples, ordered by id"""
+        columns = [getattr(models.Repository, field) for field in fields]
+        query = select(*columns).order_by(models.Repository.id).execution_options(yield_per=chunk_size)
+        with self.get_read_session() as session:
+            for partition in session.execute(query).partitions():
+                yield [tuple(row) for row in partition]
+
+    def export(
+        self,
+        output_dir: str = ".",
+        fields: Optional[List[str]] = None,
+        export_format: ExportFormat = ExportFormat.CSV,
+        compression: Compression = Compression.NONE,
+        chunk_size: int = 10_000,
+    ) -> str:
+        """Export repository data, streaming chunk_size rows at a time.
 
         Args:
-            output_dir: Directory where the CSV file will be saved
-            fields: List of field names to export. If None, exports all fields.
+            output_dir: Directory where the file will be saved
+            fields: List of field names to export. If None, exports every field except
+                binary data and internal resume state (head_sha, history_state).
+            export_format: csv, ndjson or parquet (one row group per chunk)
+            compression: gzip or zstd; parquet applies it to its column chunks
 
         Returns:
-            Path to the created CSV file
+            Path to the created file
         """
-        repositories = self.get_all_repositories()
-
-        if not repositories or len(repositories) == 0:
-            raise Exception("No data to export")
-
-        # Create filename with timestamp
-        timestamp = time.strftime("%Y%m%d_%H%M%S")
-        filename = f"sosig_export_{timestamp}.csv"
-        filepath = os.path.join(output_dir, filename)
-
-        # Get all available field names from the first repository
-        all_fields = [k for k, v in repositories[0].__dict__.items() if not k.startswith("_")]
+        all_fields = models.Repository.tabular_fields()
 
-        # Validate and filter fields if specified
+        # Validate and filter fields if specified; internal fields only when asked for
         if fields:
             invalid_fields = [f for f in fields if f not in all_fields]
             if invalid_fields:
                 raise ValueError(f"Invalid fields specified: {', '.join(invalid_fields)}")
             fieldnames = fields
         else:
-            fieldnames = all_fields
+            fieldnames = models.Repository.listing_fields()
 
-        with open(filepath, "w", newline="") as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-            for repo in repositories:
-                # Only write requested fields
-                row = {k: v for k, v in repo.__dict__.items() if not k.startswith("_") and k in fieldnames}
-                writer.writerow(row)
+        chunks = self.iter_row_chunks(fieldnames, chunk_size)
+        first = next(chunks, None)
+        if first is None:
+            raise Exception("No data to export")
 
+        # Create filename with timestamp
+        timestamp = time.strftime("%Y%m%d_%H%M%S")
+        filepath = os.path.join(output_dir, export_filename(timestamp, export_format, compression))
+        write_export(itertools.chain([first], chunks), fieldnames, filepath, export_format, compression)
         return filepath
 
+    def export_to_csv(self, output_dir: str = ".", fields: Optional[List[str]] = None) -> str:
+        """Export repository data to a CSV file."""
+        return self.export(output_dir, fields)
+
+    def import_rows(
+        self,
+        fields: List[str],
+        chunks: Iterable[List[tuple]],
+        on_conflict: ConflictPolicy = ConflictPolicy.NEWEST,
+    ) -> Tuple[int, int]:
+        """Bulk-load row chunks (as produced by core.importer) in a single transaction.
+
+        Each chunk is one executemany of INSERT ... ON CONFLICT(path). Once the rows
+        read outnumber the rows already in the table, the secondary indexes are
+        dropped for the rest of the load and rebuilt once at the end: past that
+        point a rebuild is cheaper than per-row index maintenance, while a small
+        import into a large table never pays for one. date_created defaults to now
+        and is never overwritten.
+
+        Returns:
+            Tuple of (rows read, rows inserted or updated)
+        """
+        now = time.time()
+        insert_fields = [*fields] if "date_created" in fields else [*fields, "date_created"]
+        placeholders = [f"COALESCE(?, {now})" if field == "date_created" else "?" for field in fields]
+        if "date_created" not in fields:
+            placeholders.append(str(now))
+        column_list = ", ".join(f'"{field}"' for field in insert_fields)
+        statement = (
+            f"INSERT INTO repositories ({column_list}) VALUES ({', '.join(placeholders)}) ON CONFLICT(path) DO "
+        )
+        if on_conflict is ConflictPolicy.SKIP:
+            statement += "NOTHING"
+        else:
+            updates = [f'"{field}" = excluded."{field}"' for field in fields if field not in ("path", "date_created")]
+            statement += f"UPDATE SET {', '.join(updates)}"
+            if on_conflict is ConflictPolicy.NEWEST:
+                statement += (
+                    " WHERE repositories.last_analyzed IS NULL OR excluded.last_analyzed > repositories.last_analyzed"
+                )
+
+        secondary_indexes = [index for index in models.Repository.__table__.indexes if not index.unique]
+        rows_read = 0
+        deferred = False
+        with self.engine.begin() as conn:
+            changes_before = conn.exec_driver_sql("SELECT total_changes()").scalar()
+            existing_rows = conn.exec_driver_sql("SELECT COUNT(*) FROM repositories").scalar()
+            for chunk in chunks:
+                if not deferred and rows_read >= existing_rows:
+                    for index in secondary_indexes:
+                        index.drop(conn, checkfirst=True)
+                    deferred = True
+                conn.exec_driver_sql(statement, chunk)
+                rows_read += len(chunk)
+            if deferred:
+                for index in secondary_indexes:
+                    index.create(conn)
+            rows_written = conn.exec_driver_sql("SELECT total_changes()").scalar() - changes_before
+        return rows_read, rows_written
+
+    def rescore(
+        self,
+        weights: Optional[Dict[str, float]] = None,
+        normalizers: Optional[Dict[str, float]] = None,
+        dry_run: bool = False,
+    ) -> Tuple[int, int]:
+        """Recompute social_signal for every repository from its stored metrics.
+
+        The metric columns are loaded as NumPy arrays and scored in one vectorized
+        pass; only rows whose score changed are written back, as a single
+        executemany UPDATE. As in analysis, a NULL optional metric (lines_of_code) is
+        left out of the score and the remaining weights scaled up; rows with any other
+        NULL metric cannot be scored and are left alone.
+
+        Returns:
+            Tuple of (rows scored, rows changed)
+        """
+        np = require_optional("numpy", "scoring")
+        weights = weights or settings.metrics.weights
+        normalizers = normalizers or settings.metrics.normalizers
+
+        column_list = ", ".join(f'"{column}"' for column in SCORE_COLUMNS)
+        with self.engine.begin() as conn:
+            rows = conn.exec_driver_sql(f"SELECT id, social_signal, {column_list} FROM repositories").fetchall()
+            # None becomes NaN in a float array
+            table = np.array(rows, dtype=np.float64).reshape(len(rows), len(SCORE_COLUMNS) + 2)
+            ids, current = table[:, 0].astype(np.int64), table[:, 1]
+            columns = dict(zip(SCORE_COLUMNS, table[:, 2:].T))
+
+            required = [index for index, column in enumerate(SCORE_COLUMNS) if column not in OPTIONAL_COLUMNS]
+            scored = ~np.isnan(table[:, 2:][:, required]).any(axis=1)
+            scores = score_columns(normalize_columns(columns, normalizers), weights)
+            changed = scored & ~np.isclose(scores, current, rtol=0, atol=1e-9)
+
+            if not dry_run and changed.any():
+                conn.exec_driver_sql(
+                    "UPDATE repositories SET social_signal = ? WHERE id = ?",
+                    list(zip(scores[changed].tolist(), ids[changed].tolist())),
+                )
+        return int(scored.sum()), int(changed.sum())
+
+    def sweep(
+        self,
+        weight_sets: "numpy.ndarray",
+        top_k: int = 10,
+        weights: Optional[Dict[str, float]] = None,
+        normalizers: Optional[Dict[str, float]] = None,
+    ) -> List[dict]:
+        """Rank stability of the stored corpus under alternative weight sets.
+
+        Each weight set (a column of weight_sets, in core.scoring.SCORE_TERMS order)
+        is compared with the ranking under the current weights, over the whole
+        corpus and within every group. As in rescore, a NULL optional metric
+        (lines_of_code) is left out of a row's score; rows with any other NULL
+        metric are left out of the sweep.
+
+        Returns:
+            One dict per group ("all" first) with the repo count and the mean and
+            minimum Kendall tau and top-K overlap across weight sets
+        """
+        np = require_optional("numpy", "scoring")
+        baseline = weight_vector(weights or settings.metrics.weights)
+        normalizers = normalizers or settings.metrics.normalizers
+
+        column_list = ", ".join(f'"{column}"' for column in SCORE_COLUMNS)
+        not_null = " AND ".join(
+            f'"{column}" IS NOT NULL' for column in SCORE_COLUMNS if column not in OPTIONAL_COLUMNS
+        )
+        with self.read_engine.connect() as conn:
+            rows = conn.exec_driver_sql(f'SELECT "group", {column_list} FROM repositories WHERE {not_null}').fetchall()
+        if not rows:
+            return []
+
+        groups = np.array([row[0] if row[0] is not None else "(none)" for row in rows], dtype=object)
+        table = np.array([row[1:] for row in rows], dtype=np.float64)
+        matrix = normalized_matrix(dict(zip(SCORE_COLUMNS, table.T)), normalizers)
+
+        results = []
+        for group in ["all", *sorted(set(groups))]:
+            members = matrix if group == "all" else matrix[groups == group]
+            stats = rank_stability(members, baseline, weight_sets, top_k)
+            results.append(
+                {
+                    "group": group,
+                    "repos": len(members),
+                    **{f"{name}_mean": float(values.mean()) for name, values in stats.items()},
+                    **{f"{name}_min": float(values.min()) for name, values in stats.items()},
+                },
+            )
+        return results
+
 
 def get_db(db_path: Optional[str] = None) -> Database:
     """Get or create database instance singleton."""
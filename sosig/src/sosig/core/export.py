@@ -0,0 +1,95 @@
+import io
+import csv
+import gzip
+import json
+import importlib
+from typing import IO, Any, List, Tuple, Iterable
+
+from sqlalchemy import Float, Integer
+
+from . import models
+from .config import Compression, ExportFormat
+
+Row = Tuple[Any, ...]
+
+
+def require_optional(module: str, extra: str):
+    """Import an optional dependency, naming the extra that provides it"""
+    try:
+        return importlib.import_module(module)
+    except ImportError:
+        raise ImportError(f"{module} is not installed; install it with: pip install 'sosig[{extra}]'")
+
+
+def _open_text(path: str, compression: Compression) -> IO[str]:
+    if compression is Compression.GZIP:
+        return gzip.open(path, "wt", encoding="utf-8", newline="")
+    if compression is Compression.ZSTD:
+        zstandard = require_optional("zstandard", "zstd")
+        raw = zstandard.ZstdCompressor().stream_writer(open(path, "wb"))
+        return io.TextIOWrapper(raw, encoding="utf-8", newline="")
+    return open(path, "w", encoding="utf-8", newline="")
+
+
+def _write_csv(chunks: Iterable[List[Row]], fields: List[str], out: IO[str]) -> None:
+    writer = csv.writer(out)
+    writer.writerow(fields)
+    for chunk in chunks:
+        writer.writerows(chunk)
+
+
+def _write_ndjson(chunks: Iterable[List[Row]], fields: List[str], out: IO[str]) -> None:
+    for chunk in chunks:
+        out.writelines(json.dumps(dict(zip(fields, row))) + "\n" for row in chunk)
+
+
+def _arrow_schema(fields: List[str]):
+    pa = require_optional("pyarrow", "parquet")
+    columns = models.Repository.__table__.columns
+
+    def arrow_type(column):
+        if isinstance(column.type, Integer):
+            return pa.int64()
+        if isinstance(column.type, Float):
+            return pa.float64()
+        return pa.string()
+
+    return pa.schema([pa.field(field, arrow_type(columns[field])) for field in fields])
+
+
+def _write_parquet(chunks: Iterable[List[Row]], fields: List[str], path: str, compression: Compression) -> None:
+    """Write each chunk as its own columnar row group"""
+    pa = require_optional("pyarrow", "parquet")
+    parquet = require_optional("pyarrow.parquet", "parquet")
+    schema = _arrow_schema(fields)
+    codec = "none" if compression is Compression.NONE else compression.value
+    with parquet.ParquetWriter(path, schema, compression=codec) as writer:
+        for chunk in chunks:
+            # Typed from the schema: a chunk where a nullable column is all NULL would otherwise infer `null`
+            arrays = [pa.array(column, type=field.type) for column, field in zip(zip(*chunk), schema)]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+
+
+def export_filename(timestamp: str, export_format: ExportFormat, compression: Compression) -> str:
+    """sosig_export_<timestamp>.<format>, with a compression suffix for text formats"""
+    # Parquet compresses its column chunks internally, so the file keeps a plain suffix
+    suffix = "" if export_format is ExportFormat.PARQUET else compression.suffix
+    return f"sosig_export_{timestamp}.{export_format.value}{suffix}"
+
+
+def write_export(
+    chunks: Iterable[List[Row]],
+    fields: List[str],
+    path: str,
+    export_format: ExportFormat = ExportFormat.CSV,
+    compression: Compression = Compression.NONE,
+) -> None:
+    """Stream row chunks to path in the requested format"""
+    if export_format is ExportFormat.PARQUET:
+        _write_parquet(chunks, fields, path, compression)
+        return
+    with _open_text(path, compression) as out:
+        if export_format is ExportFormat.NDJSON:
+            _write_ndjson(chunks, fields, out)
+        else:
+            _write_csv(chunks, fields, out)
@@ -0,0 +1,150 @@
+import io
+import csv
+import gzip
+import json
+import sqlite3
+import itertools
+from typing import IO, Any, List, Tuple, Callable, Iterator
+from pathlib import Path
+from contextlib import ExitStack, closing
+
+from sqlalchemy import Float, Integer
+
+from . import models
+from .export import Row, require_optional
+from .interfaces import RepoMetrics
+
+# Columns an import may carry; ids are reassigned by the target database
+IMPORT_FIELDS = RepoMetrics.get_metric_fields()
+REQUIRED_FIELDS = {"name", "path"}
+SQLITE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+
+RowChunks = Iterator[List[Row]]
+
+
+def _chunked(rows, chunk_size: int) -> RowChunks:
+    iterator = iter(rows)
+    while chunk := list(itertools.islice(iterator, chunk_size)):
+        yield chunk
+
+
+def _open_text(path: str) -> IO[str]:
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", newline="")
+    if path.endswith(".zst"):
+        zstandard = require_optional("zstandard", "zstd")
+        raw = zstandard.ZstdDecompressor().stream_reader(open(path, "rb"))
+        return io.TextIOWrapper(raw, encoding="utf-8", newline="")
+    return open(path, encoding="utf-8", newline="")
+
+
+def _select_fields(available: List[str], path: str) -> List[str]:
+    fields = [field for field in available if field in IMPORT_FIELDS]
+    missing = REQUIRED_FIELDS - set(fields)
+    if missing:
+        raise ValueError(f"{path} is missing required fields: {', '.join(sorted(missing))}")
+    return fields
+
+
+def _csv_converter(field: str) -> Callable[[str], Any]:
+    """CSV cells are text; empty cells are NULL and numbers get their column type back"""
+    column_type = models.Repository.__table__.columns[field].type
+    if isinstance(column_type, Integer):
+        # Tolerate "12.0" from tools that write every number as a float
+        return lambda value: int(float(value)) if value else None
+    if isinstance(column_type, Float):
+        return lambda value: float(value) if value else None
+    return lambda value: value if value else None
+
+
+def _read_csv(path: str, chunk_size: int) -> Tuple[List[str], RowChunks]:
+    # The file is closed here if the header is rejected, otherwise once rows() is exhausted
+    with ExitStack() as stack:
+        out = stack.enter_context(_open_text(path))
+        reader = csv.reader(out)
+        header = next(reader, [])
+        fields = _select_fields(header, path)
+        owned = stack.pop_all()
+    positions = [header.index(field) for field in fields]
+    converters = [_csv_converter(field) for field in fields]
+
+    def rows():
+        with owned:
+            for record in reader:
+                if len(record) != len(header):
+                    raise ValueError(
+                        f"{path} line {reader.line_num} has {len(record)} fields, the header has {len(header)}",
+                    )
+                yield tuple(convert(record[position]) for convert, position in zip(converters, positions))
+
+    return fields, _chunked(rows(), chunk_size)
+
+
+def _read_ndjson(path: str, chunk_size: int) -> Tuple[List[str], RowChunks]:
+    with ExitStack() as stack:
+        out = stack.enter_context(_open_text(path))
+        lines = (line for line in out if line.strip())
+        first = next(lines, None)
+        if first is None:
+            return _select_fields(IMPORT_FIELDS, path), iter(())
+        fields = _select_fields(list(json.loads(first)), path)
+        owned = stack.pop_all()
+
+    def rows():
+        with owned:
+            for line in itertools.chain([first], lines):
+                record = json.loads(line)
+                yield tuple(record.get(field) for field in fields)
+
+    return fields, _chunked(rows(), chunk_size)
+
+
+def _read_parquet(path: str, chunk_size: int) -> Tuple[List[str], RowChunks]:
+    parquet = require_optional("pyarrow.parquet", "parquet")
+    parquet_file = parquet.ParquetFile(path)
+    fields = _select_fields(parquet_file.schema_arrow.names, path)
+
+    def chunks():
+        for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=fields):
+            yield list(zip(*(column.to_pylist() for column in batch.columns)))
+
+    return fields, chunks()
+
+
+def _read_sqlite(path: str, chunk_size: int) -> Tuple[List[str], RowChunks]:
+    """Read the repositories table of another sosig database"""
+    with ExitStack() as stack:
+        # as_uri percent-encodes the path, so "?", "#" and "%" in it stay part of the file name
+        uri = f"{Path(path).resolve().as_uri()}?mode=ro"
+        conn = stack.enter_context(closing(sqlite3.connect(uri, uri=True)))
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(repositories)")]
+        fields = _select_fields(columns, path)
+        owned = stack.pop_all()
+
+    column_list = ", ".join(f'"{field}"' for field in fields)
+
+    def chunks():
+        with owned:
+            cursor = conn.execute(f"SELECT {column_list} FROM repositories")
+            while chunk := cursor.fetchmany(chunk_size):
+                yield chunk
+
+    return fields, chunks()
+
+
+def read_import(path: str, chunk_size: int = 50_000) -> Tuple[List[str], RowChunks]:
+    """Detect the format of an export (or sosig database) and stream its rows in chunks
+
+    Returns the importable fields present in the file and an iterator of row chunks
+    in that field order.
+    """
+    name = path.removesuffix(".gz").removesuffix(".zst")
+    if name.endswith(".parquet"):
+        return _read_parquet(path, chunk_size)
+    if name.endswith(".ndjson") or name.endswith(".jsonl"):
+        return _read_ndjson(path, chunk_size)
+    if name.endswith(".csv"):
+        return _read_csv(path, chunk_size)
+    if name.endswith(SQLITE_SUFFIXES):
+        return _read_sqlite(path, chunk_size)
+    raise ValueError(f"Cannot tell the format of {path}; expected .csv, .ndjson, .parquet or a sosig .db")
@@ -1,5 +1,5 @@
 import time
-from typing import List, Optional, Protocol
+from typing import List, Iterator, Optional, Protocol
 from dataclasses import fields, dataclass
 
 
@@ -15,13 +15,16 @@ class RepoMetrics:
     contributor_count: int
     stars: int
     commit_count: int
-    lines_of_code: int
+    lines_of_code: Optional[int]
     open_issues: int
     social_signal: float
     group: Optional[str] = None
     id: Optional[int] = None
     last_analyzed: float = time.time()
     date_created: float = time.time()
+    head_sha: Optional[str] = None
+    history_state: Optional[str] = None
+    commit_activity: Optional[bytes] = None
 
     @classmethod
     def get_metric_fields(cls) -> List[str]:
@@ -45,7 +48,7 @@ class GitHubAnalyzer(Protocol):
     def get_contributor_count(self) -> int: ...
     def get_stars(self) -> int: ...
     def get_commit_count(self) -> int: ...
-    def get_lines_of_code(self) -> int: ...
+    def get_lines_of_code(self) -> Optional[int]: ...
     def get_open_issues(self) -> int: ...
     def calculate_social_signal(self) -> RepoMetrics: ...
 
@@ -54,6 +57,7 @@ class CommandRunner(Protocol):
     """Protocol defining command execution interface"""
 
     def run_command(self, command: List[str], cwd: str) -> str: ...
+    def stream_command(self, command: List[str], cwd: str) -> Iterator[str]: ...
 
 
 class MetricsNormalizer(Protocol):
@@ -0,0 +1,143 @@
+import zlib
+from functools import lru_cache
+from typing import List, Tuple, Callable, Optional
+
+from sqlalchemy import text, inspect
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.engine import Connection
+
+from . import models
+from .logger import log
+from .interfaces import RepoMetrics
+
+
+def _add_missing_columns(conn: Connection) -> None:
+    """Add model columns introduced after a database was created (SQLite ADD COLUMN)"""
+    existing_columns = {column["name"] for column in inspect(conn).get_columns("repositories")}
+    for column in models.Repository.__table__.columns:
+        if column.name not in existing_columns:
+            column_type = column.type.compile(dialect=conn.dialect)
+            conn.execute(text(f'ALTER TABLE repositories ADD COLUMN "{column.name}" {column_type}'))
+
+
+def _baseline(conn: Connection) -> None:
+    """Create the repositories table, or bring a pre-versioning one up to date"""
+    inspector = inspect(conn)
+    if "repositories" not in inspector.get_table_names():
+        models.Base.metadata.create_all(conn)
+        return
+
+    _add_missing_columns(conn)
+
+    # Collapse duplicate paths onto their latest analysis before the unique path index
+    conn.execute(
+        text(
+            "DELETE FROM repositories WHERE id NOT IN ("
+            "SELECT id FROM (SELECT id, ROW_NUMBER() OVER ("
+            "PARTITION BY path ORDER BY last_analyzed DESC, id DESC) AS rank FROM repositories) "
+            "WHERE rank = 1)",
+        ),
+    )
+    conn.execute(text("CREATE UNIQUE INDEX IF NOT EXISTS ix_repositories_path ON repositories (path)"))
+
+
+def _secondary_indexes(conn: Connection) -> None:
+    """Index the columns used for group filters and sorted listings"""
+    for index in models.Repository.__table__.indexes:
+        index.create(conn, checkfirst=True)
+
+
+def _snapshots(conn: Connection) -> None:
+    """Add the snapshot history table, seeded with each repository's latest analysis"""
+    snapshots = models.RepositorySnapshot
+    snapshots.__table__.create(conn, checkfirst=True)
+    encoded = [
+        f"CAST(ROUND({field} * {snapshots.SCALES[field]}) AS INTEGER)" if field in snapshots.SCALES else field
+        for field in snapshots.METRIC_FIELDS
+    ]
+    conn.execute(
+        text(
+            f"INSERT OR IGNORE INTO repository_snapshots (repo_id, analyzed_at, {', '.join(snapshots.METRIC_FIELDS)}) "
+            f"SELECT id, CAST(last_analyzed AS INTEGER), {', '.join(encoded)} FROM repositories "
+            "WHERE last_analyzed IS NOT NULL",
+        ),
+    )
+
+
+def _commit_activity(conn: Connection) -> None:
+    """Add the per-day commit histogram column"""
+    _add_missing_columns(conn)
+
+
+def _schema_meta(conn: Connection) -> None:
+    """Add the key/value table holding the validated schema fingerprint"""
+    conn.execute(text("CREATE TABLE IF NOT EXISTS schema_meta (name VARCHAR PRIMARY KEY, value VARCHAR NOT NULL)"))
+
+
+# Applied in order; a database at version N has run the first N migrations
+MIGRATIONS: List[Callable[[Connection], None]] = [
+    _baseline,
+    _secondary_indexes,
+    _snapshots,
+    _commit_activity,
+    _schema_meta,
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def get_version(conn: Connection) -> int:
+    return conn.execute(text("PRAGMA user_version")).scalar()
+
+
+@lru_cache(maxsize=None)
+def schema_fingerprint() -> str:
+    """Hash of the schema version and model fields, as stored in schema_meta"""
+    parts = [str(SCHEMA_VERSION), *RepoMetrics.get_metric_fields(), "|", *models.Repository.__table__.columns.keys()]
+    checksum = zlib.crc32("\0".join(parts).encode())
+    return f"{checksum:08x}"
+
+
+def read_stamp(conn: Connection) -> Tuple[int, Optional[str]]:
+    """Read the schema version and recorded fingerprint in one statement"""
+    try:
+        return tuple(
+            conn.execute(
+                text(
+                    "SELECT user_version, (SELECT value FROM schema_meta WHERE name = 'fingerprint') "
+                    "FROM pragma_user_version",
+                ),
+            ).one(),
+        )
+    except OperationalError:
+        # No schema_meta table yet: a new database or one from before the fingerprint
+        return get_version(conn), None
+
+
+def is_current(conn: Connection) -> bool:
+    """Whether the database was already upgraded and validated by this schema"""
+    return read_stamp(conn) == (SCHEMA_VERSION, schema_fingerprint())
+
+
+def upgrade(conn: Connection) -> int:
+    """Apply pending migrations and record the schema version in PRAGMA user_version"""
+    current = get_version(conn)
+    if current > SCHEMA_VERSION:
+        raise RuntimeError(f"Database schema version {current} is newer than this sosig ({SCHEMA_VERSION})")
+    for version, migration in enumerate(MIGRATIONS[current:], start=current + 1):
+        log.debug(f"Applying schema migration {version}: {migration.__name__}")
+        migration(conn)
+        # PRAGMA doesn't accept bound parameters
+        conn.execute(text(f"PRAGMA user_version = {version}"))
+    return SCHEMA_VERSION
+
+
+def stamp(conn: Connection) -> None:
+    """Record the fingerprint of a validated schema so later opens can skip inspection"""
+    conn.execute(
+        text(
+            "INSERT INTO schema_meta (name, value) VALUES ('fingerprint', :value) "
+            "ON CONFLICT(name) DO UPDATE SET value = excluded.value",
+        ),
+        {"value": schema_fingerprint()},
+    )
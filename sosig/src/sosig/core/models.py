@@ -1,6 +1,7 @@
 import time
+from typing import Set, Dict, List, ClassVar
 
-from sqlalchemy import Float, Column, String, Integer
+from sqlalchemy import Text, Float, Index, Column, String, Integer, LargeBinary
 from sqlalchemy.ext.declarative import declarative_base
 
 from .interfaces import RepoMetrics
@@ -10,6 +11,15 @@ Base = declarative_base()
 
 class Repository(Base):
     __tablename__ = "repositories"
+    __table_args__ = (
+        # One row per analyzed checkout; the conflict target for bulk upserts
+        Index("ix_repositories_path", "path", unique=True),
+        # Group filters and the sort keys of `db list`
+        Index("ix_repositories_group", "group"),
+        Index("ix_repositories_social_signal", "social_signal"),
+        Index("ix_repositories_stars", "stars"),
+        Index("ix_repositories_last_analyzed", "last_analyzed"),
+    )
 
     # Define SQLAlchemy columns explicitly
     id = Column(Integer, primary_key=True)
@@ -27,6 +37,11 @@ class Repository(Base):
     open_issues = Column(Integer, nullable=True)
     group = Column(String, nullable=True)
     date_created = Column(Float, nullable=False, default=time.time)
+    # HEAD at analysis time and the serialized HistoryStats, for incremental re-analysis
+    head_sha = Column(String, nullable=True)
+    history_state = Column(Text, nullable=True)
+    # Commits per day, packed by utils.git_history.encode_daily_commits
+    commit_activity = Column(LargeBinary, nullable=True)
 
     def __repr__(self) -> str:
         return f"Repository(name={self.name}, social_signal={self.social_signal})"
@@ -45,6 +60,19 @@ class Repository(Base):
             **{field: getattr(metrics, field) for field in RepoMetrics.get_metric_fields()},
         )
 
+    # Resume state for the next analysis; history_state holds every contributor name
+    INTERNAL_FIELDS: ClassVar[Set[str]] = {"head_sha", "history_state"}
+
+    @classmethod
+    def tabular_fields(cls) -> List[str]:
+        """Columns that fit in text or columnar exports, i.e. all but binary blobs"""
+        return [column.name for column in cls.__table__.columns if not isinstance(column.type, LargeBinary)]
+
+    @classmethod
+    def listing_fields(cls) -> List[str]:
+        """Columns projected for listings: tabular fields without internal resume state"""
+        return [field for field in cls.tabular_fields() if field not in cls.INTERNAL_FIELDS]
+
     @classmethod
     def validate_fields(cls):
         """Validate that Repository model matches RepoMetrics fields"""
@@ -59,3 +87,58 @@ class Repository(Base):
                 f"Missing fields: {missing}\n"
                 f"Extra fields: {extra}",
             )
+
+
+class RepositorySnapshot(Base):
+    """One row per analysis run, kept alongside the latest result in repositories"""
+
+    __tablename__ = "repository_snapshots"
+    # WITHOUT ROWID stores rows in primary key order, so a repo's history is one contiguous range
+    __table_args__ = {"sqlite_with_rowid": False}
+
+    # Fixed-point scales for the float metrics; SQLite stores small integers in 1-4 bytes instead of 8
+    SCALES: ClassVar[Dict[str, int]] = {
+        "age_days": 100,
+        "update_frequency_days": 100,
+        "social_signal": 1000,
+    }
+    METRIC_FIELDS: ClassVar[List[str]] = [
+        "age_days",
+        "update_frequency_days",
+        "contributor_count",
+        "stars",
+        "commit_count",
+        "lines_of_code",
+        "open_issues",
+        "social_signal",
+    ]
+
+    repo_id = Column(Integer, primary_key=True)
+    analyzed_at = Column(Integer, primary_key=True)  # epoch seconds
+    age_days = Column(Integer, nullable=True)
+    update_frequency_days = Column(Integer, nullable=True)
+    contributor_count = Column(Integer, nullable=True)
+    stars = Column(Integer, nullable=True)
+    commit_count = Column(Integer, nullable=True)
+    lines_of_code = Column(Integer, nullable=True)
+    open_issues = Column(Integer, nullable=True)
+    social_signal = Column(Integer, nullable=True)
+
+    @classmethod
+    def encode(cls, metrics: RepoMetrics) -> dict:
+        """Snapshot row values for stored metrics (which must have an id)"""
+        analyzed_at = metrics.last_analyzed if metrics.last_analyzed is not None else time.time()
+        row = {"repo_id": metrics.id, "analyzed_at": int(analyzed_at)}
+        for field in cls.METRIC_FIELDS:
+            value = getattr(metrics, field)
+            row[field] = None if value is None else round(value * cls.SCALES.get(field, 1))
+        return row
+
+    @classmethod
+    def decode(cls, row) -> dict:
+        """Metric values of a snapshot row, keyed like RepoMetrics with analyzed_at as last_analyzed"""
+        values = {"last_analyzed": float(row.analyzed_at)}
+        for field in cls.METRIC_FIELDS:
+            value = getattr(row, field)
+            values[field] = value if value is None or field not in cls.SCALES else value / cls.SCALES[field]
+        return values
@@ -0,0 +1,41 @@
+import os
+from pathlib import Path
+
+# Kept apart from config so short-lived commands can find files without importing pydantic
+PROJECT_NAME = "sosig"
+
+# Default DatabaseConfig.filename; `config show --db-path` reads it without building settings
+DATABASE_FILENAME = "github_metrics.db"
+
+
+class PathManager:
+    """Manages XDG-compliant application paths"""
+
+    @staticmethod
+    def get_data_dir() -> Path:
+        """Get XDG data directory for the application"""
+        base_dir = (
+            Path(os.environ.get("XDG_DATA_HOME", ""))
+            if os.environ.get("XDG_DATA_HOME")
+            else Path.home() / ".local" / "share"
+        )
+        data_dir = base_dir / PROJECT_NAME
+        data_dir.mkdir(parents=True, exist_ok=True)
+        return data_dir
+
+    @staticmethod
+    def get_workspace_dir() -> Path:
+        """Get workspace directory for temporary repository operations"""
+        return PathManager.get_data_dir() / "workspace"
+
+    @staticmethod
+    def get_config_dir() -> Path:
+        """Get XDG config directory for the application"""
+        base_dir = (
+            Path(os.environ.get("XDG_CONFIG_HOME", ""))
+            if os.environ.get("XDG_CONFIG_HOME")
+            else Path.home() / ".config"
+        )
+        config_dir = base_dir / PROJECT_NAME
+        config_dir.mkdir(parents=True, exist_ok=True)
+        return config_dir
@@ -0,0 +1,98 @@
+import re
+import operator
+from typing import Any, List, Optional
+
+from sqlalchemy import Float, Integer, or_, and_, tuple_
+from sqlalchemy.sql import ColumnElement
+
+from .models import Repository
+from .interfaces import RepoMetrics
+
+# Longest operators first so ">=" isn't read as ">"
+FILTER_OPERATORS = {
+    ">=": operator.ge,
+    "<=": operator.le,
+    "!=": operator.ne,
+    "==": operator.eq,
+    ">": operator.gt,
+    "<": operator.lt,
+    "=": operator.eq,
+}
+_FILTER_PATTERN = re.compile(
+    r"^\s*(?P<field>\w+)\s*(?P<op>" + "|".join(re.escape(op) for op in FILTER_OPERATORS) + r")\s*(?P<value>\S+)\s*$",
+)
+
+
+def numeric_fields() -> List[str]:
+    """Repository columns that --where filters can compare"""
+    return [
+        field
+        for field in RepoMetrics.get_metric_fields()
+        if isinstance(getattr(Repository, field).type, (Float, Integer))
+    ]
+
+
+def parse_filter(expression: str) -> ColumnElement:
+    """Turn `field<op>value` (e.g. `stars>=100`) into a SQL condition on a numeric column"""
+    match = _FILTER_PATTERN.match(expression)
+    if not match:
+        raise ValueError(f"Invalid filter '{expression}'. Expected <field><op><number>, e.g. stars>=100")
+    field, op, value = match.group("field", "op", "value")
+    if field not in numeric_fields():
+        raise ValueError(f"Cannot filter on '{field}'. Numeric fields are: {', '.join(numeric_fields())}")
+    try:
+        number = float(value)
+    except ValueError:
+        raise ValueError(f"Invalid number '{value}' in filter '{expression}'")
+    return FILTER_OPERATORS[op](getattr(Repository, field), number)
+
+
+def _sort_value(sort_by: str, value: str) -> Any:
+    column_type = getattr(Repository, sort_by).type
+    if isinstance(column_type, Integer):
+        return int(value)
+    if isinstance(column_type, Float):
+        return float(value)
+    return value
+
+
+def parse_cursor(cursor: str, sort_by: str) -> ColumnElement:
+    """Condition selecting rows after a `value:id` cursor in `sort_by DESC, id DESC` order
+
+    An empty value stands for NULL, which sorts after every other value.
+    """
+    value, separator, last_id = cursor.rpartition(":")
+    if not separator:
+        raise ValueError(f"Invalid cursor '{cursor}'. Expected <value>:<id>")
+    try:
+        last_id = int(last_id)
+        value = _sort_value(sort_by, value) if value else None
+    except ValueError:
+        raise ValueError(f"Invalid cursor '{cursor}' for sort field '{sort_by}'")
+
+    column = getattr(Repository, sort_by)
+    if value is None:
+        return and_(column.is_(None), Repository.id < last_id)
+    # Row-value comparison walks the (column, rowid) index; NULLs always come later
+    return or_(tuple_(column, Repository.id) < tuple_(value, last_id), column.is_(None))
+
+
+def format_cursor(metrics: RepoMetrics, sort_by: str) -> str:
+    """Cursor pointing just past metrics, for --after"""
+    value = getattr(metrics, sort_by)
+    return f"{'' if value is None else value}:{metrics.id}"
+
+
+def build_conditions(
+    sort_by: str,
+    group: Optional[str] = None,
+    filters: Optional[List[str]] = None,
+    after: Optional[str] = None,
+) -> List[ColumnElement]:
+    """SQL conditions for a filtered, keyset-paginated repository listing"""
+    conditions = [parse_filter(expression) for expression in filters or []]
+    if group is not None:
+        conditions.append(Repository.group == group)
+    if after:
+        conditions.append(parse_cursor(after, sort_by))
+    return conditions
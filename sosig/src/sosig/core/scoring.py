@@ -0,0 +1,216 @@
+import math
+import itertools
+from typing import TYPE_CHECKING, Dict, Optional
+
+from .export import require_optional
+
+if TYPE_CHECKING:
+    import numpy
+
+# (weight, raw metric column, normalizer) for each score term, in the order
+# GitHubAnalyzerImpl._normalize_metrics sums them so results match to the bit
+SCORE_TERMS = (
+    ("age", "age_days", "max_age_days"),
+    ("update_frequency", "update_frequency_days", "max_update_frequency_days"),
+    ("contributors", "contributor_count", "max_contributors"),
+    ("stars", "stars", "max_stars"),
+    ("commits", "commit_count", "max_commits"),
+    ("lines_of_code", "lines_of_code", "max_lines_of_code"),
+    ("open_issues", "open_issues", "max_open_issues"),
+)
+SCORE_COLUMNS = [column for _, column, _ in SCORE_TERMS]
+
+# Metrics a checkout may be unable to provide (see CloneStrategy.unavailable_metrics);
+# NULL here means the term is left out of the score, not that the row is incomplete
+OPTIONAL_COLUMNS = {"lines_of_code"}
+
+# Frequent updates mean a small update interval, so this term counts down from 1
+INVERTED_TERMS = {"update_frequency"}
+
+
+def normalize_columns(columns: Dict[str, "numpy.ndarray"], normalizers: Dict[str, float]) -> dict:
+    """Vectorized GitHubAnalyzerImpl._normalize_metrics over whole metric columns"""
+    np = require_optional("numpy", "scoring")
+    normalized = {}
+    for weight, column, normalizer in SCORE_TERMS:
+        values = np.minimum(columns[column] / normalizers[normalizer], 1.0)
+        normalized[weight] = 1.0 - values if weight in INVERTED_TERMS else values
+    return normalized
+
+
+def score_columns(normalized: dict, weights: Dict[str, float]) -> "numpy.ndarray":
+    """Vectorized GitHubAnalyzerImpl._calculate_score; NaN (NULL) terms are left out and the rest scaled up"""
+    np = require_optional("numpy", "scoring")
+    total, available_weight, complete = 0.0, 0.0, True
+    for key, values in normalized.items():
+        present = ~np.isnan(values)
+        total = total + weights[key] * np.where(present, values, 0.0)
+        available_weight = available_weight + weights[key] * present
+        complete = complete & present
+    scores = total * 100
+    total_weight = sum(weights[key] for key in normalized)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        scaled = np.where(available_weight > 0, scores * total_weight / available_weight, 0.0)
+    return np.where(complete, scores, scaled)
+
+
+def normalized_matrix(columns: Dict[str, "numpy.ndarray"], normalizers: Dict[str, float]) -> "numpy.ndarray":
+    """Normalized metrics as a (repos × terms) matrix, one column per SCORE_TERMS entry"""
+    np = require_optional("numpy", "scoring")
+    normalized = normalize_columns(columns, normalizers)
+    return np.column_stack([normalized[weight] for weight, _, _ in SCORE_TERMS])
+
+
+def weight_vector(weights: Dict[str, float]) -> "numpy.ndarray":
+    """A weights dict as a vector in SCORE_TERMS order"""
+    np = require_optional("numpy", "scoring")
+    return np.array([weights[weight] for weight, _, _ in SCORE_TERMS])
+
+
+def weight_grid(step: float) -> "numpy.ndarray":
+    """Every weight vector on the simplex whose entries are multiples of step, as (terms × sets)"""
+    np = require_optional("numpy", "scoring")
+    parts = round(1 / step)
+    if parts < 1 or not math.isclose(parts * step, 1.0):
+        raise ValueError(f"Grid step {step} must divide 1 evenly")
+    terms = len(SCORE_TERMS)
+    # Stars and bars: each choice of terms - 1 bar positions among parts + terms - 1 slots is one vector
+    bars = np.array([*itertools.combinations(range(parts + terms - 1), terms - 1)]).reshape(-1, terms - 1)
+    edges = np.column_stack([np.full(len(bars), -1), bars, np.full(len(bars), parts + terms - 1)])
+    return (np.diff(edges, axis=1) - 1).T / parts
+
+
+def sample_weights(samples: int, seed: Optional[int] = None) -> "numpy.ndarray":
+    """samples weight vectors drawn uniformly from the simplex, as (terms × sets)"""
+    np = require_optional("numpy", "scoring")
+    return np.random.default_rng(seed).dirichlet(np.ones(len(SCORE_TERMS)), samples).T
+
+
+def _kendall_pairs(count: int, max_pairs: int, rng: "numpy.random.Generator") -> tuple:
+    """Index pairs for Kendall tau: all of them for small groups, a uniform sample for large ones"""
+    np = require_optional("numpy", "scoring")
+    if count * (count - 1) // 2 <= max_pairs:
+        return np.triu_indices(count, k=1)
+    left = rng.integers(0, count, max_pairs)
+    right = rng.integers(0, count - 1, max_pairs)
+    # Shift to skip left itself, so each pair holds two distinct repos
+    return left, right + (right >= left)
+
+
+def _absence_patterns(matrix: "numpy.ndarray") -> tuple:
+    """Group rows by which terms they are missing (NaN), in contiguous runs
+
+    Returns:
+        Tuple of (matrix reordered by pattern with NaN zeroed, patterns as a
+        (patterns × terms) absent mask, each reordered row's pattern index)
+    """
+    np = require_optional("numpy", "scoring")
+    absent = np.isnan(matrix)
+    bits = np.arange(matrix.shape[1])
+    keys, row_patterns = np.unique(absent @ (1 << bits), return_inverse=True)
+    row_patterns = row_patterns.reshape(-1)
+    order = np.argsort(row_patterns, kind="stable")
+    patterns = ((keys[:, None] >> bits) & 1).astype(bool)
+    return np.where(absent, 0.0, matrix)[order], patterns, row_patterns[order]
+
+
+def _pattern_scales(patterns: "numpy.ndarray", weights: "numpy.ndarray") -> "numpy.ndarray":
+    """Per-set score factors (sets × patterns) that spread absent terms' weight over the rest, as score_columns does"""
+    np = require_optional("numpy", "scoring")
+    total = weights.sum(axis=0)[:, None]
+    available = total - weights.T @ patterns.T
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(available > 0, total / available, 0.0)
+
+
+def _top_k_pool(matrix: "numpy.ndarray", base_scores: "numpy.ndarray", k: int) -> "numpy.ndarray":
+    """Rows that score highly under the baseline or on any single term.
+
+    The k-th best score among these rows is a lower bound on the k-th best score
+    over all rows, for any weight set, and is usually a tight one.
+    """
+    np = require_optional("numpy", "scoring")
+    count = len(matrix)
+    size = min(4 * k, count)
+    if size == count:
+        return np.arange(count)
+    columns = np.column_stack([base_scores, matrix])
+    return np.unique(np.argpartition(-columns, size - 1, axis=0)[:size])
+
+
+def rank_stability(
+    matrix: "numpy.ndarray",
+    baseline: "numpy.ndarray",
+    weight_sets: "numpy.ndarray",
+    top_k: int = 10,
+    max_pairs: int = 200_000,
+    block_elements: int = 1 << 24,
+    seed: int = 0,
+) -> Dict[str, "numpy.ndarray"]:
+    """Compare the ranking under baseline weights with the ranking under each weight set.
+
+    Scores for all sets are one (terms × sets).T @ (repos × terms).T product, taken in
+    blocks of sets so at most block_elements scores are held at once. Kendall tau-b
+    is exact up to max_pairs repo pairs and estimated from a pair sample above that.
+    A NaN term (a NULL optional metric) is left out of that repo's score and its
+    other weights scaled up, as in rescore.
+
+    Returns:
+        Dict of per-set arrays: "kendall_tau" and "top_k_overlap" (fraction of the
+        baseline top_k still in the top_k)
+    """
+    np = require_optional("numpy", "scoring")
+    count, sets = len(matrix), weight_sets.shape[1]
+    # Rows are reordered internally; every statistic is invariant to that
+    matrix, patterns, row_patterns = _absence_patterns(matrix)
+    # Runs of rows with absent terms, whose scores are scaled up per weight set
+    runs = [
+        (index, *np.searchsorted(row_patterns, [index, index + 1])) for index in np.flatnonzero(patterns.any(axis=1))
+    ]
+    left, right = _kendall_pairs(count, max_pairs, np.random.default_rng(seed))
+    # Each pair's order under a weight set is the sign of one dot product, also when both
+    # rows share an absence pattern (and so a positive scale). Pairs mixing patterns come
+    # last and are scored one side at a time.
+    mixed = row_patterns[left] != row_patterns[right]
+    left, right = np.concatenate([left[~mixed], left[mixed]]), np.concatenate([right[~mixed], right[mixed]])
+    linear = len(left) - int(mixed.sum())
+    pair_diffs = matrix[left[:linear]] - matrix[right[:linear]]
+    sides = [(matrix[side[linear:]], row_patterns[side[linear:]]) for side in (left, right)]
+
+    def block_scores(weights: "numpy.ndarray") -> tuple:
+        """Scores (sets × repos) and pair orders (sets × pairs) under weight columns"""
+        scores = weights.T @ matrix.T
+        if not runs:
+            return scores, np.sign(weights.T @ pair_diffs.T)
+        scales = _pattern_scales(patterns, weights)
+        for index, start, stop in runs:
+            scores[:, start:stop] *= scales[:, index, None]
+        (left_rows, left_patterns), (right_rows, right_patterns) = sides
+        left_scores = (weights.T @ left_rows.T) * scales[:, left_patterns]
+        right_scores = (weights.T @ right_rows.T) * scales[:, right_patterns]
+        return scores, np.concatenate([np.sign(weights.T @ pair_diffs.T), np.sign(left_scores - right_scores)], axis=1)
+
+    base_scores, base_order = block_scores(baseline[:, None])
+    base_scores, base_order = base_scores[0], base_order[0]
+    base_ties = np.dot(base_order, base_order)
+
+    k = min(top_k, count)
+    base_top = np.argpartition(-base_scores, k - 1)[:k]
+    pool = _top_k_pool(matrix, base_scores, k)
+
+    tau, overlap = np.empty(sets), np.empty(sets)
+    block = max(1, block_elements // max(count, len(left), 1))
+    for start in range(0, sets, block):
+        stop = min(start + block, sets)
+        weights = weight_sets[:, start:stop]
+        scores, order = block_scores(weights)
+        denominator = np.sqrt(base_ties * np.einsum("sp,sp->s", order, order))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            tau[start:stop] = np.where(denominator > 0, order @ base_order / denominator, 1.0)
+
+        # k-th best score per set: bound it from the pool, then partition only the rows above the bound
+        bound = np.partition(scores[:, pool], len(pool) - k, axis=1)[:, len(pool) - k]
+        candidates = np.flatnonzero((scores >= bound[:, None]).any(axis=0))
+        threshold = np.partition(scores[:, candidates], len(candidates) - k, axis=1)[:, len(candidates) - k]
+        overlap[start:stop] = np.minimum((scores[:, base_top] >= threshold[:, None]).sum(axis=1), k) / k
+    return {"kendall_tau": tau, "top_k_overlap": overlap}
@@ -1,14 +1,43 @@
+import importlib
+
 import typer
+from typer.core import TyperGroup, TyperCommand
+
+# Command groups by name: (module, Typer attribute, help). A group's module, and
+# with it sqlalchemy and the rest of the stack, is imported only when it runs.
+COMMAND_GROUPS = {
+    "config": ("sosig.commands.config_cmds", "config_cmds", "config operations"),
+    "gh": ("sosig.commands.gh_cmds", "gh_cmds", "ghmetrics operations"),
+    "db": ("sosig.commands.db_cmds", "db_cmds", "database operations"),
+}
+
+
+class LazyGroup(TyperGroup):
+    """Top-level group that lists COMMAND_GROUPS from placeholders and loads one on use"""
+
+    def __init__(self, **attrs):
+        super().__init__(**attrs)
+        for name, (_, _, help) in COMMAND_GROUPS.items():
+            # Enough for --help listings and typo suggestions
+            self.commands[name] = TyperCommand(name=name, help=help)
+
+    def resolve_command(self, ctx, args):
+        name, command, args = super().resolve_command(ctx, args)
+        if name in COMMAND_GROUPS:
+            module, attribute, help = COMMAND_GROUPS[name]
+            command = typer.main.get_group(getattr(importlib.import_module(module), attribute))
+            command.name, command.help = name, help
+        return name, command, args
+
 
-from .commands.db_cmds import db_cmds
-from .commands.gh_cmds import gh_cmds
-from .commands.config_cmds import config_cmds
+# Plain help: the top level only lists COMMAND_GROUPS, and rich's help renderer
+# would more than double the startup time of `sosig --help`
+app = typer.Typer(add_completion=False, cls=LazyGroup, rich_markup_mode=None)
 
-app = typer.Typer(add_completion=False)
 
-app.add_typer(config_cmds, name="config", help="config operations")
-app.add_typer(gh_cmds, name="gh", help="ghmetrics operations")
-app.add_typer(db_cmds, name="db", help="database operations")
+@app.callback()
+def main():
+    """Score GitHub repositories by their social signals."""
 
 
 def entry_point():
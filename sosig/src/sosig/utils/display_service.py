@@ -1,8 +1,9 @@
 import time
-from typing import List
+from typing import List, Iterable
 
 import rich
 from rich.table import Table
+from rich.markup import escape
 from rich.console import Console
 from rich.progress import Progress, TextColumn, SpinnerColumn
 
@@ -80,7 +81,8 @@ class DisplayService:
         },
         "lines_of_code": {
             "label": "Lines of Code",
-            "format": str,
+            # NULL when the checkout had no working tree to count
+            "format": lambda x: "-" if x is None else str(x),
             "width": 12,
             "justify": "right",
         },
@@ -114,11 +116,11 @@ class DisplayService:
 
     def error(self, message: str) -> None:
         """Display an error message"""
-        self.console.print(f"[red]{message}[/red]")
+        self.console.print(f"[red]{escape(message)}[/red]")
 
     def warn(self, message: str) -> None:
         """Display a warning message"""
-        self.console.print(f"[yellow]{message}[/yellow]")
+        self.console.print(f"[yellow]{escape(message)}[/yellow]")
 
     def _create_table(self, title: str) -> Table:
         """Create a consistently styled table"""
@@ -160,11 +162,8 @@ class DisplayService:
 
         self.console.print(table)
 
-    def show_repository_list(self, repos: List[RepoMetrics], fields: List[str] = None) -> None:
-        """Display repository list in a table"""
-        if not repos:
-            self.warn("No repositories found in database")
-            return
+    def show_repository_list(self, repos: Iterable[RepoMetrics], fields: List[str] = None) -> None:
+        """Display repository list in a table, consuming repos lazily"""
 
         fields_to_show = fields or [
             "name",
@@ -196,6 +195,9 @@ class DisplayService:
             row_data = [self.FIELD_LABELS[field]["format"](getattr(metrics, field)) for field in fields_to_show]
             table.add_row(*row_data)
 
+        if not table.row_count:
+            self.warn("No repositories found in database")
+            return
         self.console.print(table)
 
     def create_progress(self) -> Progress:
@@ -212,7 +214,7 @@ class DisplayService:
 
     def success(self, message: str) -> None:
         """Display a success message"""
-        self.console.print(f"[green]{message}[/green]")
+        self.console.print(f"[green]{escape(message)}[/green]")
 
     def show_config(self, settings: Config, paths: dict) -> None:
         """Display configuration and paths"""
@@ -236,7 +238,7 @@ class DisplayService:
 
     def info(self, message: str) -> None:
         """Display an info message"""
-        self.console.print(message)
+        self.console.print(escape(message))
 
     def show_full_repository_details(self, repos: List[RepoMetrics]) -> None:
         """Display complete repository details in a table"""
@@ -277,5 +279,67 @@ class DisplayService:
 
         self.console.print(table)
 
+    def show_history(self, repo: RepoMetrics, snapshots: List[dict]) -> None:
+        """Display a repository's snapshot history, oldest first"""
+        if not snapshots:
+            self.warn(f"No snapshots recorded for {repo.path}")
+            return
+
+        fields_to_show = [
+            "last_analyzed",
+            "social_signal",
+            "stars",
+            "commit_count",
+            "contributor_count",
+            "open_issues",
+            "lines_of_code",
+            "update_frequency_days",
+        ]
+
+        table = self._create_table(f"History of {repo.name} ({repo.path})")
+        for field in fields_to_show:
+            field_config = self.FIELD_LABELS[field]
+            table.add_column(
+                "Analyzed" if field == "last_analyzed" else field_config["label"],
+                width=field_config["width"],
+                justify=field_config["justify"],
+                no_wrap=True,
+            )
+
+        for snapshot in snapshots:
+            row_data = [
+                "-" if snapshot[field] is None else self.FIELD_LABELS[field]["format"](snapshot[field])
+                for field in fields_to_show
+            ]
+            table.add_row(*row_data)
+
+        self.console.print(table)
+
+    def show_sweep_results(self, results: List[dict], weight_sets: int, top_k: int) -> None:
+        """Display per-group rank stability from a weight sweep"""
+        if not results:
+            self.warn("No repositories with complete metrics found in database")
+            return
+
+        table = self._create_table(f"Rank Stability over {weight_sets} Weight Sets")
+        table.add_column("Group", justify="left", no_wrap=True)
+        table.add_column("Repos", justify="right")
+        table.add_column("Tau Mean", justify="right")
+        table.add_column("Tau Min", justify="right")
+        table.add_column(f"Top-{top_k} Mean", justify="right")
+        table.add_column(f"Top-{top_k} Min", justify="right")
+
+        for row in results:
+            table.add_row(
+                row["group"],
+                str(row["repos"]),
+                f"{row['kendall_tau_mean']:.3f}",
+                f"{row['kendall_tau_min']:.3f}",
+                f"{row['top_k_overlap_mean']:.0%}",
+                f"{row['top_k_overlap_min']:.0%}",
+            )
+
+        self.console.print(table)
+
 
 display = DisplayService()
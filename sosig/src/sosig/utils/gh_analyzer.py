@@ -1,29 +1,59 @@
 import time
-from typing import Optional
+import asyncio
+from typing import Set, Optional
 
-from .gh_utils import GitHubAnalyzerImpl
+from .gh_utils import AsyncCommandRunner, GitHubAnalyzerImpl
 from .gh_repo_dao import RepositoryDAO
+from .git_history import HistoryStats, decode_daily_commits
 from ..core.config import settings
 from ..core.logger import log
 from ..core.models import Repository
+from ..core.interfaces import RepoMetrics
 
 
 class RepositoryAnalyzer:
     def __init__(self, repository_dao: RepositoryDAO):
         self.repository_dao = repository_dao
 
-    def analyze_repository(self, repo_path: str, force_update: bool = False, group: Optional[str] = None) -> Repository:
-        """Analyze repository and return metrics"""
+    def analyze_repository(
+        self,
+        repo_path: str,
+        force_update: bool = False,
+        group: Optional[str] = None,
+        skip_metrics: Optional[Set[str]] = None,
+        max_age_hours: Optional[float] = None,
+        save: bool = True,
+        async_runner: Optional[AsyncCommandRunner] = None,
+    ) -> Repository:
+        """Analyze repository and return metrics
+
+        skip_metrics names metrics the checkout cannot provide (see CloneStrategy).
+        Stored metrics younger than max_age_hours are returned unless force_update is set.
+        With save=False new metrics are returned unsaved (id None) for a batched save_many.
+        With async_runner, the metric commands run concurrently on a new event loop;
+        the runner must not be in use on another loop.
+        """
         try:
+            existing = self.repository_dao.get_by_path(repo_path)
             # Get existing metrics from database if not forcing update
-            if not force_update:
-                existing = self.repository_dao.get_by_path(repo_path)
-                if existing:
-                    return existing
+            if not force_update and existing and self.is_analysis_fresh(existing, max_age_hours):
+                return existing
 
-            # Calculate new metrics
-            analyzer = GitHubAnalyzerImpl(repo_path)
-            metrics = analyzer.calculate_social_signal(group)
+            # Calculate new metrics, resuming the history walk from the last analysis
+            previous_history = self._previous_history(existing)
+            analyzer = GitHubAnalyzerImpl(
+                repo_path,
+                skip_metrics=skip_metrics,
+                previous_history=previous_history,
+                previous_lines_of_code=existing.lines_of_code if existing else None,
+                async_runner=async_runner,
+            )
+            if async_runner:
+                metrics = asyncio.run(analyzer.calculate_social_signal_async(group))
+            else:
+                metrics = analyzer.calculate_social_signal(group)
+            if not save:
+                return metrics
 
             # Save and return the metrics
             return self.repository_dao.save_metrics(metrics)
@@ -31,8 +61,21 @@ class RepositoryAnalyzer:
             log.error(f"Error analyzing repository {repo_path}: {str(e)}")
             raise
 
-    def _is_analysis_fresh(self, repo: Repository) -> bool:
-        """Check if repository analysis is fresh enough"""
-        cache_ttl = settings.database.CACHE_TTL_HOURS * 3600
+    @staticmethod
+    def _previous_history(existing: Optional[RepoMetrics]) -> Optional[HistoryStats]:
+        """Stored history state to resume from, including its commit histogram"""
+        # Rows analyzed before commit_activity existed get one full walk to build it
+        if not existing or not existing.history_state or existing.commit_activity is None:
+            return None
+        history = HistoryStats.from_json(existing.history_state)
+        history.daily_commits = decode_daily_commits(existing.commit_activity)
+        return history
+
+    @staticmethod
+    def is_analysis_fresh(repo: RepoMetrics, max_age_hours: Optional[float] = None) -> bool:
+        """Check if repository analysis is fresh enough (defaults to CACHE_TTL_HOURS)"""
+        if max_age_hours is None:
+            max_age_hours = settings.database.CACHE_TTL_HOURS
+        cache_ttl = max_age_hours * 3600
         last_analyzed = getattr(repo, "last_analyzed", None) or 0
         return (time.time() - last_analyzed) < cache_ttl
@@ -1,9 +1,14 @@
 import time
-from typing import List, Optional
+import threading
+from typing import Dict, List, Iterable, Iterator, Optional
+
+from sqlalchemy import text
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
 from ..core.db import get_db
+from ..core.query import build_conditions
 from ..core.logger import log
-from ..core.models import Repository
+from ..core.models import Repository, RepositorySnapshot
 from ..core.interfaces import RepoMetrics
 
 
@@ -12,51 +17,141 @@ class RepositoryDAO:
 
     def __init__(self):
         self.db = get_db()
+        # SQLite allows a single writer; serialize saves from concurrent analysis workers
+        self._write_lock = threading.Lock()
 
     def get_by_path(self, path: str) -> Optional[RepoMetrics]:
         """Get repository by path."""
-        with self.db.get_session() as session:
+        with self.db.get_read_session() as session:
             repo = session.query(Repository).filter_by(path=path).first()
             if repo:
                 # Convert to RepoMetrics directly to avoid detached instance issues
                 return repo.to_metrics()
             return None
 
+    def find(self, repo: str) -> List[RepoMetrics]:
+        """Repositories whose path or name is repo; an exact path match wins."""
+        by_path = self.get_by_path(repo)
+        if by_path:
+            return [by_path]
+        with self.db.get_read_session() as session:
+            matches = session.query(Repository).filter_by(name=repo).order_by(Repository.path)
+            return [row.to_metrics() for row in matches]
+
     def get_all(self, sort_by: str = "social_signal") -> List[RepoMetrics]:
         """Get all repositories with optional sorting."""
-        with self.db.get_session() as session:
-            query = session.query(Repository)
-            if hasattr(Repository, sort_by):
-                query = query.order_by(getattr(Repository, sort_by).desc())
-            # Create detached copies of all repositories
-            return [
-                Repository(
-                    **{k: v for k, v in repo.__dict__.items() if not k.startswith("_")},
-                )
-                for repo in query.all()
-            ]
+        return list(self.iter_all(sort_by))
+
+    def iter_all(
+        self,
+        sort_by: str = "social_signal",
+        limit: Optional[int] = None,
+        group: Optional[str] = None,
+        filters: Optional[List[str]] = None,
+        after: Optional[str] = None,
+    ) -> Iterator[RepoMetrics]:
+        """Stream repositories with optional sorting, one query with bounded memory.
+
+        filters are `field<op>number` expressions and after is a `value:id` keyset
+        cursor (see core.query); all of them are applied in SQL.
+        """
+        conditions = build_conditions(sort_by, group=group, filters=filters, after=after)
+        return self.db.iter_repository_metrics(sort_by, conditions=conditions, limit=limit)
 
     def save_metrics(self, metrics: RepoMetrics) -> RepoMetrics:
         """Save or update repository metrics."""
-        with self.db.get_session() as session:
-            existing = session.query(Repository).filter_by(path=metrics.path).first()
-
-            if existing:
-                log.debug(f"Updating existing repository: {existing.path}")
-                # Update existing repository
-                for field in RepoMetrics.get_metric_fields():
-                    # Don't update date_created for existing records
-                    if field != "date_created":
-                        setattr(existing, field, getattr(metrics, field))
-                repo = existing
-            else:
-                # Create new repository
-                log.debug(f"Creating new repository: {metrics.path}")
-                repo = Repository.from_metrics(metrics)
-                # Set date_created for new records
-                repo.date_created = time.time()
-                session.add(repo)
-
-            session.commit()
-            # Return metrics object instead of Repository model
-            return repo.to_metrics()
+        return self.save_many([metrics])[0]
+
+    def save_many(self, metrics_list: List[RepoMetrics]) -> List[RepoMetrics]:
+        """Upsert a batch of repository metrics in a single transaction.
+
+        Rows are matched on path; date_created is only set for new records. Each
+        stored row is also recorded in the snapshot history, which is then compacted
+        for the saved repositories. Returns the stored metrics, with ids, in input order.
+        """
+        if not metrics_list:
+            return []
+        now = time.time()
+        # The last result for a path wins, as with successive save_metrics calls
+        fields = RepoMetrics.get_metric_fields()
+        rows = {metrics.path: {field: getattr(metrics, field) for field in fields} for metrics in metrics_list}
+        for row in rows.values():
+            row["date_created"] = now
+
+        statement = sqlite_insert(Repository)
+        statement = statement.on_conflict_do_update(
+            index_elements=[Repository.path],
+            # Don't update date_created for existing records
+            set_={field: statement.excluded[field] for field in fields if field != "date_created"},
+        ).returning(Repository)
+
+        with self._write_lock:
+            with self.db.get_session() as session:
+                stored = {repo.path: repo.to_metrics() for repo in session.scalars(statement, list(rows.values()))}
+                snapshot = sqlite_insert(RepositorySnapshot)
+                snapshot = snapshot.on_conflict_do_update(
+                    index_elements=[RepositorySnapshot.repo_id, RepositorySnapshot.analyzed_at],
+                    set_={field: snapshot.excluded[field] for field in RepositorySnapshot.METRIC_FIELDS},
+                )
+                session.execute(snapshot, [RepositorySnapshot.encode(metrics) for metrics in stored.values()])
+            self.db.compact_snapshots([metrics.id for metrics in stored.values()])
+        log.debug(f"Saved {len(stored)} repositories")
+        return [stored[metrics.path] for metrics in metrics_list]
+
+    def list_children(self, directory: str) -> List[RepoMetrics]:
+        """Repositories whose path is directly inside directory, not in a subdirectory of it"""
+        # "0" sorts right after "/", so this is a range scan of the path index
+        with self.db.get_read_session() as session:
+            rows = session.query(Repository).filter(
+                Repository.path > f"{directory}/",
+                Repository.path < f"{directory}0",
+            )
+            return [row.to_metrics() for row in rows if "/" not in row.path[len(directory) + 1 :]]
+
+    def relocate(self, moves: Dict[str, str], removals: Iterable[str] = ()) -> int:
+        """Re-key repositories from old to new paths and delete the rows at removals, in one transaction
+
+        A moved row takes the last component of its new path as its name. When the new
+        path is already stored, that row is kept and the old one's snapshots are merged
+        into its history. Returns the number of rows moved, merged or removed.
+        """
+        fields = ", ".join(RepositorySnapshot.METRIC_FIELDS)
+        changed = 0
+        with self._write_lock:
+            with self.db.get_session() as session:
+
+                def row_id(path: str) -> Optional[int]:
+                    statement = text("SELECT id FROM repositories WHERE path = :path")
+                    return session.execute(statement, {"path": path}).scalar()
+
+                def delete(repo_id: int) -> None:
+                    session.execute(text("DELETE FROM repository_snapshots WHERE repo_id = :id"), {"id": repo_id})
+                    session.execute(text("DELETE FROM repositories WHERE id = :id"), {"id": repo_id})
+
+                for old, new in moves.items():
+                    old_id, new_id = row_id(old), row_id(new)
+                    if old_id is None:
+                        continue
+                    if new_id is None:
+                        session.execute(
+                            text("UPDATE repositories SET path = :path, name = :name WHERE id = :id"),
+                            {"path": new, "name": new.rsplit("/", 1)[-1], "id": old_id},
+                        )
+                    else:
+                        session.execute(
+                            text(
+                                f"INSERT OR IGNORE INTO repository_snapshots (repo_id, analyzed_at, {fields}) "
+                                f"SELECT :new_id, analyzed_at, {fields} FROM repository_snapshots "
+                                "WHERE repo_id = :old_id",
+                            ),
+                            {"new_id": new_id, "old_id": old_id},
+                        )
+                        delete(old_id)
+                    changed += 1
+                for path in removals:
+                    repo_id = row_id(path)
+                    if repo_id is not None:
+                        delete(repo_id)
+                        changed += 1
+        log.debug(f"Relocated or removed {changed} repositories")
+        return changed
@@ -1,12 +1,22 @@
+import os
 import shutil
-from typing import List, Optional
+import hashlib
+from typing import List, Tuple, Iterable, Iterator, Optional
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 
+from ..core.config import LocalMode, CloneStrategy
 from ..core.logger import log
-from ..utils.gh_utils import GitHubAPIError, GitCommandError
+from ..utils.gh_utils import AsyncCommandRunner, GitHubAPIError, GitCommandError
 from ..core.interfaces import RepoMetrics
 from ..utils.gh_analyzer import RepositoryAnalyzer
 from ..utils.gh_repo_dao import RepositoryDAO
+from ..utils.mirror_cache import MirrorCache
+
+# Analysis results written per save_many transaction
+SAVE_BATCH_SIZE = 100
+# Workspace directory holding copies of local repositories
+LOCAL_DIRNAME = "local"
 
 
 class RepositoryService:
@@ -22,23 +32,176 @@ class RepositoryService:
         workspace: Path,
         force: bool = False,
         group: Optional[str] = None,
+        jobs: int = 1,
+        clone_strategy: CloneStrategy = CloneStrategy.FULL,
+        mirror_cache: Optional[MirrorCache] = None,
+        local_mode: LocalMode = LocalMode.COPY,
+        max_age_hours: Optional[float] = None,
+        stale_only: bool = False,
+        batch_size: int = SAVE_BATCH_SIZE,
     ) -> List[RepoMetrics]:
-        """Analyze multiple repositories and return their metrics"""
-        results = []
+        """Analyze multiple repositories and return their metrics in input order
+
+        With jobs > 1, clone and analysis run concurrently in a thread pool; the
+        work is dominated by git/gh subprocesses so threads are sufficient. Each
+        worker also runs a repository's history walk, metadata lookup and line count
+        concurrently on an event loop of its own.
+        With a mirror cache, remote repositories are fetched incrementally into
+        persistent mirrors instead of being cloned from scratch. local_mode controls
+        whether local paths are copied, shared-cloned or analyzed in place.
+        Repositories analyzed within max_age_hours (default CACHE_TTL_HOURS) are
+        served from the database without cloning; stale_only leaves them out.
+        New results are saved in batches of batch_size, one transaction each.
+        Inputs naming the same repository (and so the same checkout) are analyzed once.
+        """
+        targets = {}
         for path in paths:
-            try:
-                repo_path = workspace / Path(path).name
-                metrics = self._analyze_single_repo(path, repo_path, force, group)
-                if metrics:
-                    results.append(metrics)
-            except (GitCommandError, GitHubAPIError) as e:
-                log.error(f"Error analyzing {path}: {str(e)}")
+            target = self._analysis_path(path, workspace, local_mode)
+            if target in targets:
+                log.info(f"Skipping {path}: same repository as {targets[target]}")
+            else:
+                targets[target] = path
+        paths = list(targets.values())
+
+        def analyze(path: str) -> Optional[RepoMetrics]:
+            return self._analyze_path(
+                path,
+                workspace,
+                force,
+                group,
+                clone_strategy,
+                mirror_cache,
+                local_mode,
+                max_age_hours=max_age_hours,
+                stale_only=stale_only,
+                concurrent=jobs > 1,
+            )
+
+        if jobs <= 1 or len(paths) < 2:
+            return self._save_in_batches(map(analyze, paths), batch_size)
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            # map preserves input order regardless of completion order
+            return self._save_in_batches(pool.map(analyze, paths), batch_size)
+
+    def _save_in_batches(self, outcomes: Iterable[Optional[RepoMetrics]], batch_size: int) -> List[RepoMetrics]:
+        """Collect analysis outcomes, upserting unsaved ones (id None) through save_many"""
+        results: List[RepoMetrics] = []
+        pending: List[int] = []
+
+        def flush() -> None:
+            saved = self.repository_dao.save_many([results[index] for index in pending])
+            for index, metrics in zip(pending, saved):
+                results[index] = metrics
+            pending.clear()
+
+        for metrics in outcomes:
+            if not metrics:
                 continue
+            if metrics.id is None:
+                pending.append(len(results))
+            results.append(metrics)
+            if len(pending) >= batch_size:
+                flush()
+        if pending:
+            flush()
         return results
 
-    def get_all_repositories(self, sort_by: str = "social_signal") -> List[RepoMetrics]:
-        """Get all repositories sorted by the specified field"""
-        return [repo.to_metrics() for repo in self.repository_dao.get_all(sort_by=sort_by)]
+    def migrate_workspace_paths(self, workspace: Path, prune: bool = False) -> Tuple[int, int]:
+        """Re-key analyses stored under the flat `<workspace>/<basename>` layout of earlier releases
+
+        Rows analyzed before paths were keyed by repository identity (see
+        _analysis_path) are never matched again. Those with a known owner move to
+        `<workspace>/github.com/<owner>/<name>`, merging into a newer analysis
+        already stored there. Rows whose identity can't be derived (no owner) stay
+        in place, or are deleted with prune.
+
+        Returns:
+            Tuple of (rows re-keyed, rows pruned or left orphaned)
+        """
+        moves, orphans = {}, []
+        for metrics in self.repository_dao.list_children(str(workspace)):
+            try:
+                if not metrics.username:
+                    raise ValueError(f"No owner recorded for {metrics.path}")
+                moves[metrics.path] = str(
+                    workspace / MirrorCache.canonical_identity(f"{metrics.username}/{metrics.name}"),
+                )
+            except ValueError:
+                orphans.append(metrics.path)
+        if moves or (prune and orphans):
+            self.repository_dao.relocate(moves, orphans if prune else ())
+        return len(moves), len(orphans)
+
+    def get_all_repositories(
+        self,
+        sort_by: str = "social_signal",
+        limit: Optional[int] = None,
+        group: Optional[str] = None,
+        filters: Optional[List[str]] = None,
+        after: Optional[str] = None,
+    ) -> Iterator[RepoMetrics]:
+        """Stream repositories sorted by the specified field, optionally filtered and paginated"""
+        return self.repository_dao.iter_all(sort_by=sort_by, limit=limit, group=group, filters=filters, after=after)
+
+    def _analyze_path(
+        self,
+        path: str,
+        workspace: Path,
+        force: bool,
+        group: Optional[str] = None,
+        clone_strategy: CloneStrategy = CloneStrategy.FULL,
+        mirror_cache: Optional[MirrorCache] = None,
+        local_mode: LocalMode = LocalMode.COPY,
+        max_age_hours: Optional[float] = None,
+        stale_only: bool = False,
+        concurrent: bool = False,
+    ) -> Optional[RepoMetrics]:
+        """Analyze one input path, isolating failures from the rest of the batch"""
+        try:
+            repo_path = self._analysis_path(path, workspace, local_mode)
+            # Cached metrics are keyed by the analysis path, so they can be checked
+            # before touching the network or the workspace
+            cached = None if force else self.repository_dao.get_by_path(str(repo_path))
+            if cached and self.analyzer.is_analysis_fresh(cached, max_age_hours):
+                log.debug(f"Using cached analysis for {path}")
+                return None if stale_only else cached
+            return self._analyze_single_repo(
+                path,
+                repo_path,
+                # A stale row needs a fresh checkout and re-analysis
+                force or cached is not None,
+                group,
+                clone_strategy=clone_strategy,
+                mirror_cache=mirror_cache,
+                local_mode=local_mode,
+                concurrent=concurrent,
+            )
+        except (GitCommandError, GitHubAPIError) as e:
+            log.error(f"Error analyzing {path}: {str(e)}")
+        except Exception as e:
+            log.error(f"Unexpected error analyzing {path}: {str(e)}")
+        return None
+
+    @staticmethod
+    def _analysis_path(path: str, workspace: Path, local_mode: LocalMode = LocalMode.COPY) -> Path:
+        """Where a repository is analyzed, which is also its key in the database
+
+        Remote repositories are checked out at `<workspace>/<host>/<owner>/<name>`
+        from their canonical identity, and local copies at
+        `<workspace>/local/<source digest>/<name>`, so sources that share a basename
+        never share a checkout or a cached analysis.
+        """
+        source = Path(path)
+        if source.exists():
+            source = source.resolve()
+            if local_mode is LocalMode.IN_PLACE:
+                return source
+            digest = hashlib.sha1(str(source).encode()).hexdigest()[:12]
+            return workspace / LOCAL_DIRNAME / digest / source.name
+        try:
+            return workspace / MirrorCache.canonical_identity(path)
+        except ValueError:
+            return workspace / source.name
 
     def _analyze_single_repo(
         self,
@@ -46,36 +209,121 @@ class RepositoryService:
         target_path: Path,
         force: bool,
         group: Optional[str] = None,
+        clone_strategy: CloneStrategy = CloneStrategy.FULL,
+        mirror_cache: Optional[MirrorCache] = None,
+        local_mode: LocalMode = LocalMode.COPY,
+        concurrent: bool = False,
     ) -> Optional[RepoMetrics]:
-        """Analyze a single repository and return its metrics"""
+        """Analyze a single repository and return its metrics
+
+        With concurrent, metrics are collected through an AsyncCommandRunner of this
+        repository's own, since its semaphores bind to the event loop that uses them.
+        """
         if not target_path.exists() or force:
-            self._prepare_repository(source_path, target_path)
+            self._prepare_repository(source_path, target_path, clone_strategy, mirror_cache, local_mode)
 
-        metrics = self.analyzer.analyze_repository(str(target_path), force_update=force, group=group)
+        # Local copies carry full history and files regardless of the clone strategy
+        skip_metrics = set() if Path(source_path).exists() else clone_strategy.unavailable_metrics
+        metrics = self.analyzer.analyze_repository(
+            str(target_path),
+            force_update=force,
+            group=group,
+            skip_metrics=skip_metrics,
+            save=False,
+            async_runner=AsyncCommandRunner() if concurrent else None,
+        )
         return metrics
 
-    def _prepare_repository(self, source: str, target: Path) -> None:
-        """Prepare repository for analysis by copying or cloning"""
+    def _prepare_repository(
+        self,
+        source: str,
+        target: Path,
+        clone_strategy: CloneStrategy = CloneStrategy.FULL,
+        mirror_cache: Optional[MirrorCache] = None,
+        local_mode: LocalMode = LocalMode.COPY,
+    ) -> None:
+        """Prepare repository for analysis by copying, checking out a mirror or cloning
+
+        A checkout left in the workspace by an earlier run (e.g. with --no-cleanup)
+        is replaced, so a stale repository is re-fetched rather than failing to clone.
+        """
+        if Path(source).exists() and local_mode is LocalMode.IN_PLACE:
+            return
+        if target.exists():
+            shutil.rmtree(target)
+        target.parent.mkdir(parents=True, exist_ok=True)
+
         if Path(source).exists():
-            shutil.copytree(source, target, dirs_exist_ok=True)
+            if local_mode is LocalMode.SHARED:
+                self._shared_clone(source, target)
+            else:
+                shutil.copytree(source, target)
+        elif mirror_cache:
+            mirror_cache.checkout(source, target, clone_strategy)
         else:
-            self._clone_repository(source, target)
+            self._clone_repository(source, target, clone_strategy)
+
+    @staticmethod
+    def _shared_clone(source: str, target_path: Path) -> None:
+        """Clone a local repository reusing its object store through git alternates
+
+        The clone's origin is pointed at the source's origin so `gh` still resolves
+        the GitHub repository.
+        """
+        from subprocess import CalledProcessError, run
+
+        command = ["git", "clone", "--shared", "--quiet", source, str(target_path)]
+        try:
+            run(command, check=True, capture_output=True, text=True)
+        except CalledProcessError as e:
+            raise GitCommandError(
+                message="Failed to create shared clone",
+                command=" ".join(command),
+                stderr=e.stderr,
+            )
+
+        origin = run(
+            ["git", "-C", source, "remote", "get-url", "origin"],
+            capture_output=True,
+            text=True,
+        )
+        if origin.returncode == 0 and origin.stdout.strip():
+            run(
+                ["git", "-C", str(target_path), "remote", "set-url", "origin", origin.stdout.strip()],
+                check=True,
+                capture_output=True,
+            )
 
     @staticmethod
-    def _clone_repository(repo_url: str, target_path: Path) -> None:
-        """Clone repository using GitHub CLI"""
+    def _clone_repository(
+        repo_url: str,
+        target_path: Path,
+        clone_strategy: CloneStrategy = CloneStrategy.FULL,
+    ) -> None:
+        """Clone repository using GitHub CLI
+
+        Partial strategies only fetch the objects history metrics need and skip
+        LFS smudging and submodules.
+        """
         from subprocess import CalledProcessError, run
 
+        command = ["gh", "repo", "clone", repo_url, str(target_path)]
+        env = None
+        if clone_strategy.clone_args:
+            command += ["--", *clone_strategy.clone_args]
+            env = {**os.environ, "GIT_LFS_SKIP_SMUDGE": "1"}
+
         try:
             run(
-                ["gh", "repo", "clone", repo_url, str(target_path)],
+                command,
                 check=True,
                 capture_output=True,
                 text=True,
+                env=env,
             )
         except CalledProcessError as e:
             raise GitCommandError(
                 message="Failed to clone repository",
-                command=f"gh repo clone {repo_url}",
+                command=" ".join(command),
                 stderr=e.stderr,
             )
@@ -1,10 +1,21 @@
+import os
 import json
 import time
+import asyncio
 import subprocess
-from typing import List, Optional
-
+from typing import Set, Dict, List, Iterator, Optional, AsyncIterator
+
+from .git_history import (
+    HistoryStats,
+    HistoryWalker,
+    walk_history,
+    walk_history_async,
+    history_log_command,
+    encode_daily_commits,
+)
 from ..core.config import settings
 from ..core.logger import log
+from .line_counter import count_lines
 from ..core.interfaces import (
     RepoMetrics,
     CommandRunner,
@@ -12,6 +23,22 @@ from ..core.interfaces import (
     MetricsNormalizer,
 )
 
+# Fields requested from `gh repo view` in a single call, shared by all metadata accessors
+REPO_METADATA_FIELDS = ["stargazerCount", "owner", "issues"]
+
+REPO_AGE_COMMAND = ["git", "log", "--reverse", "--format=%ct", "--max-parents=0", "--max-count=1"]
+UPDATE_FREQUENCY_COMMAND = ["git", "log", "--format=%ct"]
+CONTRIBUTORS_COMMAND = ["git", "shortlog", "-s", "-n", "--all"]
+COMMIT_COUNT_COMMAND = ["git", "log", "--oneline"]
+REPO_METADATA_COMMAND = ["gh", "repo", "view", "--json", ",".join(REPO_METADATA_FIELDS)]
+# Exits non-zero when the first commit is missing or not an ancestor of the second
+ANCESTRY_CHECK_COMMAND = ["git", "merge-base", "--is-ancestor"]
+# NUL-separated output keeps unusual file names unquoted
+LS_FILES_COMMAND = ["git", "ls-files", "-z"]
+
+# Async output lines can be long (e.g. commits with many ref decorations)
+STREAM_LINE_LIMIT = 1024 * 1024
+
 
 class GitCommandError(Exception):
     """Raised when a git command fails"""
@@ -59,65 +86,228 @@ class DefaultCommandRunner(CommandRunner):
                 stderr=e.stderr,
             )
 
+    def stream_command(self, command: List[str], cwd: str) -> Iterator[str]:
+        """Run a command and yield its stdout line by line as it is produced"""
+        process = subprocess.Popen(
+            command,
+            cwd=cwd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            encoding="utf-8",
+            errors="replace",
+        )
+        try:
+            for line in process.stdout:
+                yield line.rstrip("\n")
+            stderr = process.stderr.read()
+        finally:
+            process.stdout.close()
+            process.stderr.close()
+            returncode = process.wait()
+        if returncode != 0:
+            raise GitCommandError(
+                message="Command execution failed",
+                command=" ".join(command),
+                stderr=stderr,
+            )
+
+
+class AsyncCommandRunner:
+    """Asyncio command runner with separate global concurrency limits for git and gh
+
+    Share one instance across all analyzers on an event loop so the limits apply to
+    the whole run; semaphores bind to the loop that first uses them.
+    """
+
+    def __init__(self, git_limit: int = 64, gh_limit: int = 8, default_limit: int = 16):
+        self._semaphores: Dict[str, asyncio.Semaphore] = {
+            "git": asyncio.Semaphore(git_limit),
+            "gh": asyncio.Semaphore(gh_limit),
+        }
+        self._default_semaphore = asyncio.Semaphore(default_limit)
+
+    def _semaphore(self, command: List[str]) -> asyncio.Semaphore:
+        return self._semaphores.get(os.path.basename(command[0]), self._default_semaphore)
+
+    async def run_command(self, command: List[str], cwd: str) -> str:
+        async with self._semaphore(command):
+            process = await asyncio.create_subprocess_exec(
+                *command,
+                cwd=cwd,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+            stdout, stderr = await process.communicate()
+        if process.returncode != 0:
+            raise GitCommandError(
+                message="Command execution failed",
+                command=" ".join(command),
+                stderr=stderr.decode("utf-8", errors="replace"),
+            )
+        return stdout.decode("utf-8", errors="replace").strip()
+
+    async def stream_command(self, command: List[str], cwd: str) -> AsyncIterator[str]:
+        """Run a command and yield its stdout line by line as it is produced"""
+        async with self._semaphore(command):
+            process = await asyncio.create_subprocess_exec(
+                *command,
+                cwd=cwd,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                limit=STREAM_LINE_LIMIT,
+            )
+            try:
+                async for line in process.stdout:
+                    yield line.decode("utf-8", errors="replace").rstrip("\n")
+                stderr = await process.stderr.read()
+            finally:
+                if process.returncode is None and not process.stdout.at_eof():
+                    process.kill()
+                returncode = await process.wait()
+        if returncode != 0:
+            raise GitCommandError(
+                message="Command execution failed",
+                command=" ".join(command),
+                stderr=stderr.decode("utf-8", errors="replace"),
+            )
+
 
 class GitHubAnalyzerImpl(GitHubAnalyzer, MetricsNormalizer):
-    """Implementation of GitHub repository analyzer"""
+    """Implementation of GitHub repository analyzer
+
+    Each metric has a blocking method using the CommandRunner and an `_async`
+    variant using the AsyncCommandRunner; both share the same parsing helpers.
+    The async variants need an AsyncCommandRunner passed in, shared by every
+    analyzer on the event loop so its git/gh limits apply to the whole run.
+    """
 
     def __init__(
         self,
         repo_path: str,
         command_runner: CommandRunner = None,
+        async_runner: Optional[AsyncCommandRunner] = None,
+        skip_metrics: Optional[Set[str]] = None,
+        previous_history: Optional[HistoryStats] = None,
+        previous_lines_of_code: Optional[int] = None,
     ):
         self.repo_path = repo_path
+        # Metrics the checkout cannot provide (e.g. lines_of_code without a working tree)
+        self.skip_metrics = set(skip_metrics or ())
+        # State recorded by the last analysis; lets the history walk cover only new commits
+        self.previous_history = previous_history
+        # Stands in when this checkout cannot count lines (e.g. a treeless clone)
+        self.previous_lines_of_code = previous_lines_of_code
         self.command_runner = command_runner or DefaultCommandRunner()
+        self._async_runner = async_runner
         self.config = settings
         self.weights = self.config.metrics.weights
         self.normalizers = self.config.metrics.normalizers
+        self._repo_metadata: Optional[dict] = None
+
+    @property
+    def async_runner(self) -> AsyncCommandRunner:
+        if self._async_runner is None:
+            raise ValueError("Async analysis needs a shared AsyncCommandRunner (pass async_runner=...)")
+        return self._async_runner
+
+    def _log_history_stats(self, stats: HistoryStats) -> HistoryStats:
+        log.debug(
+            f"History walk: head={stats.head_sha}, commits={stats.commit_count}, "
+            f"contributors={stats.contributor_count}",
+        )
+        if stats.root_timestamp is None:
+            log.warning(f"No commit dates found for repository: {self.repo_path}")
+        return stats
+
+    def _resume_base(self) -> Optional[HistoryStats]:
+        previous = self.previous_history
+        return previous if previous and previous.head_sha else None
+
+    def _incremental_result(self, walker: HistoryWalker) -> Optional[HistoryStats]:
+        if walker.found_new_root:
+            log.info(f"New root commit in {self.repo_path}; walking full history")
+            return None
+        stats = walker.finish()
+        log.debug(f"Incremental history walk from {walker.base.head_sha} to {stats.head_sha}")
+        return stats
+
+    def _log_rewritten_history(self, base: HistoryStats) -> None:
+        log.info(f"History of {self.repo_path} no longer contains {base.head_sha}; walking full history")
+
+    def get_history_stats(self) -> HistoryStats:
+        """Collect age, cadence, commit and contributor data in a single history walk
+
+        With previous_history, only commits added since its head are walked; a
+        force-push that dropped that commit falls back to a full walk.
+        """
+        base = self._resume_base()
+        if base:
+            try:
+                self.command_runner.run_command(ANCESTRY_CHECK_COMMAND + [base.head_sha, "HEAD"], self.repo_path)
+            except GitCommandError:
+                self._log_rewritten_history(base)
+            else:
+                lines = self.command_runner.stream_command(history_log_command(base.head_sha), self.repo_path)
+                stats = self._incremental_result(walk_history(lines, base))
+                if stats:
+                    return self._log_history_stats(stats)
+
+        lines = self.command_runner.stream_command(history_log_command(), self.repo_path)
+        return self._log_history_stats(walk_history(lines).finish())
+
+    async def get_history_stats_async(self) -> HistoryStats:
+        """Async variant of get_history_stats"""
+        base = self._resume_base()
+        if base:
+            try:
+                await self.async_runner.run_command(ANCESTRY_CHECK_COMMAND + [base.head_sha, "HEAD"], self.repo_path)
+            except GitCommandError:
+                self._log_rewritten_history(base)
+            else:
+                lines = self.async_runner.stream_command(history_log_command(base.head_sha), self.repo_path)
+                stats = self._incremental_result(await walk_history_async(lines, base))
+                if stats:
+                    return self._log_history_stats(stats)
+
+        lines = self.async_runner.stream_command(history_log_command(), self.repo_path)
+        return self._log_history_stats((await walk_history_async(lines)).finish())
+
+    def _parse_repo_age(self, first_commit_date: str) -> float:
+        log.debug(f"Raw first commit date output: {first_commit_date!r}")
+
+        # Strip whitespace and newlines
+        first_commit_date = first_commit_date.strip()
+
+        if not first_commit_date:
+            log.warning(f"No commit dates found for repository: {self.repo_path}")
+            return 0.0
+
+        creation_timestamp = float(first_commit_date)
+        current_timestamp = time.time()
+        age_days = (current_timestamp - creation_timestamp) / (24 * 3600)
+
+        log.debug(f"Repository age calculation: creation_timestamp={creation_timestamp}, age_days={age_days}")
+        return age_days
 
     def get_repo_age(self) -> float:
         """Calculate repository age in days"""
         try:
-            first_commit_date = self.command_runner.run_command(
-                [
-                    "git",
-                    "log",
-                    "--reverse",
-                    "--format=%ct",
-                    "--max-parents=0",
-                    "--max-count=1",
-                ],
-                self.repo_path,
-            )
-            log.debug(f"Raw first commit date output: {first_commit_date!r}")
-
-            # Strip whitespace and newlines
-            first_commit_date = first_commit_date.strip()
-
-            if not first_commit_date:
-                log.warning(f"No commit dates found for repository: {self.repo_path}")
-                return 0.0
-
-            creation_timestamp = float(first_commit_date)
-            current_timestamp = time.time()
-            age_days = (current_timestamp - creation_timestamp) / (24 * 3600)
-
-            log.debug(f"Repository age calculation: creation_timestamp={creation_timestamp}, age_days={age_days}")
-            return age_days
+            return self._parse_repo_age(self.command_runner.run_command(REPO_AGE_COMMAND, self.repo_path))
+        except (ValueError, GitCommandError) as e:
+            log.error(f"Error calculating repository age: {str(e)} for {self.repo_path}")
+            return 0.0
 
+    async def get_repo_age_async(self) -> float:
+        """Async variant of get_repo_age"""
+        try:
+            return self._parse_repo_age(await self.async_runner.run_command(REPO_AGE_COMMAND, self.repo_path))
         except (ValueError, GitCommandError) as e:
             log.error(f"Error calculating repository age: {str(e)} for {self.repo_path}")
             return 0.0
 
-    def get_update_frequency(self) -> float:
-        """Calculate average days between updates"""
-        commit_dates = self.command_runner.run_command(
-            [
-                "git",
-                "log",
-                "--format=%ct",
-            ],
-            self.repo_path,
-        ).splitlines()
+    @staticmethod
+    def _parse_update_frequency(output: str) -> float:
+        commit_dates = output.splitlines()
 
         if len(commit_dates) < 2:
             return 0
@@ -126,36 +316,29 @@ class GitHubAnalyzerImpl(GitHubAnalyzer, MetricsNormalizer):
         total_days = (timestamps[0] - timestamps[-1]) / (24 * 3600)
         return total_days / (len(timestamps) - 1)
 
+    def get_update_frequency(self) -> float:
+        """Calculate average days between updates"""
+        return self._parse_update_frequency(self.command_runner.run_command(UPDATE_FREQUENCY_COMMAND, self.repo_path))
+
+    async def get_update_frequency_async(self) -> float:
+        """Async variant of get_update_frequency"""
+        return self._parse_update_frequency(
+            await self.async_runner.run_command(UPDATE_FREQUENCY_COMMAND, self.repo_path),
+        )
+
     def get_contributor_count(self) -> int:
         """Get number of unique contributors"""
-        contributors = self.command_runner.run_command(
-            [
-                "git",
-                "shortlog",
-                "-s",
-                "-n",
-                "--all",
-            ],
-            self.repo_path,
-        ).splitlines()
-        return len(contributors)
+        return len(self.command_runner.run_command(CONTRIBUTORS_COMMAND, self.repo_path).splitlines())
 
-    def get_stars(self) -> int:
-        """Get repository star count using GitHub CLI"""
+    async def get_contributor_count_async(self) -> int:
+        """Async variant of get_contributor_count"""
+        return len((await self.async_runner.run_command(CONTRIBUTORS_COMMAND, self.repo_path)).splitlines())
+
+    @staticmethod
+    def _parse_repo_metadata(repo_info: str) -> dict:
+        log.debug(f"GitHub API Response: {repo_info}")
         try:
-            repo_info = self.command_runner.run_command(
-                ["gh", "repo", "view", "--json", "stargazerCount"],
-                self.repo_path,
-            )
-            return json.loads(repo_info)["stargazerCount"]
-        except subprocess.CalledProcessError as e:
-            msg = f"Could not fetch star count: {str(e)}"
-            log.warning(msg)
-            raise GitHubAPIError(
-                message=msg,
-                endpoint="repo view",
-                status_code=e.returncode,
-            )
+            return json.loads(repo_info)
         except json.JSONDecodeError as e:
             msg = f"Invalid JSON response from GitHub API: {str(e)}"
             log.warning(msg)
@@ -163,6 +346,27 @@ class GitHubAnalyzerImpl(GitHubAnalyzer, MetricsNormalizer):
                 message=msg,
                 endpoint="repo view",
             )
+
+    def get_repo_metadata(self) -> dict:
+        """Fetch all GitHub metadata fields in one `gh repo view` call, cached for this analyzer"""
+        if self._repo_metadata is None:
+            self._repo_metadata = self._parse_repo_metadata(
+                self.command_runner.run_command(REPO_METADATA_COMMAND, self.repo_path),
+            )
+        return self._repo_metadata
+
+    async def get_repo_metadata_async(self) -> dict:
+        """Async variant of get_repo_metadata, sharing the same cache"""
+        if self._repo_metadata is None:
+            self._repo_metadata = self._parse_repo_metadata(
+                await self.async_runner.run_command(REPO_METADATA_COMMAND, self.repo_path),
+            )
+        return self._repo_metadata
+
+    @staticmethod
+    def _extract_stars(metadata: dict) -> int:
+        try:
+            return metadata["stargazerCount"]
         except KeyError as e:
             msg = f"Star count not found in GitHub API response: {str(e)}"
             log.warning(msg)
@@ -171,19 +375,27 @@ class GitHubAnalyzerImpl(GitHubAnalyzer, MetricsNormalizer):
                 endpoint="repo view",
             )
 
+    def get_stars(self) -> int:
+        """Get repository star count using GitHub CLI"""
+        return self._extract_stars(self.get_repo_metadata())
+
+    async def get_stars_async(self) -> int:
+        """Async variant of get_stars"""
+        return self._extract_stars(await self.get_repo_metadata_async())
+
     def get_commit_count(self) -> int:
         """Get total number of commits"""
-        return len(self.command_runner.run_command(["git", "log", "--oneline"], self.repo_path).splitlines())
+        return len(self.command_runner.run_command(COMMIT_COUNT_COMMAND, self.repo_path).splitlines())
 
-    def get_repo_username(self) -> str:
-        """Get repository owner username using GitHub CLI"""
+    async def get_commit_count_async(self) -> int:
+        """Async variant of get_commit_count"""
+        return len((await self.async_runner.run_command(COMMIT_COUNT_COMMAND, self.repo_path)).splitlines())
+
+    @staticmethod
+    def _extract_username(metadata: dict) -> str:
         try:
-            repo_info = self.command_runner.run_command(
-                ["gh", "repo", "view", "--json", "owner"],
-                self.repo_path,
-            )
-            return json.loads(repo_info)["owner"]["login"]
-        except (subprocess.CalledProcessError, json.JSONDecodeError, KeyError) as e:
+            return metadata["owner"]["login"]
+        except (KeyError, TypeError) as e:
             msg = f"Could not fetch repository username: {str(e)}"
             log.warning(msg)
             raise GitHubAPIError(
@@ -191,54 +403,71 @@ class GitHubAnalyzerImpl(GitHubAnalyzer, MetricsNormalizer):
                 endpoint="repo view",
             )
 
-    def get_lines_of_code(self) -> int:
-        """Get total lines of code in the repository"""
+    def get_repo_username(self) -> str:
+        """Get repository owner username using GitHub CLI"""
+        return self._extract_username(self.get_repo_metadata())
+
+    async def get_repo_username_async(self) -> str:
+        """Async variant of get_repo_username"""
+        return self._extract_username(await self.get_repo_metadata_async())
+
+    def get_lines_of_code(self) -> Optional[int]:
+        """Get total lines of code in the repository, or None when it cannot be counted"""
+        if "lines_of_code" in self.skip_metrics:
+            log.debug(f"Skipping lines of code for {self.repo_path}: no working tree")
+            return None
         try:
-            # Use a simpler command that doesn't rely on pipes
-            files_output = self.command_runner.run_command(
-                ["git", "ls-files"],
-                self.repo_path,
-            )
-            total_lines = 0
-            for file in files_output.splitlines():
-                try:
-                    lines = self.command_runner.run_command(
-                        ["wc", "-l", file],
-                        self.repo_path,
-                    )
-                    total_lines += int(lines.split()[0])
-                except (ValueError, IndexError, GitCommandError):
-                    continue
-            return total_lines
+            files_output = self.command_runner.run_command(LS_FILES_COMMAND, self.repo_path)
+            files = [file for file in files_output.split("\0") if file]
+            return count_lines(self.repo_path, files)
         except Exception as e:
             log.warning(f"Could not fetch lines of code: {str(e)}")
-            return 0
+            return None
+
+    async def get_lines_of_code_async(self) -> Optional[int]:
+        """Async variant of get_lines_of_code; file reads run off the event loop"""
+        if "lines_of_code" in self.skip_metrics:
+            log.debug(f"Skipping lines of code for {self.repo_path}: no working tree")
+            return None
+        runner = self.async_runner
+        try:
+            files_output = await runner.run_command(LS_FILES_COMMAND, self.repo_path)
+            files = [file for file in files_output.split("\0") if file]
+            return await asyncio.to_thread(count_lines, self.repo_path, files)
+        except Exception as e:
+            log.warning(f"Could not fetch lines of code: {str(e)}")
+            return None
+
+    @staticmethod
+    def _extract_open_issues(metadata: dict) -> int:
+        # Handle the new API response structure
+        if (
+            isinstance(metadata, dict)
+            and "issues" in metadata
+            and isinstance(metadata["issues"], dict)
+            and "totalCount" in metadata["issues"]
+        ):
+            return metadata["issues"]["totalCount"]
+        return 0
 
     def get_open_issues(self) -> int:
         """Get number of open issues using GitHub CLI"""
         try:
-            repo_info = self.command_runner.run_command(
-                ["gh", "repo", "view", "--json", "issues"],
-                self.repo_path,
-            )
-            log.debug(f"GitHub API Response: {repo_info}")
-            data = json.loads(repo_info)
-
-            # Handle the new API response structure
-            if (
-                isinstance(data, dict)
-                and "issues" in data
-                and isinstance(data["issues"], dict)
-                and "totalCount" in data["issues"]
-            ):
-                return data["issues"]["totalCount"]
+            return self._extract_open_issues(self.get_repo_metadata())
+        except GitHubAPIError as e:
+            log.warning(f"Could not fetch open issues: {str(e)}")
             return 0
-        except (subprocess.CalledProcessError, json.JSONDecodeError, KeyError) as e:
+
+    async def get_open_issues_async(self) -> int:
+        """Async variant of get_open_issues"""
+        try:
+            return self._extract_open_issues(await self.get_repo_metadata_async())
+        except GitHubAPIError as e:
             log.warning(f"Could not fetch open issues: {str(e)}")
             return 0
 
     def _normalize_metrics(self, metrics: dict) -> dict:
-        """Normalize metrics to 0-1 scale"""
+        """Normalize metrics to 0-1 scale; unavailable metrics stay None"""
         normalized = {
             "age": min(metrics["age_days"] / self.normalizers["max_age_days"], 1.0),
             "update_frequency": 1.0
@@ -252,48 +481,97 @@ class GitHubAnalyzerImpl(GitHubAnalyzer, MetricsNormalizer):
             ),
             "stars": min(metrics["stars"] / self.normalizers["max_stars"], 1.0),
             "commits": min(metrics["commit_count"] / self.normalizers["max_commits"], 1.0),
-            "lines_of_code": min(metrics["lines_of_code"] / self.normalizers["max_lines_of_code"], 1.0),
+            "lines_of_code": (
+                None
+                if metrics["lines_of_code"] is None
+                else min(metrics["lines_of_code"] / self.normalizers["max_lines_of_code"], 1.0)
+            ),
             "open_issues": min(metrics["open_issues"] / self.normalizers["max_open_issues"], 1.0),
         }
         return normalized
 
     def _calculate_score(self, normalized_metrics: dict) -> float:
-        """Calculate weighted social signal score"""
-        return sum(self.weights[key] * value for key, value in normalized_metrics.items()) * 100
+        """Calculate weighted social signal score
+
+        Unavailable (None) metrics are left out and the remaining weights scaled up
+        to the full weight total, rather than scoring the missing terms as zero.
+        """
+        available = [key for key, value in normalized_metrics.items() if value is not None]
+        score = sum(self.weights[key] * normalized_metrics[key] for key in available) * 100
+        if len(available) < len(normalized_metrics):
+            available_weight = sum(self.weights[key] for key in available)
+            total_weight = sum(self.weights[key] for key in normalized_metrics)
+            score = score * total_weight / available_weight if available_weight else 0.0
+        return score
+
+    def _build_metrics(
+        self,
+        history: HistoryStats,
+        metadata: dict,
+        lines_of_code: Optional[int],
+        group: Optional[str] = None,
+    ) -> RepoMetrics:
+        """Combine collected metrics into a scored RepoMetrics
+
+        Without a line count of its own, the count from the previous analysis is kept.
+        """
+        if lines_of_code is None:
+            lines_of_code = self.previous_lines_of_code
+        raw_metrics = {
+            "age_days": history.age_days(),
+            "update_frequency": history.update_frequency_days(),
+            "contributor_count": history.contributor_count,
+            "stars": self._extract_stars(metadata),
+            "commit_count": history.commit_count,
+            "lines_of_code": lines_of_code,
+            "open_issues": self._extract_open_issues(metadata),
+        }
+
+        normalized = self._normalize_metrics(raw_metrics)
+        social_signal = self._calculate_score(normalized)
+
+        return RepoMetrics(
+            name=self.repo_path.split("/")[-1],
+            path=self.repo_path,
+            username=self._extract_username(metadata),
+            age_days=raw_metrics["age_days"],
+            update_frequency_days=raw_metrics["update_frequency"],
+            contributor_count=raw_metrics["contributor_count"],
+            stars=raw_metrics["stars"],
+            commit_count=raw_metrics["commit_count"],
+            lines_of_code=raw_metrics["lines_of_code"],
+            open_issues=raw_metrics["open_issues"],
+            social_signal=social_signal,
+            last_analyzed=time.time(),
+            date_created=time.time(),
+            group=group,
+            head_sha=history.head_sha,
+            history_state=history.to_json(),
+            commit_activity=encode_daily_commits(history.daily_commits),
+        )
 
     def calculate_social_signal(self, group: Optional[str] = None) -> RepoMetrics:
         """Perform complete repository analysis and calculate social signal score"""
         try:
-            raw_metrics = {
-                "age_days": self.get_repo_age(),
-                "update_frequency": self.get_update_frequency(),
-                "contributor_count": self.get_contributor_count(),
-                "stars": self.get_stars(),
-                "commit_count": self.get_commit_count(),
-                "lines_of_code": self.get_lines_of_code(),
-                "open_issues": self.get_open_issues(),
-            }
-
-            normalized = self._normalize_metrics(raw_metrics)
-            social_signal = self._calculate_score(normalized)
-
-            return RepoMetrics(
-                name=self.repo_path.split("/")[-1],
-                path=self.repo_path,
-                username=self.get_repo_username(),
-                age_days=raw_metrics["age_days"],
-                update_frequency_days=raw_metrics["update_frequency"],
-                contributor_count=raw_metrics["contributor_count"],
-                stars=raw_metrics["stars"],
-                commit_count=raw_metrics["commit_count"],
-                lines_of_code=raw_metrics["lines_of_code"],
-                open_issues=raw_metrics["open_issues"],
-                social_signal=social_signal,
-                last_analyzed=time.time(),
-                date_created=time.time(),
-                group=group,
+            return self._build_metrics(
+                self.get_history_stats(),
+                self.get_repo_metadata(),
+                self.get_lines_of_code(),
+                group,
             )
+        except (GitCommandError, GitHubAPIError) as e:
+            log.error(f"Error analyzing repository: {str(e)}")
+            raise
 
+    async def calculate_social_signal_async(self, group: Optional[str] = None) -> RepoMetrics:
+        """Async variant of calculate_social_signal; history, metadata and LOC run concurrently"""
+        try:
+            history, metadata, lines_of_code = await asyncio.gather(
+                self.get_history_stats_async(),
+                self.get_repo_metadata_async(),
+                self.get_lines_of_code_async(),
+            )
+            return self._build_metrics(history, metadata, lines_of_code, group)
         except (GitCommandError, GitHubAPIError) as e:
             log.error(f"Error analyzing repository: {str(e)}")
             raise
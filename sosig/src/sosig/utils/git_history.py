@@ -0,0 +1,214 @@
+import json
+import time
+from typing import Dict, List, Set, Iterable, Iterator, Optional, AsyncIterable
+from dataclasses import field, dataclass
+
+SECONDS_PER_DAY = 24 * 3600
+
+# One record per commit reachable from any ref: sha, parents, commit timestamp,
+# mailmapped author name and ref decorations (used to locate HEAD).
+# --date-order guarantees that no commit is shown before all of its children.
+HISTORY_LOG_COMMAND = [
+    "git",
+    "log",
+    "--all",
+    "--date-order",
+    "--format=%H%x00%P%x00%ct%x00%aN%x00%D",
+]
+
+
+@dataclass
+class HistoryStats:
+    """Aggregate history state collected in a single walk
+
+    Commit count, cadence and age are computed over commits reachable from HEAD,
+    contributors over every ref, mirroring `git log` and `git shortlog --all`.
+    """
+
+    head_sha: Optional[str] = None
+    commit_count: int = 0
+    head_timestamp: Optional[float] = None
+    tail_timestamp: Optional[float] = None
+    root_timestamp: Optional[float] = None
+    contributors: Set[str] = field(default_factory=set)
+    # Commits reachable from HEAD per UTC day (days since the epoch); stored as a
+    # separate blob (see encode_daily_commits) rather than in to_json
+    daily_commits: Dict[int, int] = field(default_factory=dict)
+
+    @property
+    def contributor_count(self) -> int:
+        return len(self.contributors)
+
+    def age_days(self, now: Optional[float] = None) -> float:
+        """Days since the first root commit reachable from HEAD"""
+        if self.root_timestamp is None:
+            return 0.0
+        current_timestamp = now if now is not None else time.time()
+        return (current_timestamp - self.root_timestamp) / SECONDS_PER_DAY
+
+    def update_frequency_days(self) -> float:
+        """Average days between commits reachable from HEAD"""
+        if self.commit_count < 2:
+            return 0
+        total_days = (self.head_timestamp - self.tail_timestamp) / SECONDS_PER_DAY
+        return total_days / (self.commit_count - 1)
+
+    def to_json(self) -> str:
+        """Serialize the aggregate state so a later walk can resume from head_sha"""
+        return json.dumps(
+            {
+                "head_sha": self.head_sha,
+                "commit_count": self.commit_count,
+                "head_timestamp": self.head_timestamp,
+                "tail_timestamp": self.tail_timestamp,
+                "root_timestamp": self.root_timestamp,
+                "contributors": sorted(self.contributors),
+            },
+        )
+
+    @classmethod
+    def from_json(cls, state: str) -> "HistoryStats":
+        data = json.loads(state)
+        data["contributors"] = set(data.get("contributors", []))
+        return cls(**data)
+
+
+def _write_varint(out: bytearray, value: int) -> None:
+    # Zigzag so that negative values (pre-1970 commit dates) stay small
+    value = (value << 1) ^ (value >> 63)
+    while value > 0x7F:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def encode_daily_commits(daily_commits: Dict[int, int]) -> bytes:
+    """Pack a day -> count histogram as varint (day delta, count) pairs in day order
+
+    Active days are mostly close together, so a day typically costs two bytes.
+    """
+    out = bytearray()
+    previous = 0
+    for day in sorted(daily_commits):
+        _write_varint(out, day - previous)
+        _write_varint(out, daily_commits[day])
+        previous = day
+    return bytes(out)
+
+
+def decode_daily_commits(blob: bytes) -> Dict[int, int]:
+    """Inverse of encode_daily_commits"""
+    values, value, shift = [], 0, 0
+    for byte in blob:
+        value |= (byte & 0x7F) << shift
+        shift += 7
+        if not byte & 0x80:
+            values.append((value >> 1) ^ -(value & 1))
+            value, shift = 0, 0
+    daily_commits, day = {}, 0
+    for delta, count in zip(values[::2], values[1::2]):
+        day += delta
+        daily_commits[day] = count
+    return daily_commits
+
+
+def daily_commit_lines(daily_commits: Dict[int, int]) -> Iterator[str]:
+    """`<count> <YYYY-MM-DD>` lines in date order, the input format of the plots script"""
+    for day in sorted(daily_commits):
+        date = time.strftime("%Y-%m-%d", time.gmtime(day * SECONDS_PER_DAY))
+        yield f"{daily_commits[day]} {date}"
+
+
+def history_log_command(since_sha: Optional[str] = None) -> List[str]:
+    """History walk command, optionally limited to commits not reachable from since_sha"""
+    if since_sha:
+        return [*HISTORY_LOG_COMMAND, "--not", since_sha]
+    return list(HISTORY_LOG_COMMAND)
+
+
+def _points_to_head(decorations: str) -> bool:
+    """Check whether a %D decoration string marks the HEAD commit"""
+    return any(ref == "HEAD" or ref.startswith("HEAD -> ") for ref in decorations.split(", "))
+
+
+class HistoryWalker:
+    """Incrementally fold HISTORY_LOG_COMMAND output lines into HistoryStats
+
+    Reachability from HEAD is tracked with a frontier of expected parents, so memory
+    stays bounded by the width of the history rather than its length.
+
+    Given a base state, the walker resumes from it: the log must then be limited to
+    commits not reachable from base.head_sha (see history_log_command). Commit count
+    and contributors accumulate, while the tail and root of the base walk are kept.
+    A new root commit invalidates the kept root, which is flagged in found_new_root
+    so the caller can fall back to a full walk.
+    """
+
+    def __init__(self, base: Optional[HistoryStats] = None):
+        self.base = base
+        self.found_new_root = False
+        self._frontier: Set[str] = set()
+        if base is None:
+            self.stats = HistoryStats()
+        else:
+            self.stats = HistoryStats(
+                commit_count=base.commit_count,
+                tail_timestamp=base.tail_timestamp,
+                root_timestamp=base.root_timestamp,
+                contributors=set(base.contributors),
+                daily_commits=dict(base.daily_commits),
+            )
+
+    def feed(self, line: str) -> None:
+        """Consume a single log record"""
+        if not line:
+            return
+        stats = self.stats
+        sha, parents, timestamp, author, decorations = line.split("\x00", 4)
+        stats.contributors.add(author)
+
+        if stats.head_sha is None and _points_to_head(decorations):
+            stats.head_sha = sha
+        elif sha in self._frontier:
+            self._frontier.discard(sha)
+        else:
+            return
+
+        commit_timestamp = float(timestamp)
+        if stats.head_timestamp is None:
+            stats.head_timestamp = commit_timestamp
+        if self.base is None:
+            stats.tail_timestamp = commit_timestamp
+        stats.commit_count += 1
+        day = int(commit_timestamp // SECONDS_PER_DAY)
+        stats.daily_commits[day] = stats.daily_commits.get(day, 0) + 1
+
+        if parents:
+            self._frontier.update(parents.split())
+        elif self.base is not None:
+            self.found_new_root = True
+        elif stats.root_timestamp is None:
+            stats.root_timestamp = commit_timestamp
+
+    def finish(self) -> HistoryStats:
+        """Return the collected stats; an unchanged HEAD keeps the base head"""
+        if self.base is not None and self.stats.head_sha is None:
+            self.stats.head_sha = self.base.head_sha
+            self.stats.head_timestamp = self.base.head_timestamp
+        return self.stats
+
+
+def walk_history(lines: Iterable[str], base: Optional[HistoryStats] = None) -> HistoryWalker:
+    """Feed the output of history_log_command through a HistoryWalker"""
+    walker = HistoryWalker(base)
+    for line in lines:
+        walker.feed(line)
+    return walker
+
+
+async def walk_history_async(lines: AsyncIterable[str], base: Optional[HistoryStats] = None) -> HistoryWalker:
+    """Feed an asynchronous stream of history_log_command output through a HistoryWalker"""
+    walker = HistoryWalker(base)
+    async for line in lines:
+        walker.feed(line)
+    return walker
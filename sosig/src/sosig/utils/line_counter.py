@@ -0,0 +1,33 @@
+import os
+from typing import Iterable, Optional
+from concurrent.futures import ThreadPoolExecutor
+
+READ_CHUNK_SIZE = 1024 * 1024
+# Same heuristic git uses: a NUL byte in the first 8000 bytes marks a binary file
+BINARY_SNIFF_SIZE = 8000
+
+
+def count_file_lines(path: str) -> int:
+    """Count newlines in a file like `wc -l`, returning 0 for binary or unreadable files"""
+    try:
+        with open(path, "rb") as f:
+            chunk = f.read(READ_CHUNK_SIZE)
+            if b"\0" in chunk[:BINARY_SNIFF_SIZE]:
+                return 0
+            lines = 0
+            while chunk:
+                lines += chunk.count(b"\n")
+                chunk = f.read(READ_CHUNK_SIZE)
+            return lines
+    except OSError:
+        return 0
+
+
+def count_lines(repo_path: str, files: Iterable[str], max_workers: Optional[int] = None) -> int:
+    """Count lines across repository files using a thread pool sized to the available cores"""
+    paths = [os.path.join(repo_path, file) for file in files]
+    workers = max_workers or os.cpu_count() or 1
+    if workers == 1 or len(paths) < 2:
+        return sum(count_file_lines(path) for path in paths)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return sum(pool.map(count_file_lines, paths))
@@ -0,0 +1,136 @@
+import os
+import re
+import shutil
+import subprocess
+from typing import List, Iterator
+from pathlib import Path
+from contextlib import contextmanager
+
+from .gh_utils import GitCommandError
+from ..core.config import PathManager, CloneStrategy
+from ..core.logger import log
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows has no flock; mirrors are then unlocked
+    fcntl = None
+
+_REMOTE_PATTERN = re.compile(
+    r"^(?:(?:https?|ssh|git)://)?(?:[^@/]+@)?(?P<host>[^/:]+\.[^/:]+)[/:](?P<owner>[^/]+)/(?P<name>[^/]+?)(?:\.git)?/?$",
+)
+_SLUG_PATTERN = re.compile(r"^(?P<owner>[^/\s]+)/(?P<name>[^/\s]+?)(?:\.git)?$")
+
+
+class MirrorCache:
+    """Persistent bare mirrors of remote repositories shared across sosig runs
+
+    Mirrors live under `<workspace>/mirrors/<host>/<owner>/<name>.git`. Each one is
+    guarded by an flock so concurrent sosig processes (and threads) share it safely;
+    analysis gets a detached worktree that reuses the mirror's object store.
+    """
+
+    DIRNAME = "mirrors"
+    # Only branches and tags: GitHub's refs/pull/* would inflate the mirror and the
+    # contributor counts computed over --all
+    FETCH_REFSPECS = ["+refs/heads/*:refs/heads/*", "+refs/tags/*:refs/tags/*"]
+
+    def __init__(self, root: Path = None):
+        self.root = root or PathManager.get_workspace_dir() / self.DIRNAME
+
+    @staticmethod
+    def canonical_identity(repo: str) -> str:
+        """Normalize a URL, SSH remote or owner/name slug to `host/owner/name`"""
+        repo = repo.strip()
+        match = _REMOTE_PATTERN.match(repo)
+        if match:
+            host = match.group("host").lower()
+        else:
+            match = _SLUG_PATTERN.match(repo)
+            if not match:
+                raise ValueError(f"Cannot determine repository identity for: {repo}")
+            host = "github.com"
+        return f"{host}/{match.group('owner')}/{match.group('name')}".lower()
+
+    def mirror_path(self, repo: str) -> Path:
+        return self.root / f"{self.canonical_identity(repo)}.git"
+
+    @contextmanager
+    def lock(self, repo: str) -> Iterator[None]:
+        """Hold an exclusive lock on a mirror for the duration of the block"""
+        lock_path = self.mirror_path(repo).with_suffix(".lock")
+        lock_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(lock_path, "w") as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def checkout(self, repo: str, target: Path, clone_strategy: CloneStrategy = CloneStrategy.FULL) -> Path:
+        """Create or refresh the mirror for `repo` and add a detached worktree at `target`"""
+        mirror = self.mirror_path(repo)
+        with self.lock(repo):
+            self._update(repo, mirror, clone_strategy)
+            if target.exists():
+                shutil.rmtree(target)
+            # Drop registrations of worktrees whose directories were cleaned up
+            _run_git(["worktree", "prune"], mirror)
+            worktree_args = ["worktree", "add", "--detach"]
+            if clone_strategy is CloneStrategy.TREELESS:
+                worktree_args.append("--no-checkout")
+            _run_git([*worktree_args, str(target), "HEAD"], mirror)
+        return mirror
+
+    def _update(self, repo: str, mirror: Path, clone_strategy: CloneStrategy) -> None:
+        """Fetch new objects into an existing mirror, or create it on first use"""
+        if (mirror / "HEAD").exists():
+            log.debug(f"Fetching updates into mirror {mirror}")
+            _run_git(["fetch", "--prune", "--tags", "origin"], mirror)
+            return
+
+        log.debug(f"Creating mirror {mirror} for {repo}")
+        mirror.parent.mkdir(parents=True, exist_ok=True)
+        filter_args = [arg for arg in clone_strategy.clone_args if arg.startswith("--filter")]
+        command = ["gh", "repo", "clone", repo, str(mirror), "--", "--bare", *filter_args]
+        try:
+            subprocess.run(command, check=True, capture_output=True, text=True)
+            _run_git(["config", "--unset-all", "remote.origin.fetch"], mirror, check=False)
+            for refspec in self.FETCH_REFSPECS:
+                _run_git(["config", "--add", "remote.origin.fetch", refspec], mirror)
+        except subprocess.CalledProcessError as e:
+            shutil.rmtree(mirror, ignore_errors=True)
+            raise GitCommandError(
+                message="Failed to create repository mirror",
+                command=" ".join(command),
+                stderr=e.stderr,
+            )
+        except GitCommandError:
+            shutil.rmtree(mirror, ignore_errors=True)
+            raise
+
+
+def _run_git(args: List[str], repo: Path, check: bool = True) -> str:
+    command = ["git", "-C", str(repo), *args]
+    result = subprocess.run(command, capture_output=True, text=True)
+    if check and result.returncode != 0:
+        raise GitCommandError(
+            message="Mirror operation failed",
+            command=" ".join(command),
+            stderr=result.stderr,
+        )
+    return result.stdout.strip()
+
+
+def cleanup_workspace(workspace: Path) -> None:
+    """Remove analysis checkouts from a workspace while keeping the mirror cache"""
+    if not workspace.exists():
+        return
+    for entry in workspace.iterdir():
+        if entry.name == MirrorCache.DIRNAME:
+            continue
+        if entry.is_dir() and not entry.is_symlink():
+            shutil.rmtree(entry)
+        else:
+            os.remove(entry)
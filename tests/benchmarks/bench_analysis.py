@@ -0,0 +1,276 @@
+"""Analysis and database benchmark over synthetic git repositories
+
+Generates deterministic repositories with `git fast-import`, sized by commit, file,
+file size and author counts, then times each GitHubAnalyzerImpl metric method,
+RepositoryService.analyze_repositories end to end, and the Database and
+RepositoryDAO read/write paths. `gh` is replaced by a stub runner that serves
+fixed metadata, so everything runs offline. Results are printed as JSON.
+
+    PYTHONPATH=sosig/src python tests/benchmarks/bench_analysis.py --scale small medium --runs 5
+"""
+
+import json
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+import statistics
+import subprocess
+from pathlib import Path
+
+SCALES = {
+    "small": {"commits": 200, "files": 50, "file_size": 2_000, "authors": 5},
+    "medium": {"commits": 2_000, "files": 500, "file_size": 4_000, "authors": 25},
+    "large": {"commits": 10_000, "files": 1_000, "file_size": 4_000, "authors": 100},
+}
+
+BASE_TIMESTAMP = 1_600_000_000
+
+# What the stub runner answers for `gh repo view`
+STUB_METADATA = {"stargazerCount": 42, "owner": {"login": "bench"}, "issues": {"totalCount": 7}}
+
+METRIC_METHODS = [
+    "get_history_stats",
+    "get_repo_age",
+    "get_update_frequency",
+    "get_contributor_count",
+    "get_commit_count",
+    "get_lines_of_code",
+    "get_repo_metadata",
+    "get_stars",
+    "get_repo_username",
+    "get_open_issues",
+    "calculate_social_signal",
+]
+
+
+def _data(payload: bytes) -> bytes:
+    return b"data %d\n%s\n" % (len(payload), payload)
+
+
+def fast_import_stream(commits: int, files: int, file_size: int, authors: int, seed: int = 0):
+    """Yield a fast-import stream: one commit adding every file, then commits rewriting 1-3 files each"""
+    rng = random.Random(seed)
+    # Whole lines drawn from a fixed pool keep generation cheap and the content line-countable
+    pool = [("".join(rng.choices("abcdefghijklmnopqrstuvwxyz ", k=39)) + "\n").encode() for _ in range(256)]
+    lines_per_file = max(1, file_size // 40)
+    names = [f"src/module_{index // 100}/file_{index}.py" for index in range(files)]
+    people = [(f"Author {index}", f"author{index}@example.com") for index in range(authors)]
+
+    timestamp = BASE_TIMESTAMP
+    for mark in range(1, commits + 1):
+        name, email = people[rng.randrange(authors)]
+        timestamp += rng.randint(60, 3 * 86400)
+        identity = f"{name} <{email}> {timestamp} +0000".encode()
+        yield b"commit refs/heads/main\nmark :%d\nauthor %s\ncommitter %s\n" % (mark, identity, identity)
+        yield _data(b"commit %d" % mark)
+        if mark > 1:
+            yield b"from :%d\n" % (mark - 1)
+        changed = names if mark == 1 else rng.sample(names, min(files, rng.randint(1, 3)))
+        for path in changed:
+            yield b"M 100644 inline %s\n" % path.encode()
+            yield _data(b"".join(rng.choices(pool, k=lines_per_file)))
+        yield b"\n"
+
+
+def make_repository(path: Path, commits: int, files: int, file_size: int, authors: int, seed: int = 0) -> str:
+    """Create a repository at path from fast_import_stream and check out its working tree"""
+    path.mkdir(parents=True)
+    subprocess.run(["git", "init", "-q", "-b", "main", str(path)], check=True)
+    importer = subprocess.Popen(["git", "fast-import", "--quiet"], cwd=path, stdin=subprocess.PIPE)
+    for chunk in fast_import_stream(commits, files, file_size, authors, seed):
+        importer.stdin.write(chunk)
+    importer.stdin.close()
+    if importer.wait():
+        raise RuntimeError(f"git fast-import failed for {path}")
+    subprocess.run(["git", "reset", "-q", "--hard"], cwd=path, check=True)
+    return subprocess.run(["git", "rev-parse", "HEAD"], cwd=path, check=True, capture_output=True, text=True).stdout
+
+
+def install_stub_runners() -> None:
+    """Answer `gh` commands from STUB_METADATA in every analyzer; git commands run as usual"""
+    from sosig.utils import gh_utils
+
+    class StubCommandRunner(gh_utils.DefaultCommandRunner):
+        def run_command(self, command, cwd):
+            if command[0] == "gh":
+                return json.dumps(STUB_METADATA)
+            return super().run_command(command, cwd)
+
+    class StubAsyncCommandRunner(gh_utils.AsyncCommandRunner):
+        async def run_command(self, command, cwd):
+            if command[0] == "gh":
+                return json.dumps(STUB_METADATA)
+            return await super().run_command(command, cwd)
+
+    # GitHubAnalyzerImpl looks the default up at construction time; bench_metrics
+    # passes an AsyncCommandRunner in explicitly
+    gh_utils.DefaultCommandRunner = StubCommandRunner
+    gh_utils.AsyncCommandRunner = StubAsyncCommandRunner
+
+
+def timed(function, runs: int, setup=None) -> dict:
+    """Median and best wall time of function(setup()) over runs, after one warm-up call"""
+    timings = []
+    for _ in range(runs + 1):
+        argument = setup() if setup else None
+        started = time.perf_counter()
+        function(argument) if setup else function()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings = timings[1:]
+    return {"median_ms": round(statistics.median(timings), 2), "best_ms": round(min(timings), 2)}
+
+
+def bench_metrics(repo_path: str, runs: int) -> dict:
+    """Time each metric method on a fresh analyzer, so cached metadata doesn't carry over"""
+    from sosig.utils import gh_utils
+
+    def fresh():
+        return gh_utils.GitHubAnalyzerImpl(repo_path, async_runner=gh_utils.AsyncCommandRunner())
+
+    results = {
+        method: timed(lambda analyzer, method=method: getattr(analyzer, method)(), runs, fresh)
+        for method in METRIC_METHODS
+    }
+    results["calculate_social_signal_async"] = timed(
+        lambda analyzer: asyncio.run(analyzer.calculate_social_signal_async()),
+        runs,
+        fresh,
+    )
+    return results
+
+
+def bench_service(repo_path: str, workspace: Path, runs: int) -> dict:
+    """Time a forced in-place analysis through RepositoryService, including the save
+
+    As in repeated real runs, the history walk resumes from the head stored by the
+    previous run, so this measures re-analysis rather than a first analysis.
+    """
+    from sosig.core.config import LocalMode
+    from sosig.utils.gh_analyzer import RepositoryAnalyzer
+    from sosig.utils.gh_repo_dao import RepositoryDAO
+    from sosig.utils.gh_repo_service import RepositoryService
+
+    dao = RepositoryDAO()
+    service = RepositoryService(dao, RepositoryAnalyzer(dao))
+    return timed(
+        lambda: service.analyze_repositories([repo_path], workspace, force=True, local_mode=LocalMode.IN_PLACE),
+        runs,
+    )
+
+
+def _metrics(index: int, rng: random.Random):
+    from sosig.core.interfaces import RepoMetrics
+    from sosig.utils.git_history import encode_daily_commits
+
+    first_day = BASE_TIMESTAMP // 86400
+    activity = {first_day + rng.randrange(2000): rng.randint(1, 20) for _ in range(rng.randint(1, 200))}
+    return RepoMetrics(
+        name=f"repo-{index}",
+        path=f"/workspace/repo-{index}",
+        username="bench",
+        age_days=rng.uniform(1, 2000),
+        update_frequency_days=rng.uniform(0, 30),
+        contributor_count=rng.randint(1, 100),
+        stars=rng.randint(0, 5000),
+        commit_count=rng.randint(1, 5000),
+        lines_of_code=rng.randint(100, 10**6),
+        open_issues=rng.randint(0, 500),
+        social_signal=rng.random() * 100,
+        group=f"group-{index % 10}",
+        commit_activity=encode_daily_commits(activity),
+    )
+
+
+def bench_database(db, rows: int, batch: int, runs: int, seed: int) -> dict:
+    """Time the DAO write paths on a fresh table, then the read paths over it"""
+    from sosig.utils.gh_repo_dao import RepositoryDAO
+
+    rng = random.Random(seed)
+    dao = RepositoryDAO()
+    seeded = [_metrics(index, rng) for index in range(rows)]
+    started = time.perf_counter()
+    for offset in range(0, rows, batch):
+        dao.save_many(seeded[offset : offset + batch])
+    results = {"save_many_insert_rows_per_sec": round(rows / (time.perf_counter() - started))}
+
+    sample = seeded[: min(batch, rows)]
+    results["save_many_upsert"] = timed(lambda: dao.save_many(sample), runs)
+    results["save_metrics"] = timed(lambda: dao.save_metrics(sample[0]), runs)
+    results["get_by_path"] = timed(lambda: dao.get_by_path(sample[-1].path), runs)
+    results["find"] = timed(lambda: dao.find(sample[-1].name), runs)
+    results["iter_all_top_50"] = timed(lambda: list(dao.iter_all(limit=50)), runs)
+    results["iter_all_group"] = timed(lambda: list(dao.iter_all(group="group-3")), runs)
+    results["get_all"] = timed(lambda: dao.get_all(), runs)
+    results["get_stats"] = timed(db.get_stats, runs)
+    results["iter_commit_activity"] = timed(lambda: sum(1 for _ in db.iter_commit_activity()), runs)
+    results["compact_snapshots"] = timed(db.compact_snapshots, runs)
+    return results
+
+
+def _open_database(db_file: Path):
+    from sosig.core.db import Database
+
+    Database._instance = None
+    return Database(f"sqlite:///{db_file}")
+
+
+def run_scale(name: str, size: dict, args, scratch: Path) -> dict:
+    """Generate one repository and run the analysis benchmarks against it"""
+    repo_path = scratch / name / f"{name}-repo"
+    started = time.perf_counter()
+    head_sha = make_repository(repo_path, seed=args.seed, **size)
+    generated_ms = (time.perf_counter() - started) * 1000
+
+    db = _open_database(scratch / name / "bench.db")
+    try:
+        metrics = bench_metrics(str(repo_path), args.runs)
+        service = bench_service(str(repo_path), scratch / name / "workspace", args.runs)
+    finally:
+        db.engine.dispose()
+        db.read_engine.dispose()
+    return {
+        "size": size,
+        "head_sha": head_sha.strip(),
+        "generate_ms": round(generated_ms, 1),
+        "metrics": metrics,
+        "analyze_repositories": service,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", nargs="+", choices=list(SCALES), default=["small", "medium"])
+    parser.add_argument("--commits", type=int, help="Override the commit count of every scale")
+    parser.add_argument("--files", type=int, help="Override the file count of every scale")
+    parser.add_argument("--file-size", type=int, help="Override the file size in bytes of every scale")
+    parser.add_argument("--authors", type=int, help="Override the author count of every scale")
+    parser.add_argument("--runs", type=int, default=5, help="Timed runs per operation, after one warm-up")
+    parser.add_argument("--rows", type=int, default=10_000, help="Rows written for the database benchmarks")
+    parser.add_argument("--batch", type=int, default=100, help="Rows per save_many call")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    overrides = {key: getattr(args, key) for key in ("commits", "files", "file_size", "authors")}
+    install_stub_runners()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        scratch = Path(tmp)
+        scales = {}
+        for name in args.scale:
+            size = {**SCALES[name], **{key: value for key, value in overrides.items() if value is not None}}
+            scales[name] = run_scale(name, size, args, scratch)
+
+        db = _open_database(scratch / "database.db")
+        try:
+            database = bench_database(db, args.rows, args.batch, args.runs, args.seed)
+        finally:
+            db.engine.dispose()
+            db.read_engine.dispose()
+
+    print(json.dumps({"benchmark": "analysis", "params": vars(args), "scales": scales, "database": database}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
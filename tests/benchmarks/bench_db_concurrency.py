@@ -0,0 +1,135 @@
+"""Read/write concurrency benchmark for the SQLite connection settings
+
+Runs writer and reader processes against a scratch database, once with SQLite's
+defaults (rollback journal, synchronous=FULL, no mmap) and once with the
+DatabaseConfig pragmas, and prints throughput and lock errors as JSON.
+
+    PYTHONPATH=sosig/src python tests/benchmarks/bench_db_concurrency.py --writers 2 --readers 4
+"""
+
+import json
+import time
+import random
+import argparse
+import tempfile
+import multiprocessing
+from pathlib import Path
+
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+# Pre-WAL behaviour: pysqlite's default 5s lock timeout and SQLite's own defaults
+DEFAULT_PRAGMAS = {
+    "journal_mode": "delete",
+    "synchronous": "full",
+    "mmap_size": 0,
+    "cache_size": -2000,
+    "temp_store": "default",
+    "busy_timeout": 5000,
+}
+
+
+def _open_database(db_file: Path, pragmas: dict):
+    from sosig.core.db import Database
+    from sosig.core.config import DatabaseConfig
+
+    Database._instance = None
+    return Database(f"sqlite:///{db_file}", config=DatabaseConfig(**pragmas))
+
+
+def _metrics(index: int):
+    from sosig.core.interfaces import RepoMetrics
+
+    return RepoMetrics(
+        name=f"repo-{index}",
+        path=f"/workspace/repo-{index}",
+        username="bench",
+        age_days=random.uniform(1, 2000),
+        update_frequency_days=random.uniform(0, 30),
+        contributor_count=random.randint(1, 100),
+        stars=random.randint(0, 5000),
+        commit_count=random.randint(1, 5000),
+        lines_of_code=random.randint(100, 10**6),
+        open_issues=random.randint(0, 500),
+        social_signal=random.random(),
+        group=f"group-{index % 10}",
+    )
+
+
+def _worker(role: str, db_file: Path, pragmas: dict, args, barrier, results) -> None:
+    """Open the database, wait for every worker to be ready, then run for args.seconds"""
+    from sosig.utils.gh_repo_dao import RepositoryDAO
+
+    db = _open_database(db_file, pragmas)
+    dao = RepositoryDAO()
+    query = text("SELECT name, social_signal FROM repositories ORDER BY social_signal DESC LIMIT 50")
+    barrier.wait()
+
+    ops = errors = 0
+    deadline = time.perf_counter() + args.seconds
+    while time.perf_counter() < deadline:
+        try:
+            if role == "writer":
+                dao.save_many([_metrics(random.randrange(args.rows)) for _ in range(args.batch)])
+            else:
+                with db.get_read_session() as session:
+                    session.execute(query).fetchall()
+            ops += 1
+        except OperationalError:
+            errors += 1
+    results.put((role, ops, errors))
+
+
+def run(pragmas: dict, args) -> dict:
+    """Seed a fresh database and hammer it with concurrent writers and readers"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = Path(tmp) / "bench.db"
+        db = _open_database(db_file, pragmas)
+        from sosig.utils.gh_repo_dao import RepositoryDAO
+
+        RepositoryDAO().save_many([_metrics(index) for index in range(args.rows)])
+        db.engine.dispose()
+        db.read_engine.dispose()
+
+        context = multiprocessing.get_context("spawn")
+        roles = ["writer"] * args.writers + ["reader"] * args.readers
+        barrier = context.Barrier(len(roles))
+        queue = context.Queue()
+        workers = [
+            context.Process(target=_worker, args=(role, db_file, pragmas, args, barrier, queue)) for role in roles
+        ]
+        for worker in workers:
+            worker.start()
+        outcomes = [queue.get() for _ in workers]
+        for worker in workers:
+            worker.join()
+
+    totals = {"writer": 0, "reader": 0}
+    for role, ops, _ in outcomes:
+        totals[role] += ops
+    return {
+        "pragmas": pragmas,
+        "write_batches_per_sec": totals["writer"] / args.seconds,
+        "reads_per_sec": totals["reader"] / args.seconds,
+        "lock_errors": sum(errors for _, _, errors in outcomes),
+    }
+
+
+def main() -> None:
+    from sosig.core.config import DatabaseConfig
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--rows", type=int, default=10_000, help="Rows seeded before the run")
+    parser.add_argument("--batch", type=int, default=50, help="Rows per save_many call")
+    args = parser.parse_args()
+
+    tuned = DatabaseConfig().pragmas
+    results = {"default": run(DEFAULT_PRAGMAS, args), "tuned": run(tuned, args)}
+    print(json.dumps({"benchmark": "db_concurrency", "params": vars(args), "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""CLI startup benchmark for short-lived sosig invocations
+
+Runs each command in a fresh interpreter against a scratch data directory, prints
+the median and best wall-clock times as JSON, and exits non-zero if any median is
+over its budget (the 100 ms startup target by default). Also reports which heavy
+modules each command imported.
+
+    PYTHONPATH=sosig/src python tests/benchmarks/bench_startup.py --runs 10
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+COMMANDS = {
+    "help": ["--help"],
+    "config_show": ["config", "show"],
+    "config_db_path": ["config", "show", "--db-path"],
+}
+
+# Imported by database and analysis commands only; pydantic and rich also by the full `config show`
+HEAVY_MODULES = ["sqlalchemy", "numpy", "pydantic", "rich", "sosig.core.db", "sosig.utils.gh_utils"]
+
+RUNNER = """
+import sys
+from sosig.main import app
+try:
+    app(sys.argv[1:], prog_name="sosig")
+except SystemExit:
+    pass
+print("\\nheavy:" + ",".join(name for name in {heavy!r} if name in sys.modules), file=sys.stderr)
+"""
+
+
+def _run(args, env) -> tuple:
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-c", RUNNER.format(heavy=HEAVY_MODULES), *args],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    heavy = result.stderr.rsplit("heavy:", 1)[-1].strip()
+    return elapsed_ms, heavy.split(",") if heavy else []
+
+
+def _run_bare(env) -> float:
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "pass"], env=env, check=True)
+    return (time.perf_counter() - started) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--budget-ms", type=float, default=100.0, help="Maximum median wall time per command")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as scratch:
+        env = {**os.environ, "XDG_DATA_HOME": scratch, "XDG_CONFIG_HOME": scratch}
+        for name, command in COMMANDS.items():
+            _run(command, env)  # warm the filesystem and bytecode caches
+            timings, imported = zip(*(_run(command, env) for _ in range(args.runs)))
+            results[name] = {
+                "median_ms": round(statistics.median(timings), 1),
+                "best_ms": round(min(timings), 1),
+                "heavy_imports": imported[0],
+            }
+        baseline = [_run_bare(env) for _ in range(args.runs)]
+
+    over_budget = [name for name, result in results.items() if result["median_ms"] > args.budget_ms]
+    print(
+        json.dumps(
+            {
+                "benchmark": "startup",
+                "params": vars(args),
+                "interpreter_ms": round(statistics.median(baseline), 1),
+                "results": results,
+                "over_budget": over_budget,
+            },
+            indent=2,
+        ),
+    )
+    sys.exit(1 if over_budget else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+import os
+import subprocess
+
+import pytest
+
+BASE_TIMESTAMP = 1_700_000_000
+
+
+def git_env(author="Tester", offset_days=0):
+    """Environment with a fixed identity and commit date for deterministic commits"""
+    timestamp = f"{BASE_TIMESTAMP + offset_days * 24 * 3600} +0000"
+    return {
+        **os.environ,
+        "GIT_AUTHOR_NAME": author,
+        "GIT_AUTHOR_EMAIL": f"{author.lower()}@example.com",
+        "GIT_COMMITTER_NAME": author,
+        "GIT_COMMITTER_EMAIL": f"{author.lower()}@example.com",
+        "GIT_AUTHOR_DATE": timestamp,
+        "GIT_COMMITTER_DATE": timestamp,
+    }
+
+
+def git(repo, *args, env=None):
+    """Run a git command in repo and return its stdout"""
+    return subprocess.run(
+        ["git", *args],
+        cwd=repo,
+        check=True,
+        capture_output=True,
+        text=True,
+        env=env or git_env(),
+    ).stdout
+
+
+def commit(repo, message, author, offset_days):
+    """Add a file named after the message and commit it as author"""
+    filename = message.replace(" ", "_") + ".txt"
+    with open(os.path.join(repo, filename), "w") as f:
+        f.write(f"{message}\n")
+    git(repo, "add", filename)
+    git(repo, "commit", "-q", "-m", message, env=git_env(author, offset_days))
+
+
+@pytest.fixture
+def git_repo(tmp_path):
+    """Create a small repository with a merge and a branch not reachable from HEAD"""
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    git(repo, "init", "-q", "-b", "main")
+    commit(repo, "initial", "Alice", 0)
+    commit(repo, "second", "Bob", 3)
+    git(repo, "checkout", "-q", "-b", "feature")
+    commit(repo, "feature work", "Carol", 5)
+    git(repo, "checkout", "-q", "main")
+    commit(repo, "third", "Alice", 6)
+    git(repo, "merge", "-q", "--no-ff", "--no-edit", "feature", env=git_env("Alice", 7))
+    git(repo, "checkout", "-q", "-b", "unmerged")
+    commit(repo, "side work", "Dave", 9)
+    git(repo, "checkout", "-q", "main")
+    return str(repo)
+
+
+FAKE_GH_SCRIPT = """#!/bin/sh
+# Offline stand-in for the GitHub CLI: clones $FAKE_GH_REMOTE and serves fixed metadata
+if [ "$1" = "repo" ] && [ "$2" = "clone" ]; then
+    dst="$4"
+    shift 4
+    [ "$1" = "--" ] && shift
+    exec git clone -q "$@" "$FAKE_GH_REMOTE" "$dst"
+fi
+if [ "$1" = "repo" ] && [ "$2" = "view" ]; then
+    echo '{"stargazerCount": 5, "owner": {"login": "octocat"}, "issues": {"totalCount": 2}}'
+    exit 0
+fi
+exit 1
+"""
+
+
+@pytest.fixture
+def fake_gh(tmp_path, monkeypatch, git_repo):
+    """Put a fake `gh` on PATH whose clones come from the git_repo fixture"""
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    script = bin_dir / "gh"
+    script.write_text(FAKE_GH_SCRIPT)
+    script.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setenv("FAKE_GH_REMOTE", git_repo)
+    return git_repo
+
+
+@pytest.fixture
+def temp_db(tmp_path, monkeypatch):
+    """A fresh Database on a temporary file, bypassing the process-wide singleton"""
+    from sosig.core.db import Database
+
+    monkeypatch.setattr(Database, "_instance", None)
+    db = Database(f"sqlite:///{tmp_path / 'test.db'}")
+    monkeypatch.setattr("sosig.utils.gh_repo_dao.get_db", lambda: db)
+    yield db
+    db.engine.dispose()
+    db.read_engine.dispose()
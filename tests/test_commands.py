@@ -1,4 +1,6 @@
 import os
+import sys
+import subprocess
 
 import pytest
 from sosig.main import app
@@ -16,7 +18,6 @@ def temp_workspace(tmp_path):
 @pytest.fixture
 def mock_db(mocker, tmp_path):
     """Mock database interactions with a temporary database"""
-    import sosig
     from sosig.core.db import Database
 
     test_db_path = tmp_path / "test.db"
@@ -34,10 +35,6 @@ def mock_db(mocker, tmp_path):
     mock = mocker.patch("sosig.core.db.get_db", return_value=db)
     # Also patch where it's used in commands
     mocker.patch("sosig.commands.db_cmds.get_db", return_value=db)
-    mocker.patch("sosig.commands.config_cmds.get_db", return_value=db)
-
-    # Also patch the main db instance to avoid conflicts
-    sosig.db = db
 
     yield mock
 
@@ -69,6 +66,29 @@ def test_main_help():
     assert "db" in result.stdout
 
 
+@pytest.mark.parametrize("args", [["--help"], ["config", "show", "--db-path"]])
+def test_light_commands_skip_database_imports(args, tmp_path):
+    """Help and `config show --db-path` load only their own command group, not sqlalchemy, pydantic or rich"""
+    script = "\n".join(
+        [
+            "import sys",
+            "from sosig.main import app",
+            "try: app(sys.argv[1:])",
+            "except SystemExit: pass",
+            "print(sorted(sys.modules))",
+        ],
+    )
+    env = {**os.environ, "XDG_DATA_HOME": str(tmp_path), "XDG_CONFIG_HOME": str(tmp_path)}
+    result = subprocess.run([sys.executable, "-c", script, *args], capture_output=True, text=True, env=env, check=True)
+
+    modules = result.stdout.splitlines()[-1]
+    assert "'sqlalchemy'" not in modules
+    assert "'pydantic'" not in modules
+    assert "'rich'" not in modules
+    assert "'sosig.commands.db_cmds'" not in modules
+    assert not (tmp_path / "sosig" / "github_metrics.db").exists()
+
+
 def test_config_show(mock_db):
     """Test config show command"""
     result = runner.invoke(app, ["config", "show"])
@@ -80,9 +100,11 @@ def test_gh_analyze(temp_workspace, mock_repo_service, mock_db):
     """Test gh analyze command"""
     mock_service = mock_repo_service.return_value
     mock_service.analyze_repositories.return_value = []
+    mock_service.migrate_workspace_paths.return_value = (0, 0)
 
     result = runner.invoke(app, ["gh", "analyze", "test/repo", "--workspace", str(temp_workspace)])
     assert result.exit_code == 0
+    mock_service.migrate_workspace_paths.assert_called_once_with(temp_workspace)
     mock_service.analyze_repositories.assert_called_once()
 
 
@@ -93,6 +115,45 @@ def test_invalid_sort_field(mock_db):
     assert "Invalid sort field" in result.stdout
 
 
+def test_missing_extra_hint_keeps_brackets(mocker, mock_db, tmp_path):
+    """Messages are printed literally, so the pip extra isn't swallowed as rich markup"""
+    from sqlalchemy import text
+
+    with mock_db.return_value.get_session() as session:
+        session.execute(text("INSERT INTO repositories (name, path, date_created) VALUES ('a', '/a', 0)"))
+    mocker.patch.dict(sys.modules, {"zstandard": None})
+
+    result = runner.invoke(app, ["db", "export", "-o", str(tmp_path), "--compression", "zstd"])
+    assert result.exit_code == 1
+    assert "pip install 'sosig[zstd]'" in result.stdout
+
+
+def test_db_activity_prints_daily_commit_lines(mock_db, tmp_path):
+    """db activity serves a stored histogram as `<count> <YYYY-MM-DD>` lines, to stdout or per-repo files"""
+    from sqlalchemy import text
+    from sosig.utils.git_history import encode_daily_commits
+
+    # Days since the epoch: 19723 is 2024-01-01
+    blob = encode_daily_commits({19723: 3, 19724: 1, 19730: 12})
+    with mock_db.return_value.get_session() as session:
+        session.execute(
+            text(
+                "INSERT INTO repositories (name, path, commit_activity, date_created) "
+                "VALUES ('hello', '/workspace/hello', :blob, 0)",
+            ),
+            {"blob": blob},
+        )
+    expected = ["3 2024-01-01", "1 2024-01-02", "12 2024-01-08"]
+
+    result = runner.invoke(app, ["db", "activity", "hello"])
+    assert result.exit_code == 0
+    assert result.stdout.splitlines() == expected
+
+    result = runner.invoke(app, ["db", "activity", "--output-dir", str(tmp_path / "out")])
+    assert result.exit_code == 0
+    assert (tmp_path / "out" / "hello.txt").read_text().splitlines() == expected
+
+
 def test_db_remove_without_confirmation(mock_db):
     """Test db remove command without confirmation"""
     result = runner.invoke(app, ["db", "remove"])
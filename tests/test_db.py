@@ -0,0 +1,377 @@
+import csv
+import gzip
+import json
+
+import pytest
+from sqlalchemy import text, event
+from sqlalchemy.exc import OperationalError
+from sosig.core.config import Compression, ExportFormat, MetricsConfig, ConflictPolicy
+from sosig.core.importer import read_import
+from sosig.utils.gh_utils import GitHubAnalyzerImpl
+from sosig.core.models import Repository
+from sosig.core.interfaces import RepoMetrics
+from sosig.utils.gh_repo_dao import RepositoryDAO
+
+
+def test_connections_use_configured_pragmas(temp_db):
+    """Writer connections run in WAL mode with the configured busy timeout and mmap size"""
+    with temp_db.get_session() as session:
+        assert session.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert session.execute(text("PRAGMA busy_timeout")).scalar() == temp_db.config.busy_timeout
+        assert session.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+
+
+def test_read_session_is_read_only(temp_db):
+    """Read sessions see committed data but cannot write"""
+    with temp_db.get_session() as session:
+        session.execute(text("INSERT INTO repositories (name, path, date_created) VALUES ('a', '/a', 0)"))
+
+    with temp_db.get_read_session() as session:
+        assert session.execute(text("SELECT count(*) FROM repositories")).scalar() == 1
+        assert session.execute(text("PRAGMA mmap_size")).scalar() == temp_db.config.mmap_size
+        with pytest.raises(OperationalError, match="readonly"):
+            session.execute(text("DELETE FROM repositories"))
+
+
+def test_iter_repository_metrics_streams_in_one_query(temp_db):
+    """Listing projects rows into RepoMetrics with a single SELECT and no per-row refresh"""
+    with temp_db.get_session() as session:
+        session.execute(
+            text(
+                "INSERT INTO repositories (name, path, social_signal, date_created) VALUES (:name, :path, :signal, 0)",
+            ),
+            [{"name": f"r{i}", "path": f"/r{i}", "signal": i / 10} for i in range(25)],
+        )
+
+    statements = []
+    event.listen(temp_db.read_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    repos = list(temp_db.iter_repository_metrics(batch_size=10))
+
+    assert [repo.name for repo in repos[:3]] == ["r24", "r23", "r22"]
+    assert all(isinstance(repo, RepoMetrics) and repo.id for repo in repos)
+    selects = [statement for statement in statements if statement.lstrip().upper().startswith("SELECT")]
+    assert len(selects) == 1
+    assert "history_state" not in selects[0] and "head_sha" not in selects[0]
+
+
+def _seed(db, count):
+    with db.get_session() as session:
+        session.execute(
+            text("INSERT INTO repositories (name, path, stars, date_created) VALUES (:name, :path, :stars, 0)"),
+            [{"name": f"r{i}", "path": f"/r{i}", "stars": i} for i in range(count)],
+        )
+
+
+@pytest.mark.parametrize(
+    "export_format, compression, reader",
+    [
+        (ExportFormat.CSV, Compression.NONE, lambda path: list(csv.DictReader(open(path)))),
+        (ExportFormat.CSV, Compression.GZIP, lambda path: list(csv.DictReader(gzip.open(path, "rt")))),
+        (ExportFormat.NDJSON, Compression.GZIP, lambda path: [json.loads(line) for line in gzip.open(path, "rt")]),
+    ],
+)
+def test_export_streams_text_formats(temp_db, tmp_path, export_format, compression, reader):
+    """Text exports stream every row in id order through the requested compression"""
+    _seed(temp_db, 25)
+    path = temp_db.export(str(tmp_path), ["name", "stars"], export_format, compression, chunk_size=10)
+
+    rows = reader(path)
+    assert path.endswith(f".{export_format.value}{compression.suffix}")
+    assert [row["name"] for row in rows] == [f"r{i}" for i in range(25)]
+    assert str(rows[-1]["stars"]) == "24"
+
+
+def test_export_leaves_out_internal_state_by_default(temp_db, tmp_path):
+    """Default exports omit resume state, which can still be requested by name"""
+    _seed(temp_db, 3)
+    with temp_db.get_session() as session:
+        session.execute(text("UPDATE repositories SET head_sha = 'abc', history_state = '[\"a\"]'"))
+
+    (tmp_path / "default").mkdir()
+    (tmp_path / "explicit").mkdir()
+    default = temp_db.export(str(tmp_path / "default"), None, ExportFormat.NDJSON)
+    explicit = temp_db.export(str(tmp_path / "explicit"), ["name", "head_sha"], ExportFormat.NDJSON)
+
+    rows = [json.loads(line) for line in open(default)]
+    assert "stars" in rows[0] and not {"head_sha", "history_state"} & set(rows[0])
+    assert json.loads(open(explicit).readline()) == {"name": "r0", "head_sha": "abc"}
+
+
+def test_export_parquet_row_groups(temp_db, tmp_path):
+    """Parquet exports are typed and written one row group per chunk"""
+    parquet = pytest.importorskip("pyarrow.parquet")
+    _seed(temp_db, 25)
+    path = temp_db.export(str(tmp_path), None, ExportFormat.PARQUET, Compression.ZSTD, chunk_size=10)
+
+    parquet_file = parquet.ParquetFile(path)
+    assert parquet_file.metadata.num_row_groups == 3
+    table = parquet_file.read(columns=["name", "stars", "social_signal"])
+    assert table.column("stars").to_pylist() == list(range(25))
+    assert str(table.schema.field("social_signal").type) == "double"
+
+
+def test_export_parquet_chunk_with_all_null_column(temp_db, tmp_path):
+    """A row group whose optional column is entirely NULL keeps the column's type"""
+    parquet = pytest.importorskip("pyarrow.parquet")
+    _seed(temp_db, 20)
+    with temp_db.get_session() as session:
+        session.execute(text("UPDATE repositories SET lines_of_code = stars * 10 WHERE stars >= 10"))
+    path = temp_db.export(str(tmp_path), None, ExportFormat.PARQUET, chunk_size=10)
+
+    table = parquet.read_table(path, columns=["lines_of_code"])
+    assert str(table.schema.field("lines_of_code").type) == "int64"
+    assert table.column("lines_of_code").to_pylist() == [None] * 10 + [i * 10 for i in range(10, 20)]
+
+
+@pytest.mark.parametrize("export_format", [ExportFormat.CSV, ExportFormat.NDJSON, ExportFormat.PARQUET])
+def test_import_round_trips_exports(temp_db, tmp_path, export_format):
+    """An export loads back into an empty database with the same rows"""
+    if export_format is ExportFormat.PARQUET:
+        pytest.importorskip("pyarrow")
+    _seed(temp_db, 25)
+    path = temp_db.export(str(tmp_path), None, export_format, Compression.GZIP, chunk_size=10)
+    expected = [(m.path, m.stars, m.date_created) for m in temp_db.iter_repository_metrics("stars")]
+    with temp_db.get_session() as session:
+        session.execute(text("DELETE FROM repositories"))
+
+    fields, chunks = read_import(path, chunk_size=7)
+    assert temp_db.import_rows(fields, chunks) == (25, 25)
+    assert [(m.path, m.stars, m.date_created) for m in temp_db.iter_repository_metrics("stars")] == expected
+
+
+def test_import_defers_indexes_only_when_large(temp_db):
+    """Indexes are rebuilt for an import that outgrows the table, not for a few rows into it"""
+    _seed(temp_db, 50)
+    statements = []
+    event.listen(temp_db.engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    fields = ["name", "path", "stars"]
+
+    temp_db.import_rows(fields, [[("n0", "/n0", 1), ("n1", "/n1", 2)]])
+    assert not [statement for statement in statements if "INDEX" in statement]
+
+    # 52 rows in the table: the indexes go before the third chunk of 40
+    chunks = [[(f"m{i}", f"/m{i}", i) for i in range(start, start + 40)] for start in (0, 40, 80)]
+    assert temp_db.import_rows(fields, chunks) == (120, 120)
+    assert [statement for statement in statements if statement.strip().startswith("DROP INDEX")]
+    with temp_db.engine.connect() as conn:
+        indexes = {row[1] for row in conn.exec_driver_sql("PRAGMA index_list(repositories)")}
+    assert {index.name for index in Repository.__table__.indexes} <= indexes
+
+
+def _tracked(factory, opened):
+    def open_and_track(*args, **kwargs):
+        opened.append(factory(*args, **kwargs))
+        return opened[-1]
+
+    return open_and_track
+
+
+def test_rejected_import_releases_its_source(tmp_path, monkeypatch):
+    """A file or database without the required columns is closed before the error propagates"""
+    import sqlite3
+    from contextlib import closing
+
+    from sosig.core import importer
+
+    csv_path = tmp_path / "no_path.csv"
+    csv_path.write_text("name,stars\na,1\n")
+    db_path = tmp_path / "other.db"
+    with closing(sqlite3.connect(db_path)) as conn:
+        conn.execute("CREATE TABLE repositories (id INTEGER PRIMARY KEY, name VARCHAR)")
+
+    files, connections = [], []
+    monkeypatch.setattr(importer, "_open_text", _tracked(importer._open_text, files))
+    monkeypatch.setattr(importer.sqlite3, "connect", _tracked(sqlite3.connect, connections))
+    for path in (csv_path, db_path):
+        with pytest.raises(ValueError, match="missing required fields: path"):
+            read_import(str(path))
+
+    assert files[0].closed
+    with pytest.raises(sqlite3.ProgrammingError):
+        connections[0].execute("SELECT 1")
+
+
+def test_ragged_csv_rows_name_their_line(tmp_path):
+    """A CSV row with a different number of fields than the header fails with its file and line"""
+    path = tmp_path / "ragged.csv"
+    path.write_text("name,path,stars\na,/a,1\nb,/b\n")
+
+    fields, chunks = read_import(str(path))
+    with pytest.raises(ValueError, match=r"ragged\.csv line 3 has 2 fields, the header has 3"):
+        list(chunks)
+
+
+def test_sqlite_import_from_path_with_uri_characters(temp_db, tmp_path):
+    """Database file names containing URI syntax open as themselves"""
+    _seed(temp_db, 3)
+    source = tmp_path / "50% off?#1.db"
+    with temp_db.engine.connect() as conn:
+        conn.exec_driver_sql(f"VACUUM INTO '{source}'")
+
+    fields, chunks = read_import(str(source))
+    assert sorted(row[fields.index("path")] for chunk in chunks for row in chunk) == sorted(
+        m.path for m in temp_db.iter_repository_metrics()
+    )
+
+
+@pytest.mark.parametrize(
+    "policy, expected_stars",
+    [(ConflictPolicy.NEWEST, [100, 1]), (ConflictPolicy.OVERWRITE, [0, 1]), (ConflictPolicy.SKIP, [100, 100])],
+)
+def test_import_conflict_policies(temp_db, policy, expected_stars):
+    """Existing paths keep or take imported values according to the conflict policy"""
+    with temp_db.get_session() as session:
+        session.execute(
+            text(
+                "INSERT INTO repositories (name, path, stars, last_analyzed, date_created) VALUES "
+                "('a', '/a', 100, 20, 5), ('b', '/b', 100, 10, 5)",
+            ),
+        )
+    fields = ["name", "path", "stars", "last_analyzed"]
+    temp_db.import_rows(fields, [[("a", "/a", 0, 15), ("b", "/b", 1, 15)]], policy)
+
+    repos = {m.path: m for m in temp_db.iter_repository_metrics()}
+    assert [repos["/a"].stars, repos["/b"].stars] == expected_stars
+    assert repos["/a"].date_created == 5
+
+
+def _per_repo_score(metrics, weights=None):
+    analyzer = GitHubAnalyzerImpl(metrics.path)
+    if weights:
+        analyzer.weights = weights
+    raw = {
+        "age_days": metrics.age_days,
+        "update_frequency": metrics.update_frequency_days,
+        "contributor_count": metrics.contributor_count,
+        "stars": metrics.stars,
+        "commit_count": metrics.commit_count,
+        "lines_of_code": metrics.lines_of_code,
+        "open_issues": metrics.open_issues,
+    }
+    return analyzer._calculate_score(analyzer._normalize_metrics(raw))
+
+
+def test_rescore_matches_per_repo_scoring(temp_db):
+    """Vectorized rescoring reproduces the analyzer's score and writes back only changed rows"""
+    pytest.importorskip("numpy")
+    repos = [
+        RepoMetrics(
+            name=f"r{i}",
+            path=f"/r{i}",
+            username="u",
+            age_days=i * 37.5,
+            update_frequency_days=i % 45 / 1.5,
+            contributor_count=i % 70,
+            stars=i * 13,
+            commit_count=i * 21,
+            # Treeless clones store no line count; the term is left out of the score
+            lines_of_code=None if i % 7 == 3 else i * 9001,
+            open_issues=i % 1200,
+            social_signal=0.0,
+        )
+        for i in range(60)
+    ]
+    for metrics in repos:
+        metrics.social_signal = _per_repo_score(metrics)
+    RepositoryDAO().save_many(repos)
+    with temp_db.get_session() as session:
+        session.execute(
+            text(
+                "INSERT INTO repositories (name, path, stars, social_signal, date_created) VALUES ('p', '/p', 5, 1, 0)",
+            ),
+        )
+
+    assert temp_db.rescore() == (60, 0)
+
+    weights = {**MetricsConfig.DEFAULT_WEIGHTS, "stars": 0.35, "update_frequency": 0.05}
+    updates = []
+    event.listen(temp_db.engine, "before_cursor_execute", lambda *args: updates.append(args[2]))
+    assert temp_db.rescore(weights, dry_run=True) == (60, 60)
+    assert temp_db.rescore(weights) == (60, 60)
+    assert len([statement for statement in updates if statement.startswith("UPDATE")]) == 1
+
+    stored = {m.path: m.social_signal for m in temp_db.iter_repository_metrics()}
+    assert [stored[m.path] for m in repos] == pytest.approx([_per_repo_score(m, weights) for m in repos], abs=1e-9)
+    assert stored["/p"] == 1.0
+
+
+def test_sweep_reports_rank_stability_per_group(temp_db):
+    """Sweeping the current weights is perfectly stable; scoring on stars alone reverses the order"""
+    np = pytest.importorskip("numpy")
+    from sosig.core.scoring import SCORE_TERMS, weight_grid, weight_vector
+
+    RepositoryDAO().save_many(
+        [
+            RepoMetrics(
+                name=f"r{i}",
+                path=f"/r{i}",
+                username="u",
+                age_days=i,
+                update_frequency_days=i,
+                contributor_count=i,
+                stars=i,
+                commit_count=i,
+                lines_of_code=i,
+                open_issues=i,
+                social_signal=0.0,
+                group="even" if i % 2 == 0 else "odd",
+            )
+            for i in range(1, 21)
+        ],
+    )
+    # The default weights favour the short update intervals of low i; stars favour high i
+    only_stars = np.array([1.0 if weight == "stars" else 0.0 for weight, _, _ in SCORE_TERMS])
+    weight_sets = np.column_stack([weight_vector(MetricsConfig.DEFAULT_WEIGHTS), only_stars])
+
+    results = temp_db.sweep(weight_sets, top_k=5, weights=MetricsConfig.DEFAULT_WEIGHTS)
+
+    assert [(row["group"], row["repos"]) for row in results] == [("all", 20), ("even", 10), ("odd", 10)]
+    for row in results:
+        assert row["kendall_tau_mean"] == pytest.approx(0.0)
+        assert row["kendall_tau_min"] == pytest.approx(-1.0)
+        assert row["top_k_overlap_mean"] == pytest.approx(0.5)
+        assert row["top_k_overlap_min"] == 0.0
+
+    grid = weight_grid(0.25)
+    assert grid.shape == (len(SCORE_TERMS), 210)
+    assert np.allclose(grid.sum(axis=0), 1.0)
+
+
+def test_sweep_scores_missing_lines_of_code_like_rescore(temp_db):
+    """Rows without lines of code stay in the sweep, ranked by the rescaled scores rescore would store"""
+    np = pytest.importorskip("numpy")
+    from sosig.core.scoring import SCORE_TERMS, SCORE_COLUMNS, score_columns, rank_stability, normalize_columns
+
+    rng = np.random.default_rng(0)
+    columns = {column: rng.uniform(1, 500, 40) for column in SCORE_COLUMNS}
+    columns["lines_of_code"][::3] = np.nan
+    normalizers = MetricsConfig.DEFAULT_NORMALIZERS
+    normalized = normalize_columns(columns, normalizers)
+    matrix = np.column_stack([normalized[weight] for weight, _, _ in SCORE_TERMS])
+    baseline = np.array([MetricsConfig.DEFAULT_WEIGHTS[weight] for weight, _, _ in SCORE_TERMS])
+    weight_sets = rng.dirichlet(np.ones(len(SCORE_TERMS)), 6).T
+
+    def ranking_signs(weights):
+        scores = score_columns(normalized, dict(zip((weight for weight, _, _ in SCORE_TERMS), weights)))
+        upper = np.triu_indices(len(scores), k=1)
+        return np.sign(scores[:, None] - scores[None, :])[upper]
+
+    expected = [np.mean(ranking_signs(baseline) * ranking_signs(weights)) for weights in weight_sets.T]
+    stats = rank_stability(matrix, baseline, weight_sets, top_k=5)
+    assert stats["kendall_tau"] == pytest.approx(expected)
+
+    # NULL lines of code in rows 0 and 3
+    values = [{column: columns[column][i].item() for column in SCORE_COLUMNS} for i in range(5)]
+    RepositoryDAO().save_many(
+        [
+            RepoMetrics(
+                name=f"r{i}",
+                path=f"/r{i}",
+                username="u",
+                social_signal=0.0,
+                **{column: None if np.isnan(value) else value for column, value in row.items()},
+            )
+            for i, row in enumerate(values)
+        ],
+    )
+    assert temp_db.sweep(weight_sets, top_k=2, normalizers=normalizers)[0]["repos"] == 5
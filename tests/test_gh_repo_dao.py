@@ -0,0 +1,84 @@
+import pytest
+from sosig.core.query import parse_filter, format_cursor
+from sosig.core.interfaces import RepoMetrics
+from sosig.utils.gh_repo_dao import RepositoryDAO
+
+
+def _metrics(name, stars=1, last_analyzed=1.0):
+    return RepoMetrics(
+        name=name,
+        path=f"/workspace/{name}",
+        username="octocat",
+        age_days=1.0,
+        update_frequency_days=1.0,
+        contributor_count=1,
+        stars=stars,
+        commit_count=1,
+        lines_of_code=1,
+        open_issues=0,
+        social_signal=1.0,
+        last_analyzed=last_analyzed,
+    )
+
+
+def test_save_many_upserts_on_path(temp_db):
+    """A batch inserts new paths and updates existing ones without touching date_created"""
+    dao = RepositoryDAO()
+    first = dao.save_many([_metrics("a"), _metrics("b")])
+    second = dao.save_many([_metrics("b", stars=5), _metrics("c")])
+
+    assert [metrics.name for metrics in second] == ["b", "c"]
+    assert second[0].id == first[1].id
+    assert second[0].stars == 5
+    assert second[0].date_created == first[1].date_created
+    assert len(dao.get_all()) == 3
+
+
+def test_snapshots_keep_daily_then_weekly_history(temp_db, monkeypatch):
+    """Every save is snapshotted; compaction keeps the last per day in the window and per week before it"""
+    week_start = 1_699_488_000  # a Thursday 00:00 UTC, where epoch weeks begin
+    hour, day = 3600, 86400
+    monkeypatch.setattr(temp_db.config, "SNAPSHOT_DAILY_DAYS", 100_000)
+    dao = RepositoryDAO()
+    for index, offset in enumerate([hour, 2 * hour, day, 8 * day]):
+        metrics = _metrics("a", stars=index, last_analyzed=week_start + offset)
+        metrics.social_signal = 12.3456
+        stored = dao.save_metrics(metrics)
+
+    history = temp_db.get_snapshots(stored.id)
+    assert [snapshot["last_analyzed"] - week_start for snapshot in history] == [2 * hour, day, 8 * day]
+    assert [snapshot["stars"] for snapshot in history] == [1, 2, 3]
+    assert history[0]["social_signal"] == 12.346
+
+    monkeypatch.setattr(temp_db.config, "SNAPSHOT_DAILY_DAYS", 5)
+    assert temp_db.compact_snapshots(now=week_start + 10 * day) == 1
+    assert [s["last_analyzed"] - week_start for s in temp_db.get_snapshots(stored.id)] == [day, 8 * day]
+    assert len(temp_db.get_snapshots(stored.id, since=week_start + 2 * day)) == 1
+
+
+def test_keyset_pages_cover_filtered_listing(temp_db):
+    """Following --after cursors yields the same rows as one unpaginated listing"""
+    dao = RepositoryDAO()
+    batch = [_metrics(f"r{i}", stars=i % 7) for i in range(40)]
+    for index, metrics in enumerate(batch):
+        metrics.social_signal = (index % 5) / 4 if index % 9 else None
+        metrics.group = "even" if index % 2 == 0 else "odd"
+    dao.save_many(batch)
+
+    expected = [m.id for m in dao.iter_all(group="even", filters=["stars>=2"])]
+    pages, after = [], None
+    while True:
+        page = list(dao.iter_all(limit=4, group="even", filters=["stars>=2"], after=after))
+        pages.extend(m.id for m in page)
+        if len(page) < 4:
+            break
+        after = format_cursor(page[-1], "social_signal")
+
+    assert pages == expected
+    assert len(expected) == len({m.path for m in batch if m.group == "even" and m.stars >= 2})
+
+
+@pytest.mark.parametrize("expression", ["stars", "name>=3", "stars>=many"])
+def test_invalid_filters_are_rejected(expression):
+    with pytest.raises(ValueError):
+        parse_filter(expression)
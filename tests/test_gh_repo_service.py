@@ -0,0 +1,230 @@
+import time
+import shutil
+from pathlib import Path
+
+from sosig.core.config import LocalMode, CloneStrategy
+from sosig.utils.gh_utils import AsyncCommandRunner, GitCommandError, GitHubAnalyzerImpl
+from sosig.core.interfaces import RepoMetrics
+from sosig.utils.gh_analyzer import RepositoryAnalyzer
+from sosig.utils.gh_repo_service import RepositoryService
+
+from conftest import git
+
+
+def _metrics(name):
+    return RepoMetrics(
+        name=name,
+        path=f"/workspace/{name}",
+        username="octocat",
+        age_days=1.0,
+        update_frequency_days=1.0,
+        contributor_count=1,
+        stars=1,
+        commit_count=1,
+        lines_of_code=1,
+        open_issues=0,
+        social_signal=1.0,
+    )
+
+
+def _empty_dao(mocker):
+    dao = mocker.Mock()
+    dao.get_by_path.return_value = None
+    dao.save_many.side_effect = lambda batch: batch
+    return dao
+
+
+def test_parallel_analysis_preserves_order_and_isolates_errors(mocker, tmp_path):
+    """Results follow input order and one failing repository doesn't abort the batch"""
+    delays = {"slow": 0.2, "broken": 0.0, "fast": 0.0, "crash": 0.05}
+
+    def fake_analyze(source_path, target_path, force, group=None, **kwargs):
+        time.sleep(delays[source_path])
+        if source_path == "broken":
+            raise GitCommandError("clone failed")
+        if source_path == "crash":
+            raise RuntimeError("unexpected")
+        return _metrics(source_path)
+
+    service = RepositoryService(_empty_dao(mocker), mocker.Mock())
+    mocker.patch.object(service, "_analyze_single_repo", side_effect=fake_analyze)
+
+    results = service.analyze_repositories(["slow", "broken", "fast", "crash"], tmp_path, jobs=4)
+
+    assert [metrics.name for metrics in results] == ["slow", "fast"]
+
+
+def test_parallel_analysis_collects_metrics_concurrently(mocker, tmp_path, git_repo):
+    """With jobs > 1 each repository's metrics are collected through the async runner"""
+    copy = tmp_path / "copy"
+    shutil.copytree(git_repo, copy)
+
+    async def fake_signal(self, group=None):
+        assert isinstance(self.async_runner, AsyncCommandRunner)
+        return _metrics(Path(self.repo_path).name)
+
+    signal = mocker.patch.object(GitHubAnalyzerImpl, "calculate_social_signal")
+    mocker.patch.object(GitHubAnalyzerImpl, "calculate_social_signal_async", fake_signal)
+    dao = _empty_dao(mocker)
+    service = RepositoryService(dao, RepositoryAnalyzer(dao))
+
+    results = service.analyze_repositories(
+        [git_repo, str(copy)], tmp_path / "workspace", local_mode=LocalMode.IN_PLACE, jobs=2
+    )
+
+    assert [metrics.name for metrics in results] == [Path(git_repo).name, "copy"]
+    signal.assert_not_called()
+
+
+def test_treeless_clone_skips_lines_of_code(mocker, tmp_path):
+    """Treeless clones pass partial-clone flags to git and tell the analyzer to skip LOC"""
+    run = mocker.patch("subprocess.run")
+    analyzer = mocker.Mock()
+    service = RepositoryService(_empty_dao(mocker), analyzer)
+
+    service.analyze_repositories(["octocat/hello"], tmp_path, clone_strategy=CloneStrategy.TREELESS)
+
+    command = run.call_args.args[0]
+    assert command[:5] == ["gh", "repo", "clone", "octocat/hello", str(tmp_path / "github.com/octocat/hello")]
+    assert command[5:] == ["--", "--filter=tree:0", "--no-checkout", "--no-recurse-submodules"]
+    assert run.call_args.kwargs["env"]["GIT_LFS_SKIP_SMUDGE"] == "1"
+    assert analyzer.analyze_repository.call_args.kwargs["skip_metrics"] == {"lines_of_code"}
+
+
+def test_in_place_local_mode_skips_workspace(mocker, tmp_path, git_repo):
+    """In-place mode analyzes the source checkout without copying it"""
+    analyzer = mocker.Mock()
+    service = RepositoryService(mocker.Mock(), analyzer)
+    workspace = tmp_path / "workspace"
+    workspace.mkdir()
+
+    service.analyze_repositories([git_repo], workspace, force=True, local_mode=LocalMode.IN_PLACE)
+
+    assert analyzer.analyze_repository.call_args.args[0] == str(Path(git_repo).resolve())
+    assert not any(workspace.iterdir())
+
+
+def test_shared_local_mode_reuses_objects(mocker, tmp_path, git_repo):
+    """Shared mode borrows the source object store and keeps the GitHub origin"""
+    git(git_repo, "remote", "add", "origin", "https://github.com/octocat/hello.git")
+    service = RepositoryService(_empty_dao(mocker), mocker.Mock())
+
+    workspace = tmp_path / "workspace"
+    service.analyze_repositories([git_repo], workspace, local_mode=LocalMode.SHARED)
+
+    target = RepositoryService._analysis_path(git_repo, workspace, LocalMode.SHARED)
+    assert target.parent.parent == workspace / "local"
+    assert (target / ".git" / "objects" / "info" / "alternates").exists()
+    assert git(target, "remote", "get-url", "origin").strip() == "https://github.com/octocat/hello.git"
+    assert git(target, "rev-parse", "HEAD") == git(git_repo, "rev-parse", "HEAD")
+
+
+def test_fresh_cache_skips_clone(mocker, tmp_path):
+    """Fresh rows are served before cloning; stale rows are re-analyzed"""
+    fresh, stale = _metrics("fresh"), _metrics("stale")
+    stale.last_analyzed = time.time() - 48 * 3600
+    dao = _empty_dao(mocker)
+    dao.get_by_path.side_effect = lambda path: {
+        str(tmp_path / "github.com/octocat/fresh"): fresh,
+        str(tmp_path / "github.com/octocat/stale"): stale,
+    }.get(path)
+    service = RepositoryService(dao, RepositoryAnalyzer(dao))
+    analyze = mocker.patch.object(service, "_analyze_single_repo", return_value=_metrics("stale"))
+
+    results = service.analyze_repositories(["octocat/fresh", "octocat/stale"], tmp_path, max_age_hours=24)
+
+    assert [metrics.name for metrics in results] == ["fresh", "stale"]
+    assert analyze.call_count == 1
+    assert analyze.call_args.args[:3] == ("octocat/stale", tmp_path / "github.com/octocat/stale", True)
+
+    results = service.analyze_repositories(["octocat/fresh", "octocat/stale"], tmp_path, stale_only=True)
+    assert [metrics.name for metrics in results] == ["stale"]
+
+
+def test_cache_is_keyed_by_repository_identity(tmp_path, git_repo):
+    """Sources sharing a basename get separate checkouts and cache entries"""
+    workspace = tmp_path / "workspace"
+    local = RepositoryService._analysis_path(git_repo, workspace)
+    remotes = [
+        RepositoryService._analysis_path(source, workspace)
+        for source in ["octocat/repo", "https://github.com/other/repo.git", "git@gitlab.com:octocat/repo"]
+    ]
+
+    assert len({local, *remotes}) == 4
+    assert {path.name for path in [local, *remotes]} == {"repo"}
+    assert remotes[0] == RepositoryService._analysis_path("https://github.com/Octocat/repo", workspace)
+
+
+def test_stale_checkout_is_replaced_before_cloning(mocker, tmp_path):
+    """A workspace checkout left by --no-cleanup doesn't block re-cloning a stale repository"""
+    stale = _metrics("hello")
+    stale.last_analyzed = time.time() - 48 * 3600
+    dao = _empty_dao(mocker)
+    dao.get_by_path.return_value = stale
+    target = tmp_path / "github.com/octocat/hello"
+    (target / ".git").mkdir(parents=True)
+
+    def clone(command, **kwargs):
+        assert not target.exists()
+        target.mkdir()
+
+    mocker.patch("subprocess.run", side_effect=clone)
+    analyzer = RepositoryAnalyzer(dao)
+    analyze = mocker.patch.object(analyzer, "analyze_repository", return_value=_metrics("hello"))
+    service = RepositoryService(dao, analyzer)
+
+    assert [m.name for m in service.analyze_repositories(["octocat/hello"], tmp_path, max_age_hours=24)] == ["hello"]
+    assert analyze.call_args.args[0] == str(target)
+
+
+def test_parallel_duplicates_analyzed_once(mocker, tmp_path):
+    """Concurrent workers never share a checkout: repeated repositories are analyzed once"""
+    service = RepositoryService(_empty_dao(mocker), mocker.Mock())
+    analyze = mocker.patch.object(
+        service,
+        "_analyze_single_repo",
+        side_effect=lambda source, target, *args, **kwargs: _metrics(source),
+    )
+
+    sources = ["octocat/app", "https://github.com/octocat/app.git", "other/app", "octocat/app"]
+    results = service.analyze_repositories(sources, tmp_path, jobs=4)
+
+    assert [metrics.name for metrics in results] == ["octocat/app", "other/app"]
+    targets = [call.args[1] for call in analyze.call_args_list]
+    assert sorted(targets) == [tmp_path / "github.com/octocat/app", tmp_path / "github.com/other/app"]
+
+
+def test_flat_workspace_rows_are_rekeyed(temp_db, tmp_path):
+    """Rows from the `<workspace>/<basename>` layout move to identity paths, merging into newer analyses"""
+    from sosig.utils.gh_repo_dao import RepositoryDAO
+
+    dao = RepositoryDAO()
+    workspace = tmp_path / "workspace"
+    rows = {
+        "Hello.git": "Octocat",  # re-keyed
+        "dup": "octocat",  # merged into the analysis already stored under the new layout
+        "unknown": None,  # no owner, so no identity
+    }
+    for basename, owner in rows.items():
+        metrics = _metrics(basename)
+        metrics.path, metrics.username, metrics.last_analyzed = str(workspace / basename), owner, 1_000_000.0
+        dao.save_metrics(metrics)
+    current = _metrics("dup")
+    current.path, current.last_analyzed = str(workspace / "github.com/octocat/dup"), 2_000_000.0
+    current = dao.save_metrics(current)
+    nested = _metrics("app")
+    nested.path = str(workspace / "local" / "0123456789ab" / "app")
+    dao.save_metrics(nested)
+    service = RepositoryService(dao, RepositoryAnalyzer(dao))
+
+    assert service.migrate_workspace_paths(workspace) == (2, 1)
+    assert dao.get_by_path(str(workspace / "github.com/octocat/hello")).name == "hello"
+    merged = dao.get_by_path(str(workspace / "github.com/octocat/dup"))
+    assert merged.id == current.id
+    assert [s["last_analyzed"] for s in temp_db.get_snapshots(current.id)] == [1_000_000.0, 2_000_000.0]
+    remaining = ["github.com/octocat/dup", "github.com/octocat/hello", "local/0123456789ab/app", "unknown"]
+    assert sorted(m.path for m in dao.get_all()) == [str(workspace / path) for path in remaining]
+
+    assert service.migrate_workspace_paths(workspace, prune=True) == (0, 1)
+    assert dao.get_by_path(str(workspace / "unknown")) is None
+    assert service.migrate_workspace_paths(workspace) == (0, 0)
@@ -0,0 +1,176 @@
+import os
+import json
+import asyncio
+import subprocess
+from collections import Counter
+
+import pytest
+from sosig.utils.gh_utils import AsyncCommandRunner, GitHubAnalyzerImpl, DefaultCommandRunner
+from sosig.utils.git_history import daily_commit_lines, decode_daily_commits, encode_daily_commits
+
+from conftest import git, commit
+
+
+def test_history_stats_match_per_method_metrics(git_repo):
+    """Single-pass history walk should agree with the individual git commands"""
+    analyzer = GitHubAnalyzerImpl(git_repo)
+    stats = analyzer.get_history_stats()
+
+    assert stats.head_sha == git(git_repo, "rev-parse", "HEAD").strip()
+    assert stats.commit_count == analyzer.get_commit_count()
+    assert stats.contributor_count == analyzer.get_contributor_count()
+    assert stats.update_frequency_days() == pytest.approx(analyzer.get_update_frequency())
+    assert stats.age_days() == pytest.approx(analyzer.get_repo_age(), abs=1e-3)
+
+
+def test_daily_commits_match_git_log_dates(git_repo):
+    """The per-day histogram survives encoding and matches `git log | uniq -c` in UTC"""
+    dates = git(git_repo, "log", "--date=format-local:%Y-%m-%d", "--format=%cd", env={**os.environ, "TZ": "UTC"})
+    counts = Counter(dates.split())
+    stats = GitHubAnalyzerImpl(git_repo).get_history_stats()
+
+    assert sum(stats.daily_commits.values()) == stats.commit_count
+    lines = daily_commit_lines(decode_daily_commits(encode_daily_commits(stats.daily_commits)))
+    assert list(lines) == [f"{counts[date]} {date}" for date in sorted(counts)]
+
+
+def test_history_stats_empty_repository(tmp_path):
+    """An empty repository yields zeroed history metrics"""
+    git(tmp_path, "init", "-q")
+    stats = GitHubAnalyzerImpl(str(tmp_path)).get_history_stats()
+
+    assert stats.commit_count == 0
+    assert stats.contributor_count == 0
+    assert stats.age_days() == 0.0
+    assert stats.update_frequency_days() == 0
+
+
+def test_lines_of_code_matches_wc_and_skips_binary(git_repo):
+    """In-process line counting should match `wc -l` for text files and ignore binaries"""
+    with open(os.path.join(git_repo, "no_trailing_newline.txt"), "w") as f:
+        f.write("one\ntwo")
+    with open(os.path.join(git_repo, "image.bin"), "wb") as f:
+        f.write(b"\x89PNG\r\n\x00\x00\n\n")
+    git(git_repo, "add", "no_trailing_newline.txt", "image.bin")
+
+    text_files = [f for f in git(git_repo, "ls-files").splitlines() if f != "image.bin"]
+    wc_output = subprocess.run(["wc", "-l", *text_files], cwd=git_repo, capture_output=True, text=True).stdout
+    expected = int(wc_output.splitlines()[-1].split()[0])
+
+    assert GitHubAnalyzerImpl(git_repo).get_lines_of_code() == expected
+
+
+class RecordingRunner:
+    """Command runner stub that answers `gh repo view` and records invocations"""
+
+    def __init__(self, response):
+        self.response = response
+        self.commands = []
+
+    def run_command(self, command, cwd):
+        self.commands.append(command)
+        return self.response
+
+    def stream_command(self, command, cwd):
+        self.commands.append(command)
+        return iter(())
+
+
+def test_repo_metadata_fetched_once():
+    """Stars, username and open issues should share a single gh call"""
+    runner = RecordingRunner(
+        json.dumps({"stargazerCount": 42, "owner": {"login": "octocat"}, "issues": {"totalCount": 7}}),
+    )
+    analyzer = GitHubAnalyzerImpl("/unused", command_runner=runner)
+
+    assert analyzer.get_stars() == 42
+    assert analyzer.get_repo_username() == "octocat"
+    assert analyzer.get_open_issues() == 7
+    assert runner.commands == [["gh", "repo", "view", "--json", "stargazerCount,owner,issues"]]
+
+
+def test_async_metrics_match_sync(git_repo):
+    """Async metric variants should return the same values as the blocking ones"""
+    analyzer = GitHubAnalyzerImpl(git_repo, async_runner=AsyncCommandRunner(git_limit=2))
+
+    async def collect():
+        return await asyncio.gather(
+            analyzer.get_update_frequency_async(),
+            analyzer.get_contributor_count_async(),
+            analyzer.get_commit_count_async(),
+            analyzer.get_lines_of_code_async(),
+            analyzer.get_history_stats_async(),
+        )
+
+    update_frequency, contributors, commits, lines_of_code, history = asyncio.run(collect())
+
+    assert update_frequency == pytest.approx(analyzer.get_update_frequency())
+    assert contributors == analyzer.get_contributor_count()
+    assert commits == analyzer.get_commit_count()
+    assert lines_of_code == analyzer.get_lines_of_code()
+    assert history == analyzer.get_history_stats()
+
+    # Without a shared runner there is no private fallback whose limits would apply per repository
+    with pytest.raises(ValueError, match="shared AsyncCommandRunner"):
+        asyncio.run(GitHubAnalyzerImpl(git_repo).get_lines_of_code_async())
+
+
+def test_incremental_history_matches_full_walk(git_repo):
+    """Resuming from a stored state walks only new commits and matches a full walk"""
+    previous = GitHubAnalyzerImpl(git_repo).get_history_stats()
+    commit(git_repo, "fourth", "Erin", 12)
+    commit(git_repo, "fifth", "Bob", 14)
+
+    runner = RecordingLogRunner()
+    incremental = GitHubAnalyzerImpl(git_repo, command_runner=runner, previous_history=previous).get_history_stats()
+
+    assert incremental == GitHubAnalyzerImpl(git_repo).get_history_stats()
+    # The two new commits plus the unmerged branch, which the stored head can't exclude
+    assert runner.walked_lines == 3
+
+
+def test_incremental_history_falls_back_after_force_push(git_repo):
+    """A stored head that is no longer an ancestor of HEAD triggers a full walk"""
+    previous = GitHubAnalyzerImpl(git_repo).get_history_stats()
+    git(git_repo, "reset", "-q", "--hard", "HEAD~1")
+    commit(git_repo, "rewritten", "Erin", 12)
+
+    incremental = GitHubAnalyzerImpl(git_repo, previous_history=previous).get_history_stats()
+
+    assert incremental == GitHubAnalyzerImpl(git_repo).get_history_stats()
+    assert incremental.head_sha != previous.head_sha
+
+
+class RecordingLogRunner(DefaultCommandRunner):
+    """Real command runner that counts streamed history records"""
+
+    walked_lines = 0
+
+    def stream_command(self, command, cwd):
+        for line in super().stream_command(command, cwd):
+            self.walked_lines += 1
+            yield line
+
+
+def test_unavailable_lines_of_code_left_out_of_score(fake_gh):
+    """Skipped line counts are stored as None and the other weights scaled up, or carried over"""
+    measured = GitHubAnalyzerImpl(fake_gh).calculate_social_signal()
+    skipped = GitHubAnalyzerImpl(fake_gh, skip_metrics={"lines_of_code"}).calculate_social_signal()
+    carried = GitHubAnalyzerImpl(
+        fake_gh,
+        skip_metrics={"lines_of_code"},
+        previous_lines_of_code=measured.lines_of_code,
+    ).calculate_social_signal()
+
+    analyzer = GitHubAnalyzerImpl(fake_gh)
+    weights = analyzer.weights
+    skipped_weights = sum(weights.values()) - weights["lines_of_code"]
+    max_lines = analyzer.normalizers["max_lines_of_code"]
+    loc_term = weights["lines_of_code"] * min(measured.lines_of_code / max_lines, 1.0) * 100
+    assert skipped.lines_of_code is None
+    assert skipped.social_signal == pytest.approx(
+        (measured.social_signal - loc_term) * sum(weights.values()) / skipped_weights,
+        abs=1e-3,
+    )
+    assert carried.lines_of_code == measured.lines_of_code
+    assert carried.social_signal == pytest.approx(measured.social_signal, abs=1e-3)
@@ -0,0 +1,88 @@
+import sqlite3
+from contextlib import closing
+
+from sosig.core.db import Database
+from sosig.core.models import Repository
+from sosig.core.migrations import SCHEMA_VERSION, schema_fingerprint
+
+
+def _legacy_database(db_file):
+    """An unversioned database with duplicate paths and no indexes"""
+    with closing(sqlite3.connect(db_file)) as conn, conn:
+        conn.execute(
+            "CREATE TABLE repositories (id INTEGER PRIMARY KEY, name VARCHAR NOT NULL, path VARCHAR NOT NULL, "
+            "last_analyzed FLOAT, date_created FLOAT NOT NULL)",
+        )
+        conn.executemany(
+            "INSERT INTO repositories (name, path, last_analyzed, date_created) VALUES (?, ?, ?, 0)",
+            [("a", "/workspace/a", 1.0), ("a", "/workspace/a", 3.0), ("a", "/workspace/a", 2.0), ("b", "/b", 1.0)],
+        )
+
+
+def _open(db_file, monkeypatch):
+    monkeypatch.setattr(Database, "_instance", None)
+    db = Database(f"sqlite:///{db_file}")
+    db.engine.dispose()
+    db.read_engine.dispose()
+
+
+def test_legacy_database_upgraded_in_place(tmp_path, monkeypatch):
+    """Unversioned databases gain new columns and indexes, keeping the latest row per path"""
+    db_file = tmp_path / "legacy.db"
+    _legacy_database(db_file)
+    _open(db_file, monkeypatch)
+
+    with closing(sqlite3.connect(db_file)) as conn:
+        rows = conn.execute("SELECT path, last_analyzed FROM repositories ORDER BY path").fetchall()
+        indexes = {row[1] for row in conn.execute("PRAGMA index_list(repositories)")}
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(repositories)")}
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        snapshots = conn.execute("SELECT analyzed_at FROM repository_snapshots ORDER BY repo_id").fetchall()
+        plan = " ".join(
+            row[-1] for row in conn.execute("EXPLAIN QUERY PLAN SELECT * FROM repositories ORDER BY social_signal DESC")
+        )
+
+    assert rows == [("/b", 1.0), ("/workspace/a", 3.0)]
+    assert {"ix_repositories_path", "ix_repositories_group", "ix_repositories_social_signal"} <= indexes
+    assert {"social_signal", "head_sha"} <= columns
+    assert version == SCHEMA_VERSION
+    assert snapshots == [(3,), (1,)]
+    assert "ix_repositories_social_signal" in plan
+
+
+def test_current_database_is_not_migrated_again(tmp_path, monkeypatch):
+    """Opening an up-to-date database runs no migrations"""
+    db_file = tmp_path / "current.db"
+    _open(db_file, monkeypatch)
+    with closing(sqlite3.connect(db_file)) as conn, conn:
+        conn.execute("DROP INDEX ix_repositories_stars")
+
+    _open(db_file, monkeypatch)
+
+    with closing(sqlite3.connect(db_file)) as conn:
+        indexes = {row[1] for row in conn.execute("PRAGMA index_list(repositories)")}
+    assert "ix_repositories_stars" not in indexes
+
+
+def _fingerprint(db_file):
+    with closing(sqlite3.connect(db_file)) as conn:
+        return conn.execute("SELECT value FROM schema_meta WHERE name = 'fingerprint'").fetchone()[0]
+
+
+def test_stamped_database_skips_inspection(tmp_path, monkeypatch):
+    """A matching fingerprint short-circuits migrations and field validation; a stale one re-runs them"""
+    db_file = tmp_path / "stamped.db"
+    _open(db_file, monkeypatch)
+    assert _fingerprint(db_file) == schema_fingerprint()
+
+    validated = []
+    monkeypatch.setattr(Repository, "validate_fields", classmethod(lambda cls: validated.append(cls)))
+    _open(db_file, monkeypatch)
+    assert validated == []
+
+    # e.g. a database last opened by a sosig with different metric fields
+    with closing(sqlite3.connect(db_file)) as conn, conn:
+        conn.execute("UPDATE schema_meta SET value = 'stale' WHERE name = 'fingerprint'")
+    _open(db_file, monkeypatch)
+    assert validated == [Repository]
+    assert _fingerprint(db_file) == schema_fingerprint()
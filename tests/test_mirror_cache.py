@@ -0,0 +1,37 @@
+import pytest
+from sosig.utils.mirror_cache import MirrorCache, cleanup_workspace
+
+from conftest import git, commit
+
+
+@pytest.mark.parametrize(
+    "repo",
+    [
+        "octocat/Hello-World",
+        "github.com/octocat/hello-world",
+        "https://github.com/octocat/Hello-World.git",
+        "git@github.com:octocat/Hello-World.git",
+        "ssh://git@github.com/octocat/hello-world/",
+    ],
+)
+def test_canonical_identity(repo):
+    """Different spellings of the same repository share one mirror"""
+    assert MirrorCache.canonical_identity(repo) == "github.com/octocat/hello-world"
+
+
+def test_mirror_is_reused_and_fetched_incrementally(fake_gh, tmp_path):
+    """A second checkout fetches new commits into the existing mirror"""
+    workspace = tmp_path / "workspace"
+    cache = MirrorCache(workspace / MirrorCache.DIRNAME)
+    target = workspace / "hello"
+
+    mirror = cache.checkout("octocat/hello", target)
+    assert git(target, "rev-parse", "HEAD") == git(fake_gh, "rev-parse", "HEAD")
+    assert "refs/heads/unmerged" in git(mirror, "for-each-ref", "--format=%(refname)")
+
+    cleanup_workspace(workspace)
+    assert not target.exists() and mirror.exists()
+
+    commit(fake_gh, "new work", "Erin", 12)
+    assert cache.checkout("octocat/hello", target) == mirror
+    assert git(target, "rev-parse", "HEAD") == git(fake_gh, "rev-parse", "HEAD")